@@ -0,0 +1,350 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Offline benchmark suite for interactigen.
+
+Runs the client pipeline, bulk multi-intent runs, dedup and response parsing at several scales against
+FakeChatModel, so no provider is called, and prints a JSON report of throughput, latency percentiles and peak memory.
+Compare reports across versions before upgrading:
+
+    python benchmarks/benchmark.py --scale small --output before.json
+"""
+
+from interactigen import (ExactDuplicateIndex, Interactigen, MetricsAggregator, NearDuplicateIndex,
+                          PhraseTransformsUtterances)
+from interactigen.streaming import UtteranceStreamParser
+from interactigen.testing import FakeChatModel, tracing_disabled
+from interacticore import BrokenJsonOutputParser
+
+from collections.abc import Callable
+from importlib import metadata
+
+import argparse
+import asyncio
+import datetime
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+# The sizes each scenario runs at, per scale.
+scales = {
+    'small': {
+        'pipeline': [5, 20],
+        'bulk': [10, 50],
+        'dedup': [1000, 10000],
+        'parsing': [10, 100, 1000],
+    },
+    'large': {
+        'pipeline': [5, 20, 50],
+        'bulk': [10, 50, 200],
+        'dedup': [1000, 10000, 100000],
+        'parsing': [10, 100, 1000, 10000],
+    },
+}
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """
+    Compute the nearest-rank latency percentiles of a sample.
+    :param samples: The latencies, in seconds.
+    :return: the p50, p95 and p99 latencies.
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+    return {f"p{p}": ordered[max(0, -(-len(ordered) * p // 100) - 1)] for p in (50, 95, 99)}
+
+
+def measure(run: Callable[[], dict], *, memory: bool) -> dict:
+    """
+    Time a benchmark case, then optionally run it again under tracemalloc for its peak memory.  The second run keeps
+    allocation tracing overhead out of the timings.
+    :param run: The case, returning its operation count, latencies and extra fields.
+    :param memory: Whether to measure peak memory.
+    :return: the case report.
+    """
+    start = time.perf_counter()
+    outcome = run()
+    wall_time = time.perf_counter() - start
+    report = {
+        'wall_time': wall_time,
+        'ops': outcome.pop('ops'),
+        'throughput': 0.0,
+        'latency': percentiles(outcome.pop('latencies')),
+        'peak_memory_bytes': None,
+    }
+    report['throughput'] = report['ops'] / wall_time if wall_time else 0.0
+    if memory:
+        tracemalloc.start()
+        run()
+        report['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {**report, **outcome}
+
+
+def fake_model(args) -> FakeChatModel:
+    """
+    Create the fake model configured on the command line.
+    :param args: The parsed arguments.
+    :return: the fake model.
+    """
+    return FakeChatModel(
+        latency=args.latency,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        output_size=args.output_size,
+        duplicate_rate=args.duplicate_rate,
+        malformed_rate=args.malformed_rate,
+        truncated_rate=args.truncated_rate,
+        seed=args.seed,
+    )
+
+
+def command_report(model: FakeChatModel, metrics: MetricsAggregator) -> dict:
+    """
+    Summarize the commands a case issued.
+    :param model: The fake model.
+    :param metrics: The case's metrics.
+    :return: the model call count and per-command metrics.
+    """
+    return {'model_calls': model.calls, 'commands': metrics.snapshot()['commands']}
+
+
+def bench_pipeline(args, init_quantity: int) -> list[dict]:
+    """
+    Benchmark generate_phrase_utterances() and agenerate_phrase_utterances() for one intent.
+    :param args: The parsed arguments.
+    :param init_quantity: The number of initial utterances.
+    :return: the case reports.
+    """
+    reports = []
+    for mode in ('sync', 'async'):
+        def run() -> dict:
+            model = fake_model(args)
+            metrics = MetricsAggregator()
+            client = Interactigen(model=model, max_concurrency=args.concurrency, instrumentation=[metrics])
+            start = time.perf_counter()
+            if mode == 'sync':
+                utterances = client.generate_phrase_utterances(base_phrase='to check my account balance',
+                                                               init_quantity=init_quantity)
+            else:
+                utterances = asyncio.run(client.agenerate_phrase_utterances(base_phrase='to check my account balance',
+                                                                            init_quantity=init_quantity))
+            return {
+                'ops': len(utterances),
+                'latencies': [time.perf_counter() - start],
+                **command_report(model, metrics),
+            }
+
+        reports.append({'scenario': 'pipeline', 'mode': mode, 'scale': init_quantity,
+                        **measure(run, memory=args.memory)})
+    return reports
+
+
+def bench_bulk(args, intents: int) -> list[dict]:
+    """
+    Benchmark agenerate_dataset() over many intents.
+    :param args: The parsed arguments.
+    :param intents: The number of intents.
+    :return: the case reports.
+    """
+    phrases = [f"to ask about topic number {idx}" for idx in range(intents)]
+
+    def run() -> dict:
+        model = fake_model(args)
+        metrics = MetricsAggregator()
+        client = Interactigen(model=model, max_concurrency=args.concurrency, instrumentation=[metrics])
+
+        async def drain() -> tuple[int, int, list[float]]:
+            utterances = 0
+            errors = 0
+            latencies = []
+            start = time.perf_counter()
+            async for result in client.agenerate_dataset(phrases, init_quantity=args.init_quantity):
+                latencies.append(time.perf_counter() - start)
+                utterances += len(result.utterances or [])
+                errors += not result.ok
+            return utterances, errors, latencies
+
+        utterances, errors, latencies = asyncio.run(drain())
+        return {
+            'ops': utterances,
+            'latencies': latencies,
+            'errors': errors,
+            **command_report(model, metrics),
+        }
+
+    return [{'scenario': 'bulk', 'mode': 'async', 'scale': intents, **measure(run, memory=args.memory)}]
+
+
+def synthetic_corpus(size: int, seed: int) -> list[str]:
+    """
+    Build a corpus of utterances with exact and near duplicates.
+    :param size: The number of utterances.
+    :param seed: The random seed.
+    :return: the utterances.
+    """
+    rng = random.Random(seed)
+    words = ['check', 'my', 'account', 'balance', 'please', 'what', 'is', 'the', 'current', 'amount', 'in', 'savings',
+             'show', 'me', 'how', 'much', 'money', 'do', 'i', 'have', 'left', 'now', 'today', 'can', 'you', 'tell']
+    corpus = []
+    for _ in range(size):
+        roll = rng.random()
+        if corpus and roll < 0.2:
+            corpus.append(rng.choice(corpus))
+        elif corpus and roll < 0.4:
+            corpus.append(rng.choice(corpus).upper() + '!')
+        else:
+            corpus.append(' '.join(rng.choice(words) for _ in range(rng.randint(3, 10))))
+    return corpus
+
+
+def bench_dedup(args, size: int) -> list[dict]:
+    """
+    Benchmark the duplicate indexes.
+    :param args: The parsed arguments.
+    :param size: The number of utterances.
+    :return: the case reports.
+    """
+    corpus = synthetic_corpus(size, args.seed)
+    factories = {
+        'exact': ExactDuplicateIndex,
+        'near': lambda: NearDuplicateIndex(threshold=0.8),
+    }
+    reports = []
+    for mode, factory in factories.items():
+        def run() -> dict:
+            index = factory()
+            start = time.perf_counter()
+            unique = index.filter(corpus)
+            elapsed = time.perf_counter() - start
+            return {'ops': size, 'latencies': [elapsed / size], 'unique': len(unique)}
+
+        reports.append({'scenario': 'dedup', 'mode': mode, 'scale': size, **measure(run, memory=args.memory)})
+    return reports
+
+
+def bench_parsing(args, size: int) -> list[dict]:
+    """
+    Benchmark parsing a multi-transform response in full and incrementally.
+    :param args: The parsed arguments.
+    :param size: The number of utterances in the response.
+    :return: the case reports.
+    """
+    response = json.dumps({'transforms': [
+        {'transform': idx, 'utterances': [f"utterance {k} of transform {idx}" for k in range(size // 2)]}
+        for idx in (1, 2)
+    ]})
+    text = f"```json\n{response}\n```"
+    parser = BrokenJsonOutputParser(pydantic_object=PhraseTransformsUtterances)
+    repeats = max(1, 2000 // size)
+
+    def run_full() -> dict:
+        latencies = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            parser.parse(text)
+            latencies.append(time.perf_counter() - start)
+        return {'ops': repeats * size, 'latencies': latencies}
+
+    def run_stream() -> dict:
+        latencies = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            stream_parser = UtteranceStreamParser()
+            for idx in range(0, len(text), 4):
+                stream_parser.feed(text[idx:idx + 4])
+            latencies.append(time.perf_counter() - start)
+        return {'ops': repeats * size, 'latencies': latencies}
+
+    return [
+        {'scenario': 'parsing', 'mode': 'full', 'scale': size, **measure(run_full, memory=args.memory)},
+        {'scenario': 'parsing', 'mode': 'stream', 'scale': size, **measure(run_stream, memory=args.memory)},
+    ]
+
+
+scenarios = {
+    'pipeline': bench_pipeline,
+    'bulk': bench_bulk,
+    'dedup': bench_dedup,
+    'parsing': bench_parsing,
+}
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Run the benchmark suite.
+    :param argv: The command line arguments.
+    :return: the exit status.
+    """
+    parser = argparse.ArgumentParser(description='Offline interactigen benchmark suite.')
+    parser.add_argument('--scale', choices=sorted(scales), default='small', help='The scenario sizes to run.')
+    parser.add_argument('--scenario', action='append', choices=sorted(scenarios), dest='scenarios',
+                        help='A scenario to run; repeat for several.  Default is all.')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+    parser.add_argument('--seed', type=int, default=0, help='The random seed.')
+    parser.add_argument('--concurrency', type=int, default=8, help='The client max_concurrency.')
+    parser.add_argument('--init-quantity', type=int, default=10, help='The initial utterances per bulk intent.')
+    parser.add_argument('--latency', type=float, default=0.05, help='The fake model median time to first token.')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='The fake model log-normal latency spread.')
+    parser.add_argument('--tokens-per-second', type=float, default=1000.0, help='The fake model output token rate.')
+    parser.add_argument('--output-size', type=int, default=1, help='The fake model utterances per transformed input.')
+    parser.add_argument('--duplicate-rate', type=float, default=0.05, help='The fake model verbatim repeat rate.')
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='The fake model malformed JSON rate.')
+    parser.add_argument('--truncated-rate', type=float, default=0.0, help='The fake model truncated response rate.')
+    parser.add_argument('--no-memory', action='store_false', dest='memory', help='Skip the peak memory runs.')
+    args = parser.parse_args(argv)
+
+    results = []
+    with tracing_disabled():
+        for name in args.scenarios or list(scenarios):
+            for size in scales[args.scale][name]:
+                print(f"Running {name} at {size}...", file=sys.stderr)
+                results.extend(scenarios[name](args, size))
+
+    try:
+        version = metadata.version('interactigen')
+    except metadata.PackageNotFoundError:
+        version = None
+    report = {
+        'interactigen_version': version,
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Import-time benchmark for interactigen.
+
+Measures the cold import latency of the package and of its first use in fresh interpreters, checks that a bare import
+loads none of the heavy dependencies, and prints a JSON report.  Exits non-zero when a budget is exceeded, so it can
+guard against import latency regressions:
+
+    python benchmarks/import_time.py --max-import-ms 50
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+# Modules a bare "import interactigen" must not load.
+heavy_modules = ['langchain_core', 'interacticore', 'pydantic', 'interactigen.interactigen', 'interactigen.commands']
+
+# The statements timed in each fresh interpreter.
+cases = {
+    'import': 'import interactigen',
+    'first_use': 'import interactigen; interactigen.Interactigen; interactigen.GenNewPhrasings',
+}
+
+# Times a statement in the child interpreter and reports its latency and the heavy modules loaded.
+_probe = """
+import json, sys, time
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+loaded = [name for name in {heavy_modules!r} if name in sys.modules]
+print(json.dumps({{'ms': elapsed * 1000.0, 'loaded': loaded}}))
+"""
+
+
+def probe(statement: str) -> dict:
+    """
+    Time a statement in a fresh interpreter.
+    :param statement: The statement.
+    :return: the latency in milliseconds and the heavy modules loaded.
+    """
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [src, os.environ.get('PYTHONPATH')]))}
+    output = subprocess.run(
+        [sys.executable, '-c', _probe.format(statement=statement, heavy_modules=heavy_modules)],
+        check=True, capture_output=True, text=True, env=env,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Run the import-time benchmark.
+    :param argv: The command line arguments.
+    :return: the exit status: 1 if a budget is exceeded or a bare import loads heavy modules.
+    """
+    parser = argparse.ArgumentParser(description='interactigen import-time benchmark.')
+    parser.add_argument('--runs', type=int, default=10, help='The fresh interpreters started per case.')
+    parser.add_argument('--max-import-ms', type=float, help='The median bare import latency budget.')
+    parser.add_argument('--max-first-use-ms', type=float, help='The median first use latency budget.')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+    args = parser.parse_args(argv)
+
+    budgets = {'import': args.max_import_ms, 'first_use': args.max_first_use_ms}
+    results = {}
+    failures = []
+    for name, statement in cases.items():
+        samples = [probe(statement) for _ in range(args.runs)]
+        latencies = sorted(sample['ms'] for sample in samples)
+        results[name] = {
+            'statement': statement,
+            'median_ms': statistics.median(latencies),
+            'min_ms': latencies[0],
+            'max_ms': latencies[-1],
+            'loaded_heavy_modules': samples[-1]['loaded'],
+        }
+        if budgets[name] is not None and results[name]['median_ms'] > budgets[name]:
+            failures.append(f"{name} median {results[name]['median_ms']:.1f}ms exceeds {budgets[name]}ms")
+    if results['import']['loaded_heavy_modules']:
+        failures.append(f"bare import loaded {results['import']['loaded_heavy_modules']}")
+
+    report = {
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': args.runs,
+        'results': results,
+        'failures': failures,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    for failure in failures:
+        print(f"FAILED: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
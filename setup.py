@@ -55,5 +55,12 @@ setup(
     # in the Python standard library or available on PyPI.
     extras_require={
         'dev': ['pytest>=8.1.1', 'pytest-cov>=4.1.0'],
+        'parquet': ['pyarrow'],
+        'openai': ['openai'],
+    },
+
+    # Console scripts installed with the package.
+    entry_points={
+        'console_scripts': ['interactigen=interactigen.cli:main'],
     },
 )
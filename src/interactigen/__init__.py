@@ -20,6 +20,104 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from .interactigen import Interactigen
-from .commons import PhraseUtterances
-from .commands import *
+# Public names are imported from their submodules on first access, so that importing the package does not load
+# LangChain, interacticore or the command prompts until they are used.
+
+from typing import TYPE_CHECKING
+
+import importlib
+
+if TYPE_CHECKING:
+    from .interactigen import Interactigen
+    from .commons import (PhraseUtterances, PhraseTransformsUtterances, TransformUtterances, MultiPhraseUtterances,
+                          NumberedPhraseUtterances, DatasetResult, UtteranceEvent)
+    from .cache import ResponseCache
+    from .journal import RunJournal
+    from .ratelimit import RateController
+    from .routing import ModelEndpoint, ModelPool, ModelRouter
+    from .batch import BatchBackend, BatchRequest, BatchResult, LocalBatchBackend, OpenAIBatchBackend
+    from .dedup import DuplicateIndex, ExactDuplicateIndex, NearDuplicateIndex, dedup_utterances, normalize_utterance
+    from .pipeline import Pipeline, Stage, default_pipeline
+    from .local_transforms import (LocalTransform, LocalTransformEngine, NgramSwapTransform, SynonymTransform,
+                                   AsrConfusionTransform, TypoTransform, EmojiTransform, default_local_transforms)
+    from .corpus import CorpusView, UtteranceCorpus
+    from .sinks import DatasetRecord, DatasetSink, HashSplitter, JsonlSink, ParquetSink
+    from .instrumentation import (CommandCall, Instrumentation, MetricsAggregator, OpenTelemetryExporter,
+                                  PrometheusExporter)
+    from .commands import *
+
+# The submodule defining each public name.
+_lazy_imports = {
+    'Interactigen': '.interactigen',
+    'PhraseUtterances': '.commons',
+    'PhraseTransformsUtterances': '.commons',
+    'TransformUtterances': '.commons',
+    'MultiPhraseUtterances': '.commons',
+    'NumberedPhraseUtterances': '.commons',
+    'DatasetResult': '.commons',
+    'UtteranceEvent': '.commons',
+    'ResponseCache': '.cache',
+    'RunJournal': '.journal',
+    'RateController': '.ratelimit',
+    'ModelEndpoint': '.routing',
+    'ModelPool': '.routing',
+    'ModelRouter': '.routing',
+    'BatchBackend': '.batch',
+    'BatchRequest': '.batch',
+    'BatchResult': '.batch',
+    'LocalBatchBackend': '.batch',
+    'OpenAIBatchBackend': '.batch',
+    'DuplicateIndex': '.dedup',
+    'ExactDuplicateIndex': '.dedup',
+    'NearDuplicateIndex': '.dedup',
+    'dedup_utterances': '.dedup',
+    'normalize_utterance': '.dedup',
+    'Pipeline': '.pipeline',
+    'Stage': '.pipeline',
+    'default_pipeline': '.pipeline',
+    'LocalTransform': '.local_transforms',
+    'LocalTransformEngine': '.local_transforms',
+    'NgramSwapTransform': '.local_transforms',
+    'SynonymTransform': '.local_transforms',
+    'AsrConfusionTransform': '.local_transforms',
+    'TypoTransform': '.local_transforms',
+    'EmojiTransform': '.local_transforms',
+    'default_local_transforms': '.local_transforms',
+    'UtteranceCorpus': '.corpus',
+    'CorpusView': '.corpus',
+    'DatasetRecord': '.sinks',
+    'DatasetSink': '.sinks',
+    'HashSplitter': '.sinks',
+    'JsonlSink': '.sinks',
+    'ParquetSink': '.sinks',
+    'CommandCall': '.instrumentation',
+    'Instrumentation': '.instrumentation',
+    'MetricsAggregator': '.instrumentation',
+    'OpenTelemetryExporter': '.instrumentation',
+    'PrometheusExporter': '.instrumentation',
+    'AsyncChatCommand': '.commands',
+    'GenNewPhrasings': '.commands',
+    'GenMultiNewPhrasings': '.commands',
+    'GenTransformedPhrasings': '.commands',
+    'GenMultiTransformedPhrasings': '.commands',
+}
+
+__all__ = list(_lazy_imports)
+
+
+def __getattr__(name: str):
+    """
+    Import a public name from its submodule on first access.
+    :param name: The attribute name.
+    :return: the attribute value.
+    """
+    module_name = _lazy_imports.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_imports))
@@ -0,0 +1,127 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.tracers.context import tracing_v2_enabled
+
+from interacticore import LangChainCommand, LangChainWrap
+
+from collections.abc import AsyncIterator
+
+import asyncio
+import functools
+import random
+import time
+import logging
+
+# Initialize the logger.
+log = logging.getLogger('interactigenLogger')
+
+
+def aretry_with_exponential_backoff(
+        func,
+        initial_delay: float = 1,
+        exponential_base: float = 2,
+        jitter: bool = True,
+        max_retries: int = 3,
+        errors: tuple = (OutputParserException,),
+):
+    """
+    Retry a coroutine function with exponential backoff.  Mirrors the synchronous retry applied to
+    LangChainWrap.execute, but awaits between attempts instead of blocking the event loop.
+    :param func: The coroutine function.
+    :param initial_delay: The initial delay in seconds.
+    :param exponential_base: The delay growth factor.
+    :param jitter: Whether to apply random jitter to the delay.
+    :param max_retries: The maximum number of retries.
+    :param errors: The exception types to retry.
+    :return: the wrapped coroutine function.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        num_retries = 0
+        delay = initial_delay
+        while True:
+            try:
+                return await func(*args, **kwargs)
+            except errors as e:
+                log.error(f"Caught exception: {e}")
+                num_retries += 1
+                if num_retries > max_retries:
+                    raise Exception(
+                        f"Maximum number of retries ({max_retries}) exceeded."
+                    )
+                delay *= exponential_base * (1 + jitter * random.random())
+                await asyncio.sleep(delay)
+    return wrapper
+
+
+class AsyncLangChainWrap(LangChainWrap):
+    """
+    LangChainWrap client with an asyncio execution path.
+    """
+
+    @aretry_with_exponential_backoff
+    async def aexecute(self, cmd: LangChainCommand, **kwargs) -> LangChainCommand:
+        """
+        Submit a command for asynchronous execution.
+        :param cmd: the command instance.  Must implement arun().
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: The completed command instance.
+        """
+        log.debug(f"{cmd.session_id} | {cmd.cmd_name} | Request: {cmd}")
+
+        lc_project: str | None = kwargs.pop('lc_project', None)
+        with tracing_v2_enabled(lc_project):
+            start_time = time.time()
+            cmd_result: LangChainCommand = await cmd.arun(self, **kwargs)
+            end_time = time.time()
+            exec_time = end_time - start_time
+            cmd_result.exec_time = exec_time
+
+        log.debug(f"{cmd.session_id} | {cmd.cmd_name} | Response: {cmd_result}")
+
+        return cmd_result
+
+    async def astream(self, cmd: LangChainCommand, **kwargs) -> AsyncIterator[str]:
+        """
+        Submit a command for streaming execution.  Streams are not retried, as chunks may already have been consumed.
+        :param cmd: the command instance.  Must implement astream().
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an async iterator of response text chunks.
+        """
+        log.debug(f"{cmd.session_id} | {cmd.cmd_name} | Stream request: {cmd}")
+
+        lc_project: str | None = kwargs.pop('lc_project', None)
+        with tracing_v2_enabled(lc_project):
+            start_time = time.time()
+            async for chunk in cmd.astream(self, **kwargs):
+                yield chunk
+            cmd.exec_time = time.time() - start_time
+
+        log.debug(f"{cmd.session_id} | {cmd.cmd_name} | Stream complete: {cmd}")
+
+    def __str__(self):
+        return f"AsyncLangChainWrap()"
+
+    def __repr__(self):
+        return f"AsyncLangChainWrap()"
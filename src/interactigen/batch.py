@@ -0,0 +1,358 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import convert_to_messages
+
+from interacticore import LangChainCommand
+from interactigen.cache import ResponseCache
+from interactigen.instrumentation import token_usage
+
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import io
+import json
+import os
+import threading
+import uuid
+import logging
+
+# Initialize the logger.
+log = logging.getLogger('interactigenLogger')
+
+# The chat completions endpoint the job file lines address.
+batch_endpoint = '/v1/chat/completions'
+# The job statuses after which a job makes no further progress.
+terminal_statuses = frozenset({'completed', 'failed', 'expired', 'cancelled'})
+# The message roles of the job file, by LangChain message type.
+_roles = {'system': 'system', 'human': 'user', 'ai': 'assistant'}
+
+
+class BatchRequest(NamedTuple):
+    """
+    A command compiled into a batch job request.
+    """
+    custom_id: str
+    messages: list[dict]
+
+    @staticmethod
+    def of(custom_id: str, cmd: LangChainCommand, **kwargs) -> 'BatchRequest':
+        """
+        Compile a command into a batch request.
+        :param custom_id: The request ID, unique within the job.
+        :param cmd: The command instance.
+        :param kwargs: Additional prompt parameters passed through to the command.
+        :return: the batch request.
+        """
+        kwargs.pop('lc_project', None)
+        messages = cmd.get_prompt_template().format_messages(**cmd.inputs, **kwargs)
+        return BatchRequest(custom_id, [{'role': _roles.get(message.type, message.type), 'content': message.content}
+                                        for message in messages])
+
+
+class BatchResult(NamedTuple):
+    """
+    The outcome of a batch job request: the response text, or the error.
+    """
+    custom_id: str
+    text: str | None
+    error: str | None
+    usage: dict | None = None
+
+
+def request_line(request: BatchRequest, body: dict) -> dict:
+    """
+    Render a batch request as a job file line, in the OpenAI batch input format shared by several providers.
+    :param request: The batch request.
+    :param body: The request body parameters besides the messages, such as the model name.
+    :return: the job file line.
+    """
+    return {
+        'custom_id': request.custom_id,
+        'method': 'POST',
+        'url': batch_endpoint,
+        'body': {**body, 'messages': request.messages},
+    }
+
+
+def parse_result_line(line: dict) -> BatchResult:
+    """
+    Read a job output or error file line, in the OpenAI batch output format.
+    :param line: The output file line.
+    :return: the batch result.
+    """
+    custom_id = line.get('custom_id')
+    response = line.get('response') or {}
+    body = response.get('body') or {}
+    error = line.get('error') or body.get('error')
+    if error:
+        return BatchResult(custom_id, None, error.get('message', str(error)) if isinstance(error, dict) else str(error))
+    status_code = response.get('status_code', 200)
+    if status_code != 200:
+        return BatchResult(custom_id, None, f"HTTP {status_code}")
+    try:
+        text = body['choices'][0]['message']['content']
+    except (KeyError, IndexError, TypeError):
+        return BatchResult(custom_id, None, 'Response has no message content')
+    return BatchResult(custom_id, text, None, body.get('usage'))
+
+
+class BatchBackend(ABC):
+    """
+    Abstract provider batch API: submits a job of chat requests, reports its status, and returns its results.
+    """
+
+    @abstractmethod
+    def submit(self, requests: list[BatchRequest]) -> str:
+        """
+        Submit a batch job.
+        :param requests: The requests.
+        :return: the job ID.
+        """
+        pass
+
+    @abstractmethod
+    def status(self, job_id: str) -> str:
+        """
+        Get the status of a batch job.
+        :param job_id: The job ID.
+        :return: the status; one of terminal_statuses once the job makes no further progress.
+        """
+        pass
+
+    @abstractmethod
+    def results(self, job_id: str) -> list[BatchResult]:
+        """
+        Get the results of a finished batch job.  Requests the job did not complete have no result.
+        :param job_id: The job ID.
+        :return: the results.
+        """
+        pass
+
+    def cancel(self, job_id: str) -> None:
+        """
+        Cancel a batch job that is no longer awaited.  Default does nothing, leaving the job to run.
+        :param job_id: The job ID.
+        """
+        pass
+
+    @property
+    @abstractmethod
+    def _identifying_params(self) -> dict:
+        """
+        Identify the model serving the jobs, for the response cache and run journal keys.
+        """
+        pass
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    Local stand-in for a provider batch API, for testing batch runs.  Jobs are directories holding the job file,
+    output file and status, and are answered by a LangChain chat model in a background thread.
+    """
+
+    def __init__(self,
+                 *,
+                 directory: str,
+                 model: BaseChatModel,
+                 max_concurrency: int = 4,
+                 ):
+        """
+        Create a new instance.
+        :param directory: The directory holding the jobs.
+        :param model: The LangChain chat model answering the requests.
+        :param max_concurrency: The requests of a job answered at once.  Default is 4.
+        """
+        if not directory:
+            raise Exception('directory is required')
+        if not isinstance(model, BaseChatModel):
+            raise Exception('LocalBatchBackend requires a chat model')
+        self.directory = directory
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self._cancelled: set[str] = set()
+
+    def __str__(self):
+        return (f"LocalBatchBackend(" +
+                f"directory={self.directory}" +
+                f", max_concurrency={self.max_concurrency}" +
+                ")")
+
+    def __repr__(self):
+        return (f"LocalBatchBackend(" +
+                f"directory={self.directory!r}" +
+                f", model={self.model!r}" +
+                f", max_concurrency={self.max_concurrency!r}" +
+                ")")
+
+    @property
+    def _identifying_params(self) -> dict:
+        return ResponseCache.model_identity(self.model)
+
+    def _path(self, job_id: str, name: str) -> str:
+        return os.path.join(self.directory, job_id, name)
+
+    def _write_status(self, job_id: str, status: str) -> None:
+        # Replace the status file atomically so that a concurrent reader never sees it empty.
+        path = self._path(job_id, 'status')
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as status_file:
+            status_file.write(status)
+        os.replace(f"{path}.tmp", path)
+
+    def submit(self, requests: list[BatchRequest]) -> str:
+        job_id = f"batch_{uuid.uuid4().hex}"
+        os.makedirs(os.path.join(self.directory, job_id))
+        with open(self._path(job_id, 'input.jsonl'), 'w', encoding='utf-8') as input_file:
+            for request in requests:
+                input_file.write(json.dumps(request_line(request, {}), ensure_ascii=False) + '\n')
+        self._write_status(job_id, 'in_progress')
+        threading.Thread(target=self._process, args=(job_id,), name=f"interactigen-{job_id}", daemon=True).start()
+        return job_id
+
+    def _answer(self, line: dict) -> dict:
+        """
+        Answer a job file line.
+        :param line: The job file line.
+        :return: the output file line.
+        """
+        try:
+            result = self.model.generate([convert_to_messages(line['body']['messages'])])
+        except Exception as e:
+            return {'custom_id': line['custom_id'], 'response': None,
+                    'error': {'message': f"{type(e).__name__}: {e}"}}
+        body = {'choices': [{'message': {'role': 'assistant', 'content': result.generations[0][0].text}}]}
+        usage = token_usage(result)
+        if usage is not None:
+            body['usage'] = {'prompt_tokens': usage[0], 'completion_tokens': usage[1]}
+        return {'custom_id': line['custom_id'], 'response': {'status_code': 200, 'body': body}, 'error': None}
+
+    def _process(self, job_id: str) -> None:
+        """
+        Answer every request of a job and publish the output file.
+        :param job_id: The job ID.
+        """
+        try:
+            with open(self._path(job_id, 'input.jsonl'), encoding='utf-8') as input_file:
+                lines = [json.loads(line) for line in input_file if line.strip()]
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                outputs = list(pool.map(self._answer, lines))
+            if job_id in self._cancelled:
+                return
+            with open(self._path(job_id, 'output.jsonl'), 'w', encoding='utf-8') as output_file:
+                for output in outputs:
+                    output_file.write(json.dumps(output, ensure_ascii=False) + '\n')
+            self._write_status(job_id, 'completed')
+        except Exception as e:
+            log.error(f"Batch job {job_id} failed: {e}")
+            self._write_status(job_id, 'failed')
+
+    def status(self, job_id: str) -> str:
+        with open(self._path(job_id, 'status'), encoding='utf-8') as status_file:
+            return status_file.read().strip()
+
+    def cancel(self, job_id: str) -> None:
+        self._cancelled.add(job_id)
+        self._write_status(job_id, 'cancelled')
+
+    def results(self, job_id: str) -> list[BatchResult]:
+        if not os.path.exists(self._path(job_id, 'output.jsonl')):
+            return []
+        with open(self._path(job_id, 'output.jsonl'), encoding='utf-8') as output_file:
+            return [parse_result_line(json.loads(line)) for line in output_file if line.strip()]
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """
+    Batch API of OpenAI and compatible providers.  Requires the openai package.
+    """
+
+    def __init__(self,
+                 *,
+                 model: str,
+                 client=None,
+                 completion_window: str = '24h',
+                 **params,
+                 ):
+        """
+        Create a new instance.
+        :param model: The model name.
+        :param client: The openai.OpenAI client.  Default is a new client configured from the environment.
+        :param completion_window: The time frame within which the jobs should be processed.  Default is '24h'.
+        :param params: Additional request body parameters, such as temperature.
+        """
+        if client is None:
+            try:
+                import openai
+            except ImportError as e:
+                raise Exception('OpenAIBatchBackend requires the openai package') from e
+            client = openai.OpenAI()
+        self.model = model
+        self.client = client
+        self.completion_window = completion_window
+        self.params = params
+
+    def __str__(self):
+        return (f"OpenAIBatchBackend(" +
+                f"model={self.model}" +
+                f", completion_window={self.completion_window}" +
+                ")")
+
+    def __repr__(self):
+        return (f"OpenAIBatchBackend(" +
+                f"model={self.model!r}" +
+                f", completion_window={self.completion_window!r}" +
+                f", params={self.params!r}" +
+                ")")
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {'model': self.model, **self.params}
+
+    def submit(self, requests: list[BatchRequest]) -> str:
+        body = {'model': self.model, **self.params}
+        job_file = io.BytesIO(b''.join(
+            (json.dumps(request_line(request, body), ensure_ascii=False) + '\n').encode('utf-8')
+            for request in requests
+        ))
+        uploaded = self.client.files.create(file=('interactigen-batch.jsonl', job_file), purpose='batch')
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=batch_endpoint,
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    def status(self, job_id: str) -> str:
+        return self.client.batches.retrieve(job_id).status
+
+    def cancel(self, job_id: str) -> None:
+        self.client.batches.cancel(job_id)
+
+    def results(self, job_id: str) -> list[BatchResult]:
+        batch = self.client.batches.retrieve(job_id)
+        results = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                results.extend(parse_result_line(json.loads(line))
+                               for line in self.client.files.content(file_id).text.splitlines() if line.strip())
+        return results
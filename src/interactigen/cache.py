@@ -0,0 +1,196 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interacticore import LangChainCommand
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import logging
+
+# Initialize the logger.
+log = logging.getLogger('interactigenLogger')
+
+
+class ResponseCache:
+    """
+    Persistent, content-addressed cache of parsed LLM command results backed by a local SQLite file.
+    """
+
+    def __init__(self,
+                 *,
+                 path: str = '.interactigen_cache.sqlite3',
+                 max_entries: int | None = None,
+                 ttl: float | None = None,
+                 ):
+        """
+        Create a new instance.
+        :param path: The SQLite database file path.  Use ':memory:' for a process-local cache.
+        :param max_entries: The maximum number of entries to keep.  Least recently used entries are evicted first.
+        :param ttl: The time-to-live of an entry in seconds.  Default is no expiry.
+        """
+        if max_entries is not None and max_entries < 1:
+            raise Exception('max_entries must be at least 1')
+        if ttl is not None and ttl <= 0:
+            raise Exception('ttl must be positive')
+
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, "
+                "cmd_name TEXT NOT NULL, "
+                "value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def __str__(self):
+        return (f"ResponseCache(path={self.path}" +
+                f", max_entries={self.max_entries}" +
+                f", ttl={self.ttl}" +
+                f", hits={self.hits}" +
+                f", misses={self.misses}" +
+                ")")
+
+    def __repr__(self):
+        return (f"ResponseCache(path={self.path!r}" +
+                f", max_entries={self.max_entries!r}" +
+                f", ttl={self.ttl!r}" +
+                f", hits={self.hits!r}" +
+                f", misses={self.misses!r}" +
+                ")")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def model_identity(model) -> dict:
+        """
+        Describe a LangChain model by its type and identifying parameters, which include sampling parameters.
+        :param model: The LangChain model.
+        :return: the model identity.
+        """
+        if model is None:
+            return {}
+        return {
+            'type': f"{type(model).__module__}.{type(model).__qualname__}",
+            'params': getattr(model, '_identifying_params', {}),
+        }
+
+    @staticmethod
+    def key_for(cmd: LangChainCommand, *, model=None, **kwargs) -> str:
+        """
+        Compute the content address for a command.
+        :param cmd: The command instance.
+        :param model: The LangChain model that would execute the command.
+        :param kwargs: Additional prompt parameters passed through to the command.
+        :return: the cache key.
+        """
+        kwargs.pop('lc_project', None)
+        messages = cmd.get_prompt_template().format_messages(**cmd.inputs, **kwargs)
+        material = {
+            'cmd_name': cmd.cmd_name,
+            'prompt': [[message.type, message.content] for message in messages],
+            'model': ResponseCache.model_identity(model),
+        }
+        encoded = json.dumps(material, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def get(self, key: str):
+        """
+        Look up a cached result.
+        :param key: The cache key.
+        :return: the cached result, or None on a miss.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, cmd_name: str, value) -> None:
+        """
+        Store a result, evicting expired and least recently used entries as needed.
+        :param key: The cache key.
+        :param cmd_name: The command name.
+        :param value: The JSON-serializable result.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, cmd_name, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, cmd_name, json.dumps(value), now, now),
+            )
+            if self.ttl is not None:
+                self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            if self.max_entries is not None:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def stats(self) -> dict:
+        """
+        Get the cache counters.
+        :return: the hit, miss and entry counts.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self),
+        }
+
+    def clear(self) -> None:
+        """
+        Remove all entries and reset the counters.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+        self.hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
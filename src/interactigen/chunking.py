@@ -0,0 +1,66 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from collections.abc import Callable
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheaply estimate the token count of a text using the common four-characters-per-token heuristic.
+    :param text: The text.
+    :return: the estimated token count.
+    """
+    return len(text) // 4 + 1
+
+
+def chunk_utterances(utterances: list[str],
+                     *,
+                     token_budget: int | None,
+                     estimator: Callable[[str], int] = estimate_tokens,
+                     ) -> list[list[str]]:
+    """
+    Split utterances into consecutive chunks whose estimated size stays within a token budget.  An utterance that
+    exceeds the budget on its own forms a single-element chunk.
+    :param utterances: The utterances.
+    :param token_budget: The estimated token budget per chunk.  None disables chunking.
+    :param estimator: The token estimator.
+    :return: the chunks, in the original order.
+    """
+    if token_budget is None or not utterances:
+        return [utterances]
+    if token_budget < 1:
+        raise Exception('token_budget must be at least 1')
+
+    chunks: list[list[str]] = []
+    chunk: list[str] = []
+    chunk_tokens = 0
+    for utterance in utterances:
+        # Account for the quoting and separator each list element adds to the rendered prompt.
+        utterance_tokens = estimator(utterance) + 1
+        if chunk and chunk_tokens + utterance_tokens > token_budget:
+            chunks.append(chunk)
+            chunk = []
+            chunk_tokens = 0
+        chunk.append(utterance)
+        chunk_tokens += utterance_tokens
+    chunks.append(chunk)
+    return chunks
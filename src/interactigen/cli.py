@@ -0,0 +1,363 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import argparse
+import csv
+import hashlib
+import importlib
+import json
+import logging
+import os
+import sys
+
+# Initialize the logger.
+log = logging.getLogger('interactigenLogger')
+
+# The client of each worker process, created by _init_worker().
+_worker_client = None
+_worker_options: dict = {}
+
+
+class IntentRecord:
+    """
+    A base phrase to generate utterances for, with its optional intent name.
+    """
+
+    def __init__(self,
+                 *,
+                 base_phrase: str,
+                 intent: str | None = None,
+                 ):
+        """
+        Create a new instance.
+        :param base_phrase: The intent base phrase.
+        :param intent: The intent name.  Default is the base phrase.
+        """
+        if not base_phrase:
+            raise Exception('base_phrase is required')
+        self.base_phrase = base_phrase
+        self.intent = intent or base_phrase
+
+    def shard(self, count: int) -> int:
+        """
+        Get the shard owning this intent.  Assignment hashes the intent name, so it is stable across input order,
+        processes and machines.
+        :param count: The number of shards.
+        :return: the shard index, from 0.
+        """
+        digest = hashlib.blake2b(self.intent.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest) % count
+
+    def __str__(self):
+        return (f"IntentRecord(intent={self.intent}" +
+                f", base_phrase={self.base_phrase}" +
+                ")")
+
+    def __repr__(self):
+        return (f"IntentRecord(intent={self.intent!r}" +
+                f", base_phrase={self.base_phrase!r}" +
+                ")")
+
+
+def read_intents(path: str, *, phrase_field: str = 'base_phrase', intent_field: str = 'intent') -> list[IntentRecord]:
+    """
+    Read intents from a CSV file with a header row, or from JSONL.
+    :param path: The file path, or '-' for JSONL on stdin.
+    :param phrase_field: The column or key holding the base phrase.
+    :param intent_field: The column or key holding the optional intent name.
+    :return: the intents, in file order.
+    """
+    def records(rows: Iterable[dict]) -> list[IntentRecord]:
+        return [IntentRecord(base_phrase=row[phrase_field], intent=row.get(intent_field)) for row in rows
+                if row.get(phrase_field)]
+
+    if path == '-':
+        return records(json.loads(line) for line in sys.stdin if line.strip())
+    with open(path, newline='', encoding='utf-8') as file:
+        if path.lower().endswith('.csv'):
+            reader = csv.DictReader(file)
+            if reader.fieldnames is None or phrase_field not in reader.fieldnames:
+                raise Exception(f"{path} has no '{phrase_field}' column")
+            return records(reader)
+        return records(json.loads(line) for line in file if line.strip())
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """
+    Parse a shard specification.
+    :param value: The shard, as 'i/N' with i from 0 to N-1.
+    :return: the shard index and count.
+    """
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard must look like i/N, not '{value}'")
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be between 0 and {count - 1}")
+    return index, count
+
+
+def load_model(spec: str, model_kwargs: dict):
+    """
+    Create a LangChain model from an import path.
+    :param spec: The model factory as 'package.module:name', e.g. 'langchain_openai:ChatOpenAI'.
+    :param model_kwargs: The factory keyword arguments.
+    :return: the model.
+    """
+    module_name, _, attr = spec.partition(':')
+    if not module_name or not attr:
+        raise Exception(f"model must look like package.module:name, not '{spec}'")
+    factory = getattr(importlib.import_module(module_name), attr)
+    return factory(**model_kwargs)
+
+
+def _init_worker(options: dict) -> None:
+    """
+    Create the client of a worker process.
+    :param options: The generation options.
+    """
+    global _worker_client, _worker_options
+    from interactigen import Interactigen, LocalTransformEngine
+
+    _worker_options = options
+    _worker_client = Interactigen(
+        model=load_model(options['model'], options['model_kwargs']),
+        max_concurrency=options['max_concurrency'],
+        intent_pack_size=options['intent_pack_size'],
+        local_transforms=LocalTransformEngine() if options['local_transforms'] else None,
+    )
+
+
+def _generate_batch(batch: list[tuple[str, str]]) -> list[dict]:
+    """
+    Generate the utterances of a batch of intents in a worker process.  The intents of a batch run concurrently.
+    :param batch: The (intent, base_phrase) pairs.
+    :return: the output records.
+    """
+    intents: dict[str, list[str]] = {}
+    for intent, base_phrase in batch:
+        intents.setdefault(base_phrase, []).append(intent)
+    return [
+        {
+            'intent': intents[result.base_phrase].pop(0),
+            'base_phrase': result.base_phrase,
+            'utterances': result.utterances,
+            'error': None if result.ok else f"{type(result.error).__name__}: {result.error}",
+        }
+        for result in _worker_client.generate_dataset(
+            [base_phrase for _, base_phrase in batch],
+            init_quantity=_worker_options['init_quantity'],
+            media_type=_worker_options['media_type'],
+            target_unique=_worker_options['target_unique'],
+        )
+    ]
+
+
+def _batches(intents: list[IntentRecord], size: int) -> Iterator[list[tuple[str, str]]]:
+    """
+    Split intents into worker batches.
+    :param intents: The intents.
+    :param size: The batch size.
+    :return: an iterator of (intent, base_phrase) batches.
+    """
+    for start in range(0, len(intents), size):
+        yield [(record.intent, record.base_phrase) for record in intents[start:start + size]]
+
+
+def _open_output(path: str):
+    """
+    Open an output file, or stdout for '-'.
+    :param path: The output path.
+    :return: the writable text file.
+    """
+    if path == '-':
+        return open(sys.stdout.fileno(), 'w', encoding='utf-8', closefd=False)
+    return open(path, 'w', encoding='utf-8')
+
+
+def generate(args) -> int:
+    """
+    Generate the utterances of this shard's intents with a pool of worker processes.
+    :param args: The parsed arguments.
+    :return: the exit status: 1 if any intent failed.
+    """
+    shard_index, shard_count = args.shard
+    intents = [record for record in read_intents(args.input, phrase_field=args.phrase_field,
+                                                 intent_field=args.intent_field)
+               if record.shard(shard_count) == shard_index]
+    options = {
+        'model': args.model,
+        'model_kwargs': json.loads(args.model_kwargs),
+        'max_concurrency': args.max_concurrency,
+        'intent_pack_size': args.intent_pack_size,
+        'local_transforms': args.local_transforms,
+        'init_quantity': args.init_quantity,
+        'media_type': args.media_type,
+        'target_unique': args.target_unique,
+    }
+    log.info(f"Shard {shard_index}/{shard_count}: {len(intents)} intents on {args.workers} workers")
+
+    failures = 0
+    with _open_output(args.output) as output:
+        def write(records: list[dict]) -> None:
+            nonlocal failures
+            for record in records:
+                record['shard'] = f"{shard_index}/{shard_count}"
+                failures += record['error'] is not None
+                output.write(json.dumps(record, ensure_ascii=False) + '\n')
+            output.flush()
+
+        if args.workers == 1:
+            _init_worker(options)
+            for batch in _batches(intents, args.batch_size):
+                write(_generate_batch(batch))
+        else:
+            with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                     initargs=(options,)) as pool:
+                futures = [pool.submit(_generate_batch, batch) for batch in _batches(intents, args.batch_size)]
+                for future in as_completed(futures):
+                    write(future.result())
+
+    if failures:
+        log.warning(f"Shard {shard_index}/{shard_count}: {failures} intents failed")
+    return 1 if failures else 0
+
+
+def _read_outputs(paths: list[str]) -> list[dict]:
+    """
+    Read generate outputs.
+    :param paths: The output file paths.
+    :return: the records, sorted by intent for a merge independent of shard and completion order.
+    """
+    records = []
+    for path in paths:
+        with open(path, encoding='utf-8') as file:
+            records.extend(json.loads(line) for line in file if line.strip())
+    records.sort(key=lambda record: (record['intent'], record['base_phrase']))
+    return records
+
+
+def merge(args) -> int:
+    """
+    Merge per-shard outputs, removing duplicates across every intent.
+    :param args: The parsed arguments.
+    :return: the exit status: 1 if an intent base phrase appears in several outputs.
+    """
+    from interactigen import ExactDuplicateIndex, NearDuplicateIndex, normalize_utterance
+
+    if args.near_threshold is not None:
+        index = NearDuplicateIndex(threshold=args.near_threshold)
+    else:
+        index = ExactDuplicateIndex(normalizer=normalize_utterance if args.normalize else None)
+
+    records = _read_outputs(args.inputs)
+    seen = set()
+    conflicts = 0
+    removed = 0
+    with _open_output(args.output) as output:
+        for record in records:
+            key = (record['intent'], record['base_phrase'])
+            if key in seen:
+                log.warning(f"Intent '{record['intent']}' base phrase '{record['base_phrase']}' appears in several "
+                            f"outputs; keeping the first")
+                conflicts += 1
+                continue
+            seen.add(key)
+            if record.get('error') and args.skip_errors:
+                continue
+            utterances = index.filter(record['utterances'], label=record['intent'])
+            removed += len(record['utterances']) - len(utterances)
+            output.write(json.dumps({**record, 'utterances': utterances}, ensure_ascii=False) + '\n')
+
+    log.info(f"Merged {len(seen)} base phrases: {len(index)} utterances kept, {removed} duplicates removed")
+    return 1 if conflicts else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command line parser.
+    :return: the parser.
+    """
+    parser = argparse.ArgumentParser(prog='interactigen', description='Generate interactional training data.')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log progress to stderr.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    gen_parser = subparsers.add_parser('generate', help="Generate utterances for this shard's intents.")
+    gen_parser.add_argument('input', help="The intents, as CSV with a header row or JSONL.  '-' reads JSONL from "
+                                          "stdin.")
+    gen_parser.add_argument('-o', '--output', default='-', help="The JSONL output path.  Default is stdout.")
+    gen_parser.add_argument('--model', required=True,
+                            help="The LangChain model factory, e.g. 'langchain_openai:ChatOpenAI'.")
+    gen_parser.add_argument('--model-kwargs', default='{}', help='The model factory keyword arguments, as JSON.')
+    gen_parser.add_argument('--shard', type=parse_shard, default=(0, 1),
+                            help="The shard to process, as i/N.  Intents are assigned by a hash of their name.")
+    gen_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='The worker processes.  Default is the CPU count.')
+    gen_parser.add_argument('--batch-size', type=int, default=16,
+                            help='The intents handed to a worker at a time.  Default is 16.')
+    gen_parser.add_argument('--max-concurrency', type=int, default=4,
+                            help='The in-flight model calls per worker.  Default is 4.')
+    gen_parser.add_argument('--intent-pack-size', type=int, default=1,
+                            help='The intents whose initial utterances are requested in one call.  Default is 1.')
+    gen_parser.add_argument('--init-quantity', type=int, default=10,
+                            help='The initial utterances per intent.  Default is 10.')
+    gen_parser.add_argument('--target-unique', type=int, default=None,
+                            help='Stop each intent at this many unique utterances, skipping the remaining transforms '
+                                 'or requesting more phrasings as needed.')
+    gen_parser.add_argument('--media-type', default='voice', help="The media type.  Default is 'voice'.")
+    gen_parser.add_argument('--local-transforms', action='store_true',
+                            help='Apply the mechanical transforms locally instead of with the model.')
+    gen_parser.add_argument('--phrase-field', default='base_phrase',
+                            help="The column or key holding the base phrase.  Default is 'base_phrase'.")
+    gen_parser.add_argument('--intent-field', default='intent',
+                            help="The column or key holding the intent name.  Default is 'intent'.")
+    gen_parser.set_defaults(func=generate)
+
+    merge_parser = subparsers.add_parser('merge', help='Merge shard outputs with global dedup.')
+    merge_parser.add_argument('inputs', nargs='+', help='The shard output files.')
+    merge_parser.add_argument('-o', '--output', default='-', help='The merged JSONL output path.  Default is stdout.')
+    merge_parser.add_argument('--normalize', action='store_true',
+                              help='Ignore case, punctuation and whitespace when detecting duplicates.')
+    merge_parser.add_argument('--near-threshold', type=float,
+                              help='Also remove near-duplicates at this estimated Jaccard similarity.')
+    merge_parser.add_argument('--skip-errors', action='store_true', help='Drop intents that failed to generate.')
+    merge_parser.set_defaults(func=merge)
+
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Run the interactigen command line.
+    :param argv: The command line arguments.  Default is sys.argv.
+    :return: the exit status.
+    """
+    args = build_parser().parse_args(argv)
+    if args.verbose:
+        logging.basicConfig(format='%(asctime)s %(levelname)s %(message)s')
+        log.setLevel(logging.INFO)
+    if getattr(args, 'workers', 1) < 1 or getattr(args, 'batch_size', 1) < 1:
+        raise Exception('workers and batch-size must be at least 1')
+    return args.func(args)
@@ -20,5 +20,44 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from .gen_new_phrasings import GenNewPhrasings
-from .gen_transformed_phrasings import GenTransformedPhrasings
+# Commands are imported from their modules on first access; each module loads interacticore.
+
+from typing import TYPE_CHECKING
+
+import importlib
+
+if TYPE_CHECKING:
+    from .async_chat_command import AsyncChatCommand
+    from .gen_new_phrasings import GenNewPhrasings
+    from .gen_multi_new_phrasings import GenMultiNewPhrasings
+    from .gen_transformed_phrasings import GenTransformedPhrasings
+    from .gen_multi_transformed_phrasings import GenMultiTransformedPhrasings
+
+# The module defining each command.
+_lazy_imports = {
+    'AsyncChatCommand': '.async_chat_command',
+    'GenNewPhrasings': '.gen_new_phrasings',
+    'GenMultiNewPhrasings': '.gen_multi_new_phrasings',
+    'GenTransformedPhrasings': '.gen_transformed_phrasings',
+    'GenMultiTransformedPhrasings': '.gen_multi_transformed_phrasings',
+}
+
+__all__ = list(_lazy_imports)
+
+
+def __getattr__(name: str):
+    """
+    Import a command from its module on first access.
+    :param name: The attribute name.
+    :return: the attribute value.
+    """
+    module_name = _lazy_imports.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_imports))
@@ -0,0 +1,119 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
+
+from interacticore import ChatCommand, LangChainCommand, LangChainWrap
+
+from collections.abc import AsyncIterator
+
+import functools
+
+
+@functools.lru_cache(maxsize=64)
+def _build_prompt_template(sys_prompt: str, user_prompt_tmpl: str) -> ChatPromptTemplate:
+    """
+    Build a chat prompt template once per system prompt and user prompt template.
+    :param sys_prompt: The system prompt.
+    :param user_prompt_tmpl: The user prompt template.
+    :return: the chat prompt template.
+    """
+    return ChatPromptTemplate.from_messages(
+        [
+            SystemMessage(content=sys_prompt),
+            HumanMessagePromptTemplate.from_template(user_prompt_tmpl),
+        ]
+    )
+
+
+class AsyncChatCommand(ChatCommand):
+    """
+    Command object for Chat Model chain invocations with native asyncio support.
+
+    The reserved lc_callbacks parameter passes LangChain callback handlers to the chain rather than to the prompt.
+    """
+
+    def get_prompt_template(self) -> ChatPromptTemplate:
+        """
+        Get the chat prompt template, shared by every command with the same prompts.
+        :return: the chat prompt template.
+        """
+        return _build_prompt_template(self.sys_prompt, self.user_prompt_tmpl)
+
+    def run(self, client: LangChainWrap, **kwargs) -> LangChainCommand:
+        """
+        Execute the command logic with the chat model's invoke.
+        :param client: The LangChainWrap client.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: The completed command instance.
+        """
+        callbacks = kwargs.pop('lc_callbacks', None)
+        base_chain = self.get_prompt_template() | client.chat | self.output_parser
+
+        base_chain_result = base_chain.invoke({
+            **self.inputs,
+            **kwargs,
+        }, config={'callbacks': callbacks})
+        self.result = base_chain_result
+        return self
+
+    async def arun(self, client: LangChainWrap, **kwargs) -> LangChainCommand:
+        """
+        Execute the command logic with the chat model's ainvoke.
+        :param client: The LangChainWrap client.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: The completed command instance.
+        """
+        callbacks = kwargs.pop('lc_callbacks', None)
+        base_chain = self.get_prompt_template() | client.chat | self.output_parser
+
+        base_chain_result = await base_chain.ainvoke({
+            **self.inputs,
+            **kwargs,
+        }, config={'callbacks': callbacks})
+        self.result = base_chain_result
+        return self
+
+    async def astream(self, client: LangChainWrap, **kwargs) -> AsyncIterator[str]:
+        """
+        Stream the raw model response text.  The output parser is not applied.
+        :param client: The LangChainWrap client.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an async iterator of response text chunks.
+        """
+        callbacks = kwargs.pop('lc_callbacks', None)
+        base_chain = self.get_prompt_template() | client.chat
+
+        async for chunk in base_chain.astream({
+            **self.inputs,
+            **kwargs,
+        }, config={'callbacks': callbacks}):
+            yield chunk.content
+
+    def __str__(self):
+        return (f"AsyncChatCommand(super={super().__str__()}" +
+                ")")
+
+    def __repr__(self):
+        return (f"AsyncChatCommand(super={super().__repr__()}" +
+                ")")
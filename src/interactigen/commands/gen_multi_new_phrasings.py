@@ -0,0 +1,128 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from interactigen.commands.async_chat_command import AsyncChatCommand
+from interactigen.salvage import SalvagingJsonOutputParser
+from interactigen import MultiPhraseUtterances
+
+import functools
+
+# The system prompt heading.
+sys_prompt_hdr = ("You are a helpful assistant that generates high-quality training data for use with voice and text "
+                  "bots.")
+
+# The user prompt template.
+user_prompt_tmpl = ("For each of the following numbered phrases, separately generate {quantity} semantically diverse "
+                    "ways to express it:\n\n{base_phrases}")
+
+
+@functools.cache
+def _build_prompt() -> tuple[SalvagingJsonOutputParser, str]:
+    """
+    Build the output parser and final system prompt on first use, rather than at import time.
+    :return: the output parser and system prompt.
+    """
+    parser = SalvagingJsonOutputParser(pydantic_object=MultiPhraseUtterances, salvage_group='phrase')
+    return parser, f"{sys_prompt_hdr}.\n\n{parser.get_format_instructions()}"
+
+
+def __getattr__(name: str):
+    """
+    Resolve the lazily built output_parser and sys_prompt module attributes.
+    :param name: The attribute name.
+    :return: the attribute value.
+    """
+    if name == 'output_parser':
+        return _build_prompt()[0]
+    if name == 'sys_prompt':
+        return _build_prompt()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class GenMultiNewPhrasings(AsyncChatCommand):
+    """
+    Command object for generating new phrases for several base phrases in a single call.
+    """
+    def __init__(self,
+                 *,
+                 session_id: str = None,
+                 base_phrases: list[str] = None,
+                 quantity: int = None,
+                 ):
+        """
+        Construct a new instance.
+        :param session_id: The session ID.
+        :param base_phrases: The base instructional phrases, each phrased independently.
+        :param quantity: The phrasing quantity per base phrase.
+        """
+        output_parser, sys_prompt = _build_prompt()
+        super().__init__(
+            session_id=session_id,
+            cmd_name='GenMultiNewPhrasings',
+            sys_prompt=sys_prompt,
+            user_prompt_tmpl=user_prompt_tmpl,
+            output_parser=output_parser,
+        )
+        if not base_phrases:
+            raise Exception("base_phrases is required")
+        if quantity is None:
+            raise Exception("quantity is required")
+
+        self.base_phrases = base_phrases
+        self.quantity = quantity
+        self.inputs = {
+            "base_phrases": "\n".join(
+                f"{idx}. {base_phrase}" for idx, base_phrase in enumerate(self.base_phrases, start=1)
+            ),
+            "quantity": self.quantity,
+        }
+
+    def get_phrase_utterances(self) -> dict[str, list[str]]:
+        """
+        Key the parsed result by base phrase.  Phrases the model skipped are absent from the result.
+        :return: the generated utterances per base phrase.
+        """
+        generated: dict[str, list[str]] = {}
+        for entry in (self.result or {}).get('phrases', []):
+            if not isinstance(entry, dict):
+                continue
+            try:
+                idx = int(entry.get('phrase'))
+            except (TypeError, ValueError):
+                continue
+            utterances = entry.get('utterances')
+            if 1 <= idx <= len(self.base_phrases) and isinstance(utterances, list):
+                generated.setdefault(self.base_phrases[idx - 1], []).extend(utterances)
+        return generated
+
+    def __str__(self):
+        return (f"GenMultiNewPhrasings(super={super().__str__()}" +
+                f", base_phrases={self.base_phrases}" +
+                f", quantity={self.quantity}" +
+                ")")
+
+    def __repr__(self):
+        return (f"GenMultiNewPhrasings(super={super().__repr__()}" +
+                f", base_phrases={self.base_phrases!r}" +
+                f", quantity={self.quantity!r}" +
+                ")")
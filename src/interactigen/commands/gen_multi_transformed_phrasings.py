@@ -0,0 +1,127 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen.commands.async_chat_command import AsyncChatCommand
+from interactigen.salvage import SalvagingJsonOutputParser
+from interactigen import PhraseTransformsUtterances
+
+import functools
+
+# The system prompt heading.
+sys_prompt_hdr = ("You are a helpful assistant that generates high-quality training data for use with voice and text "
+                  "bots.")
+
+# The user prompt template.
+user_prompt_tmpl = ("Here is a list of utterances:\n\n{utterances}\n\nFor each of the following numbered instructions, "
+                    "separately repeat these examples, but apply the instruction:\n\n{transform_instructions}")
+
+
+@functools.cache
+def _build_prompt() -> tuple[SalvagingJsonOutputParser, str]:
+    """
+    Build the output parser and final system prompt on first use, rather than at import time.
+    :return: the output parser and system prompt.
+    """
+    parser = SalvagingJsonOutputParser(pydantic_object=PhraseTransformsUtterances)
+    return parser, f"{sys_prompt_hdr}.\n\n{parser.get_format_instructions()}"
+
+
+def __getattr__(name: str):
+    """
+    Resolve the lazily built output_parser and sys_prompt module attributes.
+    :param name: The attribute name.
+    :return: the attribute value.
+    """
+    if name == 'output_parser':
+        return _build_prompt()[0]
+    if name == 'sys_prompt':
+        return _build_prompt()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class GenMultiTransformedPhrasings(AsyncChatCommand):
+    """
+    Command object for applying several transformation instructions to utterances in a single call.
+    """
+    def __init__(self,
+                 *,
+                 session_id: str = None,
+                 utterances: list[str] = None,
+                 transform_phrases: list[str] = None,
+                 ):
+        """
+        Construct a new instance.
+        :param session_id: The session ID.
+        :param utterances: The utterances.
+        :param transform_phrases: The phrase instructions to transform the utterances, applied independently.
+        """
+        output_parser, sys_prompt = _build_prompt()
+        super().__init__(
+            session_id=session_id,
+            cmd_name='GenMultiTransformedPhrasings',
+            sys_prompt=sys_prompt,
+            user_prompt_tmpl=user_prompt_tmpl,
+            output_parser=output_parser,
+        )
+        if utterances is None:
+            raise Exception("utterances is required")
+        if not transform_phrases:
+            raise Exception("transform_phrases is required")
+
+        self.utterances = utterances
+        self.transform_phrases = transform_phrases
+        self.inputs = {
+            "utterances": self.utterances,
+            "transform_instructions": "\n".join(
+                f"{idx}. {transform_phrase}" for idx, transform_phrase in enumerate(self.transform_phrases, start=1)
+            ),
+        }
+
+    def get_transformed_utterances(self) -> dict[str, list[str]]:
+        """
+        Key the parsed result by transform phrase.  Instructions the model skipped are absent from the result.
+        :return: the transformed utterances per transform phrase.
+        """
+        transformed: dict[str, list[str]] = {}
+        for entry in (self.result or {}).get('transforms', []):
+            if not isinstance(entry, dict):
+                continue
+            try:
+                idx = int(entry.get('transform'))
+            except (TypeError, ValueError):
+                continue
+            utterances = entry.get('utterances')
+            if 1 <= idx <= len(self.transform_phrases) and isinstance(utterances, list):
+                transformed.setdefault(self.transform_phrases[idx - 1], []).extend(utterances)
+        return transformed
+
+    def __str__(self):
+        return (f"GenMultiTransformedPhrasings(super={super().__str__()}" +
+                f", utterances={self.utterances}" +
+                f", transform_phrases={self.transform_phrases}" +
+                ")")
+
+    def __repr__(self):
+        return (f"GenMultiTransformedPhrasings(super={super().__repr__()}" +
+                f", utterances={self.utterances!r}" +
+                f", transform_phrases={self.transform_phrases!r}" +
+                ")")
@@ -20,9 +20,12 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from interacticore import BrokenJsonOutputParser, ChatCommand
+from interactigen.commands.async_chat_command import AsyncChatCommand
+from interactigen.salvage import SalvagingJsonOutputParser
 from interactigen import PhraseUtterances
 
+import functools
+
 # The system prompt heading.
 sys_prompt_hdr = ("You are a helpful assistant that generates high-quality training data for use with voice and text "
                   "bots.")
@@ -31,12 +34,31 @@ sys_prompt_hdr = ("You are a helpful assistant that generates high-quality train
 user_prompt_tmpl = ("Here is a list of utterances:\n\n{utterances}\n\nPlease repeat these examples, "
                     "but {transform_phrase}")
 
-# The output parser and final system prompt.
-output_parser = BrokenJsonOutputParser(pydantic_object=PhraseUtterances)
-sys_prompt = f"{sys_prompt_hdr}.\n\n{output_parser.get_format_instructions()}"
+
+@functools.cache
+def _build_prompt() -> tuple[SalvagingJsonOutputParser, str]:
+    """
+    Build the output parser and final system prompt on first use, rather than at import time.
+    :return: the output parser and system prompt.
+    """
+    parser = SalvagingJsonOutputParser(pydantic_object=PhraseUtterances)
+    return parser, f"{sys_prompt_hdr}.\n\n{parser.get_format_instructions()}"
+
+
+def __getattr__(name: str):
+    """
+    Resolve the lazily built output_parser and sys_prompt module attributes.
+    :param name: The attribute name.
+    :return: the attribute value.
+    """
+    if name == 'output_parser':
+        return _build_prompt()[0]
+    if name == 'sys_prompt':
+        return _build_prompt()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-class GenTransformedPhrasings(ChatCommand):
+class GenTransformedPhrasings(AsyncChatCommand):
     """
     Command object for transforming utterances based on instructions based on instructions.
     """
@@ -52,6 +74,7 @@ class GenTransformedPhrasings(ChatCommand):
         :param utterances: The utterances.
         :param transform_phrase: The phrase instructions to transform the utterances.
         """
+        output_parser, sys_prompt = _build_prompt()
         super().__init__(
             session_id=session_id,
             cmd_name='GenTransformedPhrasings',
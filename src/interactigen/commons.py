@@ -22,7 +22,81 @@
 
 from langchain_core.pydantic_v1 import BaseModel, Field
 
+from typing import NamedTuple
+
 
 # Define Generate Phrase Utterances Response Format and Parser
 class PhraseUtterances(BaseModel):
     utterances: list[str] = Field(description="The array of generated utterances.", examples=["Hello", "Hi", "Hey"])
+
+
+# Define Generate Multi-Transform Utterances Response Format and Parser
+class TransformUtterances(BaseModel):
+    transform: int = Field(description="The number of the instruction applied to the utterances.", examples=[1])
+    utterances: list[str] = Field(description="The array of transformed utterances.", examples=["Hello", "Hi", "Hey"])
+
+
+class PhraseTransformsUtterances(BaseModel):
+    transforms: list[TransformUtterances] = Field(description="The array of transformed utterances per instruction.")
+
+
+# Define Generate Multi-Phrase Utterances Response Format and Parser
+class NumberedPhraseUtterances(BaseModel):
+    phrase: int = Field(description="The number of the phrase the utterances express.", examples=[1])
+    utterances: list[str] = Field(description="The array of generated utterances.", examples=["Hello", "Hi", "Hey"])
+
+
+class MultiPhraseUtterances(BaseModel):
+    phrases: list[NumberedPhraseUtterances] = Field(description="The array of generated utterances per phrase.")
+
+
+class DatasetResult:
+    """
+    The generated utterances for a single intent of a bulk dataset run.
+    """
+
+    def __init__(self,
+                 *,
+                 base_phrase: str,
+                 utterances: list[str] = None,
+                 error: Exception = None,
+                 records: int = 0,
+                 ):
+        """
+        Create a new instance.
+        :param base_phrase: The intent base phrase.
+        :param utterances: The generated utterances.  Empty when generation failed or was written to a sink.
+        :param error: The exception raised while generating this intent, if any.
+        :param records: The number of records written to a dataset sink, when writing to one.
+        """
+        self.base_phrase = base_phrase
+        self.utterances = utterances if utterances is not None else []
+        self.error = error
+        self.records = records
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __str__(self):
+        return (f"DatasetResult(base_phrase={self.base_phrase}" +
+                f", utterances={len(self.utterances)}" +
+                f", records={self.records}" +
+                f", error={self.error}" +
+                ")")
+
+    def __repr__(self):
+        return (f"DatasetResult(base_phrase={self.base_phrase!r}" +
+                f", utterances={self.utterances!r}" +
+                f", records={self.records!r}" +
+                f", error={self.error!r}" +
+                ")")
+
+
+class UtteranceEvent(NamedTuple):
+    """
+    A single utterance emitted by the streaming API, tagged with the stage and transform that produced it.
+    """
+    stage: str
+    transform: str | None
+    utterance: str
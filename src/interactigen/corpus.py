@@ -0,0 +1,273 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+from array import array
+from collections.abc import Iterable, Iterator
+
+from interactigen.commons import UtteranceEvent
+from interactigen.dedup import DuplicateIndex, ExactDuplicateIndex
+
+import sys
+
+
+def _name_list(names: str | Iterable[str | None] | None) -> list[str | None] | None:
+    if names is None:
+        return None
+    return [names] if isinstance(names, str) else list(names)
+
+
+class _Symbols:
+    """
+    Table assigning small integer ids to stage names or transform phrases, with None as id 0.
+    """
+
+    max_id = 0xFFFF
+
+    def __init__(self):
+        self.names: list[str | None] = [None]
+        self._ids: dict[str | None, int] = {None: 0}
+
+    def id_of(self, name: str | None) -> int:
+        symbol_id = self._ids.get(name)
+        if symbol_id is None:
+            symbol_id = len(self.names)
+            if symbol_id > self.max_id:
+                raise Exception(f"Too many distinct names, at most {self.max_id} are supported")
+            self.names.append(sys.intern(name))
+            self._ids[name] = symbol_id
+        return symbol_id
+
+    def ids_of(self, names: list[str | None] | None) -> frozenset[int] | None:
+        if names is None:
+            return None
+        return frozenset(self._ids[name] for name in names if name in self._ids)
+
+
+class UtteranceCorpus:
+    """
+    Append-only set of utterances with the stage and transform that first produced each one.
+
+    Utterances are interned and deduplicated on insert, and their provenance is kept as small integer ids in compact
+    arrays, two bytes each, rather than a record per utterance.
+    """
+
+    def __init__(self,
+                 *,
+                 dedup_index: DuplicateIndex = None,
+                 capacity: int = None,
+                 ):
+        """
+        Create a new instance.
+        :param dedup_index: The duplicate index applied on insert.  Default is a new ExactDuplicateIndex.
+        :param capacity: The number of utterances after which further inserts are ignored.  Default is unbounded.
+        """
+        if capacity is not None and capacity < 1:
+            raise Exception('capacity must be at least 1')
+        self.dedup_index = dedup_index if dedup_index is not None else ExactDuplicateIndex()
+        self.capacity = capacity
+        self._utterances: list[str] = []
+        self._stage_ids = array('H')
+        self._transform_ids = array('H')
+        self._stages = _Symbols()
+        self._transforms = _Symbols()
+
+    def __str__(self):
+        return (f"UtteranceCorpus(" +
+                f"size={len(self)}" +
+                f", capacity={self.capacity}" +
+                f", stages={self.stages()}" +
+                ")")
+
+    def __repr__(self):
+        return (f"UtteranceCorpus(" +
+                f"dedup_index={self.dedup_index!r}" +
+                f", size={len(self)!r}" +
+                f", capacity={self.capacity!r}" +
+                f", stages={self.stages()!r}" +
+                ")")
+
+    def __len__(self):
+        return len(self._utterances)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._utterances)
+
+    def __getitem__(self, position: int) -> str:
+        return self._utterances[position]
+
+    def __contains__(self, utterance: str):
+        return utterance in self.dedup_index
+
+    @property
+    def full(self) -> bool:
+        return self.capacity is not None and len(self._utterances) >= self.capacity
+
+    def add(self, utterance: str, *, stage: str, transform: str | None = None) -> bool:
+        """
+        Add an utterance unless it duplicates one already in the corpus.
+        :param utterance: The utterance.
+        :param stage: The name of the pipeline stage that produced it.
+        :param transform: The transform phrase that produced it, or None for the initial utterances.
+        :return: True if the utterance was added.
+        """
+        return self.extend([utterance], stage=stage, transform=transform) == 1
+
+    def extend(self, utterances: Iterable[str], *, stage: str, transform: str | None = None) -> int:
+        """
+        Add utterances in order, skipping those that duplicate one already in the corpus, until it is full.
+        :param utterances: The utterances.
+        :param stage: The name of the pipeline stage that produced them.
+        :param transform: The transform phrase that produced them, or None for the initial utterances.
+        :return: the number of utterances added.
+        """
+        # Names are registered with the first utterance added, so stages() and transforms() only list producers.
+        stage_id = transform_id = None
+        size = len(self._utterances)
+        for utterance in utterances:
+            if self.full:
+                break
+            if self.dedup_index.add(utterance):
+                if stage_id is None:
+                    stage_id = self._stages.id_of(stage)
+                    transform_id = self._transforms.id_of(transform)
+                self._utterances.append(sys.intern(utterance))
+                self._stage_ids.append(stage_id)
+                self._transform_ids.append(transform_id)
+        return len(self._utterances) - size
+
+    def provenance(self, position: int) -> UtteranceEvent:
+        """
+        Get an utterance with the stage and transform that produced it.
+        :param position: The insertion position of the utterance.
+        :return: the utterance event.
+        """
+        return UtteranceEvent(
+            self._stages.names[self._stage_ids[position]],
+            self._transforms.names[self._transform_ids[position]],
+            self._utterances[position],
+        )
+
+    def records(self) -> Iterator[UtteranceEvent]:
+        """
+        Iterate every utterance with the stage and transform that produced it, in insertion order.
+        :return: an iterator of utterance events.
+        """
+        for position in range(len(self._utterances)):
+            yield self.provenance(position)
+
+    def stages(self) -> list[str]:
+        """
+        Get the stage names present in the corpus, in order of first insertion.
+        :return: the stage names.
+        """
+        return self._stages.names[1:]
+
+    def transforms(self) -> list[str]:
+        """
+        Get the transform phrases present in the corpus, in order of first insertion.
+        :return: the transform phrases.
+        """
+        return self._transforms.names[1:]
+
+    def view(self,
+             *,
+             stages: str | Iterable[str] = None,
+             transforms: str | Iterable[str | None] = None,
+             ) -> 'CorpusView':
+        """
+        Get a live view of the utterances produced by the given stages and transforms, without copying them.
+        :param stages: The stage name or names to include.  Default is every stage.
+        :param transforms: The transform phrase or phrases to include, with None for the initial utterances.  Default
+                           is every transform.
+        :return: the view.
+        """
+        return CorpusView(corpus=self, stages=stages, transforms=transforms)
+
+
+class CorpusView:
+    """
+    Live, filtered view of an utterance corpus.  Utterances added to the corpus after the view is created are
+    included when they match.
+    """
+
+    def __init__(self,
+                 *,
+                 corpus: UtteranceCorpus,
+                 stages: str | Iterable[str] = None,
+                 transforms: str | Iterable[str | None] = None,
+                 ):
+        """
+        Create a new instance.
+        :param corpus: The utterance corpus.
+        :param stages: The stage name or names to include.  Default is every stage.
+        :param transforms: The transform phrase or phrases to include, with None for the initial utterances.  Default
+                           is every transform.
+        """
+        self.corpus = corpus
+        self.stages = _name_list(stages)
+        self.transforms = _name_list(transforms)
+
+    def __str__(self):
+        return (f"CorpusView(" +
+                f"stages={self.stages}" +
+                f", transforms={self.transforms}" +
+                f", size={len(self)}" +
+                ")")
+
+    def __repr__(self):
+        return (f"CorpusView(" +
+                f"stages={self.stages!r}" +
+                f", transforms={self.transforms!r}" +
+                f", size={len(self)!r}" +
+                ")")
+
+    def positions(self) -> Iterator[int]:
+        """
+        Iterate the corpus positions of the utterances in the view, in insertion order.
+        :return: an iterator of positions.
+        """
+        # Names are resolved on each pass, so a stage or transform first seen after the view was created still
+        # matches.
+        stage_ids = self.corpus._stages.ids_of(self.stages)
+        transform_ids = self.corpus._transforms.ids_of(self.transforms)
+        if stage_ids is None and transform_ids is None:
+            yield from range(len(self.corpus))
+            return
+        corpus_stage_ids = self.corpus._stage_ids
+        corpus_transform_ids = self.corpus._transform_ids
+        for position in range(len(self.corpus)):
+            if ((stage_ids is None or corpus_stage_ids[position] in stage_ids) and
+                    (transform_ids is None or corpus_transform_ids[position] in transform_ids)):
+                yield position
+
+    def __iter__(self) -> Iterator[str]:
+        utterances = self.corpus._utterances
+        return (utterances[position] for position in self.positions())
+
+    def __len__(self):
+        return sum(1 for _ in self.positions())
+
+    def records(self) -> Iterator[UtteranceEvent]:
+        """
+        Iterate the utterances in the view with the stage and transform that produced each one.
+        :return: an iterator of utterance events.
+        """
+        return (self.corpus.provenance(position) for position in self.positions())
@@ -0,0 +1,337 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from abc import ABC, abstractmethod
+from array import array
+from collections.abc import Callable, Iterable
+
+import hashlib
+import operator
+import unicodedata
+
+
+class _PunctuationTable(dict):
+    """
+    str.translate() table lazily mapping each Unicode punctuation code point to a space.
+    """
+
+    def __missing__(self, code_point: int):
+        value = ' ' if unicodedata.category(chr(code_point)).startswith('P') else code_point
+        self[code_point] = value
+        return value
+
+
+_punctuation_table = _PunctuationTable()
+
+
+def normalize_utterance(utterance: str) -> str:
+    """
+    Normalize an utterance for duplicate detection by case folding, removing punctuation and collapsing whitespace.
+    :param utterance: The utterance.
+    :return: the normalized utterance.
+    """
+    return ' '.join(utterance.casefold().translate(_punctuation_table).split())
+
+
+class DuplicateIndex(ABC):
+    """
+    Abstract incremental index of retained utterances.
+    """
+
+    @abstractmethod
+    def add(self, utterance: str, label=None) -> bool:
+        """
+        Add an utterance unless it duplicates one already retained.
+        :param utterance: The utterance.
+        :param label: An optional label stored with the retained utterance, such as its intent.
+        :return: True if the utterance was retained.
+        """
+        pass
+
+    @abstractmethod
+    def lookup(self, utterance: str) -> tuple[str, object] | None:
+        """
+        Find the retained utterance that the given utterance duplicates.
+        :param utterance: The utterance.
+        :return: the retained utterance and its label, or None.
+        """
+        pass
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+    def __contains__(self, utterance: str):
+        return self.lookup(utterance) is not None
+
+    def filter(self, utterances: Iterable[str], label=None) -> list[str]:
+        """
+        Add utterances in order, returning those retained.
+        :param utterances: The utterances.
+        :param label: An optional label stored with each retained utterance.
+        :return: the retained utterances, in input order.
+        """
+        return [utterance for utterance in utterances if self.add(utterance, label)]
+
+
+class ExactDuplicateIndex(DuplicateIndex):
+    """
+    Index retaining utterances that are unique after an optional normalization.
+    """
+
+    def __init__(self,
+                 *,
+                 normalizer: Callable[[str], str] | None = None,
+                 ):
+        """
+        Create a new instance.
+        :param normalizer: The normalization applied before comparison.  Default is none, which retains only
+                           byte-identical duplicates.
+        """
+        self.normalizer = normalizer
+        self._entries: dict[str, tuple[str, object]] = {}
+
+    def __str__(self):
+        return f"ExactDuplicateIndex(normalizer={self.normalizer}, size={len(self)})"
+
+    def __repr__(self):
+        return f"ExactDuplicateIndex(normalizer={self.normalizer!r}, size={len(self)!r})"
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _key(self, utterance: str) -> str:
+        return self.normalizer(utterance) if self.normalizer is not None else utterance
+
+    def add(self, utterance: str, label=None) -> bool:
+        key = self._key(utterance)
+        if key in self._entries:
+            return False
+        self._entries[key] = (utterance, label)
+        return True
+
+    def lookup(self, utterance: str) -> tuple[str, object] | None:
+        return self._entries.get(self._key(utterance))
+
+
+# The number of 32-bit hash values produced by one 64-byte blake2b digest.
+_HASHES_PER_DIGEST = 16
+
+
+def _lsh_bands(num_perm: int, threshold: float) -> tuple[int, int]:
+    """
+    Choose the LSH band count and rows per band whose candidate threshold (1/b)^(1/r) is closest to, without
+    exceeding, the similarity threshold, favouring recall since candidates are verified afterward.
+    :param num_perm: The number of MinHash permutations.
+    :param threshold: The similarity threshold.
+    :return: the band count and rows per band.
+    """
+    best = (num_perm, 1)
+    best_threshold = 0.0
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        candidate_threshold = (1.0 / bands) ** (1.0 / rows)
+        if best_threshold < candidate_threshold <= threshold:
+            best = (bands, rows)
+            best_threshold = candidate_threshold
+    return best
+
+
+class NearDuplicateIndex(DuplicateIndex):
+    """
+    MinHash/LSH index retaining utterances whose shingle Jaccard similarity to every retained utterance is below a
+    threshold.  Inserts and lookups cost O(num_perm) plus the few LSH candidates, so indexing stays near-linear on
+    large corpora.
+    """
+
+    def __init__(self,
+                 *,
+                 threshold: float = 0.8,
+                 num_perm: int = 64,
+                 shingle_size: int = 3,
+                 word_shingles: bool = False,
+                 normalizer: Callable[[str], str] | None = normalize_utterance,
+                 seed: int = 1,
+                 ):
+        """
+        Create a new instance.
+        :param threshold: The estimated Jaccard similarity at or above which utterances are duplicates.
+        :param num_perm: The number of MinHash permutations.  More permutations estimate similarity more precisely.
+        :param shingle_size: The shingle length, in characters or words.
+        :param word_shingles: Whether to shingle words instead of characters.
+        :param normalizer: The normalization applied before shingling.  Exact normalized duplicates are always
+                           detected.
+        :param seed: The seed of the MinHash permutations.  Results are deterministic for a given seed.
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise Exception('threshold must be in (0, 1]')
+        if num_perm < 1:
+            raise Exception('num_perm must be at least 1')
+        if shingle_size < 1:
+            raise Exception('shingle_size must be at least 1')
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.word_shingles = word_shingles
+        self.normalizer = normalizer
+        self.seed = seed
+        self.bands, self.rows = _lsh_bands(num_perm, threshold)
+
+        self._key = seed.to_bytes(8, 'little', signed=True)
+        self._digests = -(-num_perm // _HASHES_PER_DIGEST)
+        # Shingle vocabularies are small relative to corpora, so memoize each shingle's hash row.
+        self._shingle_cache: dict[str, tuple[int, ...]] = {}
+        self._exact: dict[str, int] = {}
+        self._buckets: list[dict[int, list[int]]] = [{} for _ in range(self.bands)]
+        self._signatures: list[array] = []
+        self._entries: list[tuple[str, object]] = []
+
+    def __str__(self):
+        return (f"NearDuplicateIndex(threshold={self.threshold}" +
+                f", num_perm={self.num_perm}" +
+                f", bands={self.bands}" +
+                f", rows={self.rows}" +
+                f", size={len(self)}" +
+                ")")
+
+    def __repr__(self):
+        return (f"NearDuplicateIndex(threshold={self.threshold!r}" +
+                f", num_perm={self.num_perm!r}" +
+                f", bands={self.bands!r}" +
+                f", rows={self.rows!r}" +
+                f", size={len(self)!r}" +
+                ")")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _normalize(self, utterance: str) -> str:
+        return self.normalizer(utterance) if self.normalizer is not None else utterance
+
+    def _shingles(self, normalized: str) -> set[str]:
+        """
+        Split a normalized utterance into shingles.
+        :param normalized: The normalized utterance.
+        :return: the shingles.
+        """
+        size = self.shingle_size
+        if self.word_shingles:
+            tokens = normalized.split()
+            if len(tokens) <= size:
+                return {' '.join(tokens)}
+            return {' '.join(tokens[idx:idx + size]) for idx in range(len(tokens) - size + 1)}
+        if len(normalized) <= size:
+            return {normalized}
+        return {normalized[idx:idx + size] for idx in range(len(normalized) - size + 1)}
+
+    def _shingle_hashes(self, shingle: str) -> tuple[int, ...]:
+        """
+        Hash a shingle under every MinHash permutation.
+        :param shingle: The shingle.
+        :return: the num_perm hash values.
+        """
+        hashes = self._shingle_cache.get(shingle)
+        if hashes is None:
+            encoded = shingle.encode('utf-8')
+            row = array('I')
+            for digest in range(self._digests):
+                row.frombytes(hashlib.blake2b(encoded, key=self._key, salt=digest.to_bytes(16, 'little')).digest())
+            hashes = tuple(row[:self.num_perm])
+            if len(self._shingle_cache) < 1_000_000:
+                self._shingle_cache[shingle] = hashes
+        return hashes
+
+    def _signature(self, normalized: str) -> array:
+        """
+        Compute the MinHash signature of a normalized utterance.
+        :param normalized: The normalized utterance.
+        :return: the signature.
+        """
+        rows = [self._shingle_hashes(shingle) for shingle in self._shingles(normalized)]
+        return array('I', map(min, zip(*rows)))
+
+    def _band_keys(self, signature: array) -> list[int]:
+        rows = self.rows
+        return [hash(tuple(signature[band * rows:(band + 1) * rows])) for band in range(self.bands)]
+
+    def similarity(self, left: array, right: array) -> float:
+        """
+        Estimate the Jaccard similarity of two signatures.
+        :param left: The first signature.
+        :param right: The second signature.
+        :return: the estimated similarity.
+        """
+        return sum(map(operator.eq, left, right)) / self.num_perm
+
+    def _find(self, normalized: str, signature: array, band_keys: list[int]) -> int | None:
+        exact = self._exact.get(normalized)
+        if exact is not None:
+            return exact
+        checked = set()
+        for band, band_key in enumerate(band_keys):
+            for entry_id in self._buckets[band].get(band_key, ()):
+                if entry_id in checked:
+                    continue
+                checked.add(entry_id)
+                if self.similarity(signature, self._signatures[entry_id]) >= self.threshold:
+                    return entry_id
+        return None
+
+    def add(self, utterance: str, label=None) -> bool:
+        normalized = self._normalize(utterance)
+        if normalized in self._exact:
+            return False
+        signature = self._signature(normalized)
+        band_keys = self._band_keys(signature)
+        if self._find(normalized, signature, band_keys) is not None:
+            return False
+
+        entry_id = len(self._entries)
+        self._entries.append((utterance, label))
+        self._signatures.append(signature)
+        self._exact[normalized] = entry_id
+        for band, band_key in enumerate(band_keys):
+            self._buckets[band].setdefault(band_key, []).append(entry_id)
+        return True
+
+    def lookup(self, utterance: str) -> tuple[str, object] | None:
+        normalized = self._normalize(utterance)
+        signature = self._signature(normalized)
+        entry_id = self._find(normalized, signature, self._band_keys(signature))
+        return self._entries[entry_id] if entry_id is not None else None
+
+
+def dedup_utterances(utterances: Iterable[str],
+                     *,
+                     index: DuplicateIndex = None,
+                     ) -> list[str]:
+    """
+    Remove duplicate utterances, preserving first-seen order.
+    :param utterances: The utterances.
+    :param index: The duplicate index to use.  Default is a new exact-match index.  Pass a shared index to
+                  deduplicate across calls, for example across every intent of a dataset.
+    :return: the retained utterances.
+    """
+    if index is None:
+        index = ExactDuplicateIndex()
+    return index.filter(utterances)
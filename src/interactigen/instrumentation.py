@@ -0,0 +1,426 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.exceptions import OutputParserException
+
+from collections import deque
+from collections.abc import Callable
+
+import threading
+import time
+
+
+class CommandCall:
+    """
+    The measurements of a single command issued by an Interactigen client.
+    """
+
+    def __init__(self,
+                 *,
+                 session_id: str,
+                 cmd_name: str,
+                 transforms: list[str],
+                 ):
+        """
+        Create a new instance.
+        :param session_id: The command session ID.
+        :param cmd_name: The command name.
+        :param transforms: The transformation instruction phrases the command applies, if any.
+        """
+        self.session_id = session_id
+        self.cmd_name = cmd_name
+        self.transforms = transforms
+        self.source = 'model'
+        self.queue_wait = 0.0
+        self.latency = 0.0
+        self.attempts = 0
+        self.parse_failures = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.utterance_count = 0
+        self.transform_utterances: dict[str, int] = {}
+        self.error: Exception | None = None
+        self.started = time.perf_counter()
+        self._dispatched: float | None = None
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - 1)
+
+    def share(self, transform: str) -> float:
+        """
+        Get a transform's share of the command's tokens and utterances: its share of the output utterances of a
+        multi-transform command, or an equal share when none were counted.
+        :param transform: The transformation instruction phrase.
+        :return: the share, between 0 and 1.
+        """
+        if len(self.transforms) < 2:
+            return 1.0
+        total = sum(self.transform_utterances.values())
+        if not total:
+            return 1.0 / len(self.transforms)
+        return self.transform_utterances.get(transform, 0) / total
+
+    def dispatched(self) -> None:
+        """
+        Mark the end of queueing for concurrency slots and rate limits.
+        """
+        self._dispatched = time.perf_counter()
+        self.queue_wait = self._dispatched - self.started
+
+    def finished(self) -> None:
+        """
+        Mark the completion of the command.
+        """
+        self.latency = time.perf_counter() - (self._dispatched if self._dispatched is not None else self.started)
+
+    def __str__(self):
+        return (f"CommandCall(cmd_name={self.cmd_name}" +
+                f", transforms={self.transforms}" +
+                f", source={self.source}" +
+                f", latency={self.latency:.3f}" +
+                f", queue_wait={self.queue_wait:.3f}" +
+                f", retries={self.retries}" +
+                f", error={self.error}" +
+                ")")
+
+    def __repr__(self):
+        return (f"CommandCall(session_id={self.session_id!r}" +
+                f", cmd_name={self.cmd_name!r}" +
+                f", transforms={self.transforms!r}" +
+                f", source={self.source!r}" +
+                f", latency={self.latency!r}" +
+                f", queue_wait={self.queue_wait!r}" +
+                f", attempts={self.attempts!r}" +
+                f", parse_failures={self.parse_failures!r}" +
+                f", prompt_tokens={self.prompt_tokens!r}" +
+                f", completion_tokens={self.completion_tokens!r}" +
+                f", utterance_count={self.utterance_count!r}" +
+                f", transform_utterances={self.transform_utterances!r}" +
+                f", error={self.error!r}" +
+                ")")
+
+
+class Instrumentation:
+    """
+    Hook receiving the measurements of every command issued by an Interactigen client.  Override the callbacks of
+    interest; the defaults do nothing.
+    """
+
+    def on_command_start(self, call: CommandCall) -> None:
+        """
+        Called when a command is submitted, before queueing.
+        :param call: The command measurements so far.
+        """
+        pass
+
+    def on_command_end(self, call: CommandCall) -> None:
+        """
+        Called when a command completes, successfully or not.
+        :param call: The command measurements.
+        """
+        pass
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callback handler collecting the attempts, parse failures and token usage of a command.  Token counts
+    reported by the provider are preferred; otherwise they are estimated from the prompt and completion text.
+    """
+
+    run_inline = True
+
+    def __init__(self, call: CommandCall, estimator: Callable[[str], int]):
+        """
+        Create a new instance.
+        :param call: The command measurements to update.
+        :param estimator: The fallback token estimator.
+        """
+        self.call = call
+        self.estimator = estimator
+        self._prompt_estimate = 0
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.call.attempts += 1
+        self._prompt_estimate = sum(self.estimator(str(message.content)) for batch in messages for message in batch)
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.call.attempts += 1
+        self._prompt_estimate = sum(self.estimator(prompt) for prompt in prompts)
+
+    def on_llm_end(self, response, **kwargs):
+        usage = token_usage(response)
+        if usage is not None:
+            self.call.prompt_tokens += usage[0]
+            self.call.completion_tokens += usage[1]
+            return
+        self.call.prompt_tokens += self._prompt_estimate
+        self.call.completion_tokens += sum(
+            self.estimator(generation.text) for generations in response.generations for generation in generations
+        )
+
+    def on_chain_error(self, error, **kwargs):
+        if isinstance(error, OutputParserException) and kwargs.get('parent_run_id') is not None:
+            self.call.parse_failures += 1
+
+
+def token_usage(response) -> tuple[int, int] | None:
+    """
+    Extract provider-reported token usage from an LLM result, across the common provider formats.
+    :param response: The LangChain LLMResult.
+    :return: the prompt and completion token counts, or None if not reported.
+    """
+    candidates = [(response.llm_output or {}).get('token_usage'), (response.llm_output or {}).get('usage')]
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, 'message', None), 'response_metadata', None) or {}
+            candidates.extend([metadata.get('token_usage'), metadata.get('usage')])
+    for usage in candidates:
+        if not isinstance(usage, dict):
+            continue
+        prompt_tokens = usage.get('prompt_tokens', usage.get('input_tokens'))
+        completion_tokens = usage.get('completion_tokens', usage.get('output_tokens'))
+        if prompt_tokens is not None and completion_tokens is not None:
+            return int(prompt_tokens), int(completion_tokens)
+    return None
+
+
+def count_utterances(result) -> int:
+    """
+    Count the utterances of a parsed command result, in the flat format or a grouped format such as
+    PhraseTransformsUtterances or MultiPhraseUtterances.
+    :param result: The parsed command result.
+    :return: the number of utterances.
+    """
+    if not isinstance(result, dict):
+        return 0
+    if isinstance(result.get('utterances'), list):
+        return len(result['utterances'])
+    return sum(
+        len(entry['utterances']) for group in ('transforms', 'phrases') for entry in result.get(group, [])
+        if isinstance(entry, dict) and isinstance(entry.get('utterances'), list)
+    )
+
+
+def _percentile(samples: list[float], percentile: float) -> float:
+    """
+    Compute a nearest-rank percentile.
+    :param samples: The sorted samples.
+    :param percentile: The percentile, between 0 and 100.
+    :return: the percentile value, or 0.0 without samples.
+    """
+    if not samples:
+        return 0.0
+    rank = max(1, -(-len(samples) * percentile // 100))
+    return samples[int(rank) - 1]
+
+
+class _Series:
+    """
+    Running totals and recent latency samples for one metrics key.
+    """
+
+    def __init__(self, max_samples: int):
+        self.calls = 0
+        self.model_calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.parse_failures = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.utterances = 0
+        self.latencies: deque = deque(maxlen=max_samples)
+        self.queue_waits: deque = deque(maxlen=max_samples)
+
+    def add(self, call: CommandCall, share: float = 1.0) -> None:
+        self.calls += 1
+        self.errors += call.error is not None
+        self.retries += call.retries
+        self.parse_failures += call.parse_failures
+        self.prompt_tokens += call.prompt_tokens * share
+        self.completion_tokens += call.completion_tokens * share
+        self.utterances += call.utterance_count * share
+        if call.source == 'model':
+            self.model_calls += 1
+            self.latencies.append(call.latency)
+            self.queue_waits.append(call.queue_wait)
+
+    def snapshot(self) -> dict:
+        latencies = sorted(self.latencies)
+        queue_waits = sorted(self.queue_waits)
+        return {
+            'calls': self.calls,
+            'model_calls': self.model_calls,
+            'errors': self.errors,
+            'retries': self.retries,
+            'parse_failures': self.parse_failures,
+            'prompt_tokens': round(self.prompt_tokens),
+            'completion_tokens': round(self.completion_tokens),
+            'utterances': round(self.utterances),
+            'latency': {f"p{p}": _percentile(latencies, p) for p in (50, 95, 99)},
+            'queue_wait': {f"p{p}": _percentile(queue_waits, p) for p in (50, 95, 99)},
+        }
+
+
+class MetricsAggregator(Instrumentation):
+    """
+    In-memory aggregation of command measurements per cmd_name and per transform phrase, with latency and queue wait
+    percentiles over the most recent model calls.  The tokens and utterances of a multi-transform call are
+    apportioned to its transforms by their share of its output utterances, so that per-transform totals add up.
+    """
+
+    def __init__(self,
+                 *,
+                 max_samples: int = 10000,
+                 ):
+        """
+        Create a new instance.
+        :param max_samples: The number of recent samples kept per key for percentiles.
+        """
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._by_cmd: dict[str, _Series] = {}
+        self._by_transform: dict[str, _Series] = {}
+
+    def __str__(self):
+        return f"MetricsAggregator(max_samples={self.max_samples})"
+
+    def __repr__(self):
+        return f"MetricsAggregator(max_samples={self.max_samples!r})"
+
+    def on_command_end(self, call: CommandCall) -> None:
+        with self._lock:
+            self._by_cmd.setdefault(call.cmd_name, _Series(self.max_samples)).add(call)
+            for transform in call.transforms:
+                self._by_transform.setdefault(transform, _Series(self.max_samples)).add(call, call.share(transform))
+
+    def snapshot(self) -> dict:
+        """
+        Summarize the measurements so far.
+        :return: the metrics per cmd_name and per transform phrase.
+        """
+        with self._lock:
+            return {
+                'commands': {name: series.snapshot() for name, series in self._by_cmd.items()},
+                'transforms': {name: series.snapshot() for name, series in self._by_transform.items()},
+            }
+
+    def reset(self) -> None:
+        """
+        Discard the measurements so far.
+        """
+        with self._lock:
+            self._by_cmd.clear()
+            self._by_transform.clear()
+
+
+class PrometheusExporter(Instrumentation):
+    """
+    Export command measurements as Prometheus metrics.  Requires the prometheus_client package.
+    """
+
+    def __init__(self,
+                 *,
+                 registry=None,
+                 namespace: str = 'interactigen',
+                 ):
+        """
+        Create a new instance.
+        :param registry: The prometheus_client registry.  Default is the global registry.
+        :param namespace: The metric name prefix.
+        """
+        try:
+            import prometheus_client
+        except ImportError as e:
+            raise Exception('PrometheusExporter requires the prometheus_client package') from e
+
+        registry = registry if registry is not None else prometheus_client.REGISTRY
+        labels = ['cmd_name', 'transform', 'source']
+        options = {'namespace': namespace, 'registry': registry}
+        self._latency = prometheus_client.Histogram('command_latency_seconds', 'Command latency.', labels, **options)
+        self._queue_wait = prometheus_client.Histogram('command_queue_wait_seconds', 'Command queue wait.', labels,
+                                                       **options)
+        self._calls = prometheus_client.Counter('commands', 'Commands issued.', labels, **options)
+        self._errors = prometheus_client.Counter('command_errors', 'Failed commands.', labels, **options)
+        self._retries = prometheus_client.Counter('command_retries', 'Command retries.', labels, **options)
+        self._parse_failures = prometheus_client.Counter('command_parse_failures', 'Output parse failures.', labels,
+                                                         **options)
+        self._tokens = prometheus_client.Counter('command_tokens', 'Tokens used.', labels + ['kind'], **options)
+        self._utterances = prometheus_client.Counter('command_utterances', 'Utterances produced.', labels, **options)
+
+    def on_command_end(self, call: CommandCall) -> None:
+        for transform in call.transforms or ['']:
+            share = call.share(transform)
+            labels = (call.cmd_name, transform, call.source)
+            self._calls.labels(*labels).inc()
+            self._latency.labels(*labels).observe(call.latency)
+            self._queue_wait.labels(*labels).observe(call.queue_wait)
+            self._errors.labels(*labels).inc(call.error is not None)
+            self._retries.labels(*labels).inc(call.retries)
+            self._parse_failures.labels(*labels).inc(call.parse_failures)
+            self._tokens.labels(*labels, 'prompt').inc(call.prompt_tokens * share)
+            self._tokens.labels(*labels, 'completion').inc(call.completion_tokens * share)
+            self._utterances.labels(*labels).inc(call.utterance_count * share)
+
+
+class OpenTelemetryExporter(Instrumentation):
+    """
+    Export command measurements as OpenTelemetry metrics.  Requires the opentelemetry-api package.
+    """
+
+    def __init__(self,
+                 *,
+                 meter_provider=None,
+                 ):
+        """
+        Create a new instance.
+        :param meter_provider: The OpenTelemetry meter provider.  Default is the global provider.
+        """
+        try:
+            from opentelemetry import metrics
+        except ImportError as e:
+            raise Exception('OpenTelemetryExporter requires the opentelemetry-api package') from e
+
+        meter = metrics.get_meter('interactigen', meter_provider=meter_provider)
+        self._latency = meter.create_histogram('interactigen.command.latency', unit='s')
+        self._queue_wait = meter.create_histogram('interactigen.command.queue_wait', unit='s')
+        self._calls = meter.create_counter('interactigen.commands')
+        self._errors = meter.create_counter('interactigen.command.errors')
+        self._retries = meter.create_counter('interactigen.command.retries')
+        self._parse_failures = meter.create_counter('interactigen.command.parse_failures')
+        self._tokens = meter.create_counter('interactigen.command.tokens')
+        self._utterances = meter.create_counter('interactigen.command.utterances')
+
+    def on_command_end(self, call: CommandCall) -> None:
+        for transform in call.transforms or ['']:
+            share = call.share(transform)
+            attributes = {'cmd_name': call.cmd_name, 'transform': transform, 'source': call.source}
+            self._calls.add(1, attributes)
+            self._latency.record(call.latency, attributes)
+            self._queue_wait.record(call.queue_wait, attributes)
+            self._errors.add(int(call.error is not None), attributes)
+            self._retries.add(call.retries, attributes)
+            self._parse_failures.add(call.parse_failures, attributes)
+            self._tokens.add(call.prompt_tokens * share, {**attributes, 'kind': 'prompt'})
+            self._tokens.add(call.completion_tokens * share, {**attributes, 'kind': 'completion'})
+            self._utterances.add(call.utterance_count * share, attributes)
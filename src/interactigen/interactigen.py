@@ -21,12 +21,34 @@
 # SOFTWARE.
 
 from langchain_core.language_models import BaseLanguageModel
-from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.language_models.llms import BaseLLM
 
-from interacticore import LangChainWrap
+from interactigen.batch import BatchBackend, BatchRequest, terminal_statuses
+from interactigen.cache import ResponseCache
+from interactigen.chunking import chunk_utterances, estimate_tokens
+from interactigen.commons import DatasetResult, UtteranceEvent
+from interactigen.corpus import UtteranceCorpus
+from interactigen.dedup import DuplicateIndex, ExactDuplicateIndex
+from interactigen.instrumentation import CommandCall, Instrumentation, UsageCallbackHandler, count_utterances
+from interactigen.journal import RunJournal
+from interactigen.local_transforms import LocalTransformEngine
+from interactigen.pipeline import INIT_STAGE, Pipeline, default_pipeline
+from interactigen.ratelimit import RateController
+from interactigen.routing import ModelPool, ModelRouter
+from interactigen.salvage import is_salvaged
+from interactigen.sinks import DatasetRecord, DatasetSink
+from interactigen.streaming import UtteranceStreamParser
 
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+
+import asyncio
+import json
 import logging
+import queue
+import threading
+import time
+import weakref
 
 # Initialize the logger.
 log = logging.getLogger('interactigenLogger')
@@ -53,6 +75,80 @@ transform_phrases_text = [
     'introduce common emojis',
 ]
 
+# The run-scoped concurrency limit, set by bulk runs that override the client default.
+_run_semaphore: ContextVar[asyncio.Semaphore | None] = ContextVar('interactigen_run_semaphore', default=None)
+
+
+class _InitPacker:
+    """
+    Coalesces the new phrasing requests made by the intents of a bulk run in the same event loop iteration into
+    packed GenMultiNewPhrasings calls.
+    """
+
+    def __init__(self, client: 'Interactigen'):
+        """
+        Create a new instance.
+        :param client: The client executing the packed calls.
+        """
+        self.client = client
+        self._pending: list[tuple[str, int, dict, asyncio.Future]] = []
+        self._tasks: set[asyncio.Task] = set()
+
+    def request(self, base_phrase: str, quantity: int, kwargs: dict) -> asyncio.Future:
+        """
+        Queue a request for the new phrasings of a base phrase, to be packed with the others made before the event
+        loop next runs its callbacks.
+        :param base_phrase: The base phrase.
+        :param quantity: The quantity of semantically diverse utterances.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: a future of the utterances and whether the response was salvaged, or of None when the phrase must
+                 be requested separately.
+        """
+        loop = asyncio.get_running_loop()
+        if not self._pending:
+            loop.call_soon(self._flush)
+        future = loop.create_future()
+        self._pending.append((base_phrase, quantity, kwargs, future))
+        return future
+
+    def _flush(self) -> None:
+        # Only requests for the same quantity with the same parameters can share a call.
+        batches: list[tuple[int, dict, dict[str, list[asyncio.Future]]]] = []
+        for base_phrase, quantity, kwargs, future in self._pending:
+            batch = next((batch for batch in batches if batch[0] == quantity and batch[1] == kwargs), None)
+            if batch is None:
+                batch = (quantity, kwargs, {})
+                batches.append(batch)
+            batch[2].setdefault(base_phrase, []).append(future)
+        self._pending = []
+        for quantity, kwargs, futures in batches:
+            for pack in self.client._init_packs(list(futures), quantity):
+                task = asyncio.create_task(self._run(pack, quantity, kwargs, futures))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pack: list[str], quantity: int, kwargs: dict, futures: dict) -> None:
+        packed = {}
+        try:
+            if len(pack) > 1:
+                packed = await self.client._agenerate_packed_init(base_phrases=pack, quantity=quantity, **kwargs)
+        finally:
+            for base_phrase in pack:
+                for future in futures[base_phrase]:
+                    if not future.done():
+                        future.set_result(packed.get(base_phrase))
+
+    def cancel(self) -> None:
+        """
+        Cancel the packed calls in flight.
+        """
+        for task in list(self._tasks):
+            task.cancel()
+
+
+# The run-scoped new phrasing packer, set by bulk runs with an intent_pack_size above 1.
+_run_init_packer: ContextVar[_InitPacker | None] = ContextVar('interactigen_run_init_packer', default=None)
+
 
 class Interactigen:
     """
@@ -61,34 +157,344 @@ class Interactigen:
 
     def __init__(self,
                  *,
-                 model: BaseLanguageModel,
+                 model: BaseLanguageModel | list[BaseLanguageModel] | ModelPool,
+                 max_concurrency: int = 4,
+                 cache: ResponseCache = None,
+                 rate_limiter: RateController = None,
+                 chunk_token_budget: int | None = 1000,
+                 token_estimator: Callable[[str], int] = estimate_tokens,
+                 max_output_tokens: int | None = 4096,
+                 dedup_factory: Callable[[], DuplicateIndex] = ExactDuplicateIndex,
+                 pipeline: Pipeline = None,
+                 journal: RunJournal = None,
+                 instrumentation: list[Instrumentation] = None,
+                 local_transforms: LocalTransformEngine = None,
+                 max_top_ups: int = 3,
+                 routes: dict[str, BaseLanguageModel | list[BaseLanguageModel] | ModelPool] = None,
+                 intent_pack_size: int = 1,
                  ):
         """
         Create a new instance.
-        :param model: The LangChain base chat model.
-        """
-        self.chat = model if isinstance(model, BaseChatModel) else None
-        self.llm = model if isinstance(model, BaseLLM) else None
-        if self.chat is None and self.llm:
-            raise Exception('Unknown LangChain model type')
-        self.lc_wrap = LangChainWrap(
-            chat=self.chat,
-            llm=self.llm,
-        )
+        :param model: The LangChain base chat model, a list of equivalent models, or a ModelPool balancing commands
+                      across them with failover.
+        :param max_concurrency: The maximum number of in-flight model calls, shared by every thread of the
+                                synchronous API and by each event loop of the asyncio API.  Default is 4.
+        :param cache: The optional response cache.  Pass use_cache=False to any generate method to bypass lookups
+                      for stochastic regeneration; fresh results still refresh the cache.
+        :param rate_limiter: The optional RateController shared by every command this client issues: request and
+                             token rate limits, AIMD concurrency and retries of transient errors, which it alone
+                             retries.  Its concurrency limit applies within max_concurrency, so raise
+                             max_concurrency to let it adapt.
+        :param chunk_token_budget: The estimated token budget of the utterances sent in one transform call.  Larger
+                                   inputs are split into chunks transformed in parallel.  Tune per model; None
+                                   disables chunking.  Default is 1000.
+        :param token_estimator: The function estimating the token count of an utterance for the model.
+        :param max_output_tokens: The model's output token limit.  Several transforms of the same utterances are
+                                  requested in a single call when their combined output is estimated to fit.  None
+                                  disables multi-transform calls.  Default is 4096.
+        :param dedup_factory: The factory creating the duplicate index applied to each intent's utterances.  Default
+                              is ExactDuplicateIndex, which removes byte-identical duplicates only.  Use for example
+                              functools.partial(NearDuplicateIndex, threshold=0.85) to also remove near-duplicates.
+        :param pipeline: The transform pipeline applied by generate_phrase_utterances() and friends.  Default is
+                         default_pipeline(), built from the module-level transform phrase lists when used.
+        :param journal: The optional run journal.  Completed commands are recorded as they finish and replayed,
+                        ahead of the response cache and regardless of use_cache, when a restarted run reaches them.
+                        Pass use_journal=False to any generate method to neither replay nor record its commands.
+        :param instrumentation: The hooks receiving the measurements of every command, e.g. a MetricsAggregator.
+        :param local_transforms: The optional local transform engine.  Transform phrases it knows are applied
+                                 algorithmically instead of by the model; the rest still go to the model.
+        :param max_top_ups: The most extra new phrasing requests made for an intent generated with target_unique
+                            when the pipeline falls short of it.  Default is 3.
+        :param routes: The models serving particular commands instead of model, keyed by transform phrase or command
+                       name such as 'GenNewPhrasings'.  Each route is a model, a list of equivalent models, or a
+                       ModelPool.  Transforms are only combined in one call when routed to the same pool, so share
+                       one ModelPool instance between keys that should be combined and balanced together.  Packed
+                       commands follow the route of the command they pack, e.g. GenMultiTransformedPhrasings follows
+                       'GenTransformedPhrasings', unless routed by their own name.
+        :param intent_pack_size: The most intents whose new phrasings bulk runs request in one GenMultiNewPhrasings
+                                 call, saving the repeated prompt of each.  Packs are split further to fit
+                                 max_output_tokens, and intents a pack fails to answer fall back to their own call.
+                                 Default is 1, which requests each intent separately.
+        """
+        if max_concurrency < 1:
+            raise Exception('max_concurrency must be at least 1')
+        self.router = ModelRouter(default=model, routes=routes)
+        # The first endpoint of the default pool, kept for callers inspecting the client's model.
+        self.lc_wrap = self.router.default.endpoints[0].lc_wrap
+        self.chat = self.lc_wrap.chat
+        self.llm = self.lc_wrap.llm
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        if chunk_token_budget is not None and chunk_token_budget < 1:
+            raise Exception('chunk_token_budget must be at least 1')
+        self.chunk_token_budget = chunk_token_budget
+        self.token_estimator = token_estimator
+        self.max_output_tokens = max_output_tokens
+        self.dedup_factory = dedup_factory
+        self.pipeline = pipeline
+        self.journal = journal
+        self.instrumentation = list(instrumentation or [])
+        self.local_transforms = local_transforms
+        if max_top_ups < 0:
+            raise Exception('max_top_ups must not be negative')
+        self.max_top_ups = max_top_ups
+        if intent_pack_size < 1:
+            raise Exception('intent_pack_size must be at least 1')
+        self.intent_pack_size = intent_pack_size
+        # Nested worker pools of the synchronous API share this bound on in-flight calls.
+        self._thread_semaphore = threading.BoundedSemaphore(max_concurrency)
+        # asyncio primitives are bound to the loop they are first used on, so keep one semaphore per loop.
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
 
     def __str__(self):
         """
         Return a human-readable string.
         :return: a human-readable string.
         """
-        return f"Interactigen()"
+        return f"Interactigen(max_concurrency={self.max_concurrency})"
 
     def __repr__(self):
         """
         Return a human-readable string.
         :return: a human-readable string.
         """
-        return f"Interactigen()"
+        return f"Interactigen(max_concurrency={self.max_concurrency!r})"
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """
+        Get the concurrency limiting semaphore for the running event loop.
+        :return: the semaphore.
+        """
+        semaphore = _run_semaphore.get()
+        if semaphore is not None:
+            return semaphore
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    def _command_key(self, cmd, **kwargs) -> str | None:
+        """
+        Compute the content address of a command for the run journal and response cache.
+        :param cmd: The command instance.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the command key, or None when neither is enabled.
+        """
+        if self.cache is None and self.journal is None:
+            return None
+        return ResponseCache.key_for(cmd, model=self.router.pool_for(cmd).model, **kwargs)
+
+    def _load_result(self, cmd, key: str | None, use_cache: bool, use_journal: bool = True) -> str | None:
+        """
+        Complete a command from the run journal or response cache.
+        :param cmd: The command instance.
+        :param key: The command key.
+        :param use_cache: Whether to consult the response cache.
+        :param use_journal: Whether to consult and record to the run journal.  Default is True.
+        :return: 'journal' or 'cache' if the command was completed without calling the model, otherwise None.
+        """
+        if key is None:
+            return None
+        result = None
+        if use_journal and self.journal is not None:
+            result = self.journal.get(key)
+            if result is not None:
+                log.debug(f"{cmd.session_id} | {cmd.cmd_name} | Journal replay: {key}")
+                cmd.result = result
+                cmd.exec_time = 0.0
+                return 'journal'
+        if use_cache and self.cache is not None:
+            result = self.cache.get(key)
+        if result is None:
+            return None
+        log.debug(f"{cmd.session_id} | {cmd.cmd_name} | Cache hit: {key}")
+        cmd.result = result
+        cmd.exec_time = 0.0
+        if use_journal and self.journal is not None:
+            self.journal.record(key, cmd.cmd_name, cmd.inputs, result)
+        return 'cache'
+
+    def _store_result(self, cmd, key: str | None, use_journal: bool = True) -> None:
+        """
+        Record a completed command result in the run journal and response cache.
+        :param cmd: The completed command instance.
+        :param key: The command key.
+        :param use_journal: Whether to record to the run journal.  Default is True.
+        """
+        if key is None:
+            return
+        if use_journal and self.journal is not None:
+            self.journal.record(key, cmd.cmd_name, cmd.inputs, cmd.result)
+        if self.cache is not None:
+            self.cache.put(key, cmd.cmd_name, cmd.result)
+
+    def _begin_call(self, cmd) -> CommandCall | None:
+        """
+        Start measuring a command for the instrumentation hooks.
+        :param cmd: The command instance.
+        :return: the command measurements, or None without instrumentation.
+        """
+        if not self.instrumentation and self.rate_limiter is None:
+            return None
+        transforms = getattr(cmd, 'transform_phrases', None)
+        if transforms is None:
+            transforms = [cmd.transform_phrase] if hasattr(cmd, 'transform_phrase') else []
+        call = CommandCall(session_id=cmd.session_id, cmd_name=cmd.cmd_name, transforms=list(transforms))
+        for hook in self.instrumentation:
+            try:
+                hook.on_command_start(call)
+            except Exception as e:
+                log.warning(f"{cmd.session_id} | {cmd.cmd_name} | Instrumentation failed: {e}")
+        return call
+
+    def _dispatch_call(self, call: CommandCall | None, kwargs: dict) -> dict:
+        """
+        Mark a measured command as dispatched to the model and attach the usage callback handler.  The handler is
+        attached after the command key is computed so that it never affects the journal and cache keys.
+        :param call: The command measurements.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the parameters to execute the command with.
+        """
+        if call is None:
+            return kwargs
+        call.dispatched()
+        return {**kwargs, 'lc_callbacks': [UsageCallbackHandler(call, self.token_estimator)]}
+
+    def _end_call(self, call: CommandCall | None, cmd, *, source: str, error: Exception | None) -> None:
+        """
+        Finish measuring a command and report it to the instrumentation hooks.
+        :param call: The command measurements.
+        :param cmd: The command instance.
+        :param source: Where the result came from: 'model', 'batch', 'cache', or 'journal'.
+        :param error: The exception the command failed with, if any.
+        """
+        if call is None:
+            return
+        call.finished()
+        call.source = source
+        call.error = error
+        if error is None:
+            call.utterance_count = count_utterances(cmd.result)
+            if hasattr(cmd, 'get_transformed_utterances'):
+                call.transform_utterances = {transform: len(utterances)
+                                             for transform, utterances in cmd.get_transformed_utterances().items()}
+        for hook in self.instrumentation:
+            try:
+                hook.on_command_end(call)
+            except Exception as e:
+                log.warning(f"{cmd.session_id} | {cmd.cmd_name} | Instrumentation failed: {e}")
+
+    def _estimate_command_tokens(self, cmd) -> int:
+        """
+        Estimate the tokens a command uses, for the rate controller's token bucket.  The completion is assumed to be
+        about the size of the prompt, capped by the model output limit.
+        :param cmd: The command instance.
+        :return: the estimated prompt and completion tokens.
+        """
+        prompt_tokens = (self.token_estimator(cmd.sys_prompt + cmd.user_prompt_tmpl) +
+                         sum(self.token_estimator(str(value)) for value in cmd.inputs.values()))
+        completion_tokens = min(prompt_tokens, self.max_output_tokens or prompt_tokens)
+        return prompt_tokens + completion_tokens
+
+    def _settle_tokens(self, call: CommandCall | None, estimate: int) -> None:
+        """
+        Settle the rate controller's token bucket with a command's reported usage.
+        :param call: The command measurements.
+        :param estimate: The estimated tokens reserved.
+        """
+        if call is not None and call.attempts and (call.prompt_tokens or call.completion_tokens):
+            self.rate_limiter.settle(call.prompt_tokens + call.completion_tokens - estimate)
+
+    def _execute(self, cmd, **kwargs):
+        """
+        Execute a command, consulting the run journal and response cache first and bounded by the concurrency limit.
+        :param cmd: The command instance.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: The completed command instance.
+        """
+        use_cache = kwargs.pop('use_cache', True)
+        use_journal = kwargs.pop('use_journal', True)
+        call = self._begin_call(cmd)
+        source = None
+        error = None
+        try:
+            key = self._command_key(cmd, **kwargs)
+            source = self._load_result(cmd, key, use_cache, use_journal)
+            if source is not None:
+                return cmd
+            with self._thread_semaphore:
+                if self.rate_limiter is not None:
+                    # The rate limiter retries transient errors, each attempt on one endpoint of the pool.
+                    estimate = self._estimate_command_tokens(cmd)
+                    cmd = self.rate_limiter.call(
+                        lambda: self.router.pool_for(cmd).execute(cmd, failover=False,
+                                                                  **self._dispatch_call(call, kwargs)),
+                        tokens=estimate,
+                    )
+                    self._settle_tokens(call, estimate)
+                else:
+                    cmd = self.router.pool_for(cmd).execute(cmd, **self._dispatch_call(call, kwargs))
+            if call is not None and is_salvaged(cmd.result):
+                call.parse_failures += 1
+            self._store_result(cmd, key, use_journal)
+            return cmd
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._end_call(call, cmd, source=source or 'model', error=error)
+
+    async def _aexecute(self, cmd, **kwargs):
+        """
+        Execute a command asynchronously, consulting the run journal and response cache first and bounded by the
+        concurrency limit.
+        :param cmd: The command instance.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: The completed command instance.
+        """
+        use_cache = kwargs.pop('use_cache', True)
+        use_journal = kwargs.pop('use_journal', True)
+        call = self._begin_call(cmd)
+        source = None
+        error = None
+        try:
+            key = self._command_key(cmd, **kwargs)
+            source = self._load_result(cmd, key, use_cache, use_journal)
+            if source is not None:
+                return cmd
+            async with self._get_semaphore():
+                if self.rate_limiter is not None:
+                    # The rate limiter retries transient errors, each attempt on one endpoint of the pool.
+                    estimate = self._estimate_command_tokens(cmd)
+                    cmd = await self.rate_limiter.acall(
+                        lambda: self.router.pool_for(cmd).aexecute(cmd, failover=False,
+                                                                   **self._dispatch_call(call, kwargs)),
+                        tokens=estimate,
+                    )
+                    self._settle_tokens(call, estimate)
+                else:
+                    cmd = await self.router.pool_for(cmd).aexecute(cmd, **self._dispatch_call(call, kwargs))
+            if call is not None and is_salvaged(cmd.result):
+                call.parse_failures += 1
+            self._store_result(cmd, key, use_journal)
+            return cmd
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._end_call(call, cmd, source=source or 'model', error=error)
+
+    def _get_pipeline(self, media_type: str) -> Pipeline:
+        """
+        Get the client pipeline stages applying to a media type.
+        :param media_type: The media type.
+        :return: the media type pipeline.
+        """
+        pipeline = self.pipeline if self.pipeline is not None else default_pipeline()
+        return pipeline.for_media_type(media_type)
 
     def generate_phrase_init_utterances(self,
                                         *,
@@ -107,9 +513,149 @@ class Interactigen:
             base_phrase=base_phrase,
             quantity=quantity,
         )
-        cmd_result = self.lc_wrap.execute(cmd, **kwargs)
+        cmd_result = self._execute(cmd, **kwargs)
         base_chain_result = cmd_result.result
-        return base_chain_result['utterances']
+        utterances = base_chain_result['utterances']
+        if is_salvaged(base_chain_result) and 0 < len(utterances) < quantity:
+            # Ask again only for the utterances the malformed response was missing, while it makes progress.
+            utterances = utterances + self.generate_phrase_init_utterances(
+                base_phrase=base_phrase,
+                quantity=quantity - len(utterances),
+                **kwargs,
+            )
+        return utterances
+
+    def _init_packs(self, base_phrases: list[str], quantity: int) -> list[list[str]]:
+        """
+        Split base phrases into packs whose new phrasings are requested in one call: at most intent_pack_size
+        phrases, whose combined output fits the model output limit.
+        :param base_phrases: The base phrases.
+        :param quantity: The quantity of semantically diverse utterances per base phrase.
+        :return: the distinct base phrases of each pack, in first-seen order.
+        """
+        packs: list[list[str]] = []
+        pack_tokens = 0
+        for base_phrase in dict.fromkeys(base_phrases):
+            # Each new phrasing is estimated at the size of its base phrase plus a few words and JSON quoting, and
+            # each phrase adds its own object wrapper.
+            phrase_tokens = quantity * (self.token_estimator(base_phrase) + 8) + 16
+            if (not packs or len(packs[-1]) >= self.intent_pack_size or
+                    (self.max_output_tokens is not None and pack_tokens + phrase_tokens > self.max_output_tokens)):
+                packs.append([])
+                pack_tokens = 0
+            packs[-1].append(base_phrase)
+            pack_tokens += phrase_tokens
+        return packs
+
+    def _generate_packed_init(self,
+                              *,
+                              base_phrases: list[str],
+                              quantity: int,
+                              **kwargs) -> dict[str, tuple[list[str], bool]]:
+        """
+        Generate new phrasings for several base phrases in a single model call.
+        :param base_phrases: The base phrases.
+        :param quantity: The quantity of semantically diverse utterances per base phrase.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the utterances and whether the response was salvaged, keyed by base phrase.  Phrases the model
+                 skipped are absent, and the result is empty if the call failed.
+        """
+        from interactigen import GenMultiNewPhrasings
+        cmd = GenMultiNewPhrasings(
+            base_phrases=base_phrases,
+            quantity=quantity,
+        )
+        try:
+            cmd_result = self._execute(cmd, **kwargs)
+        except Exception as e:
+            log.warning(f"{cmd.session_id} | {cmd.cmd_name} | Falling back to single phrase calls: {e}")
+            return {}
+        salvaged = is_salvaged(cmd_result.result)
+        return {base_phrase: (utterances, salvaged)
+                for base_phrase, utterances in cmd_result.get_phrase_utterances().items()}
+
+    def _complete_init(self,
+                       *,
+                       base_phrase: str,
+                       quantity: int,
+                       packed: tuple[list[str], bool] | None,
+                       **kwargs) -> list[str]:
+        """
+        Complete the new phrasings of one base phrase of a pack: request them separately when the pack skipped the
+        phrase, or request the remainder when the response was cut short.
+        :param base_phrase: The base phrase.
+        :param quantity: The quantity of semantically diverse utterances.
+        :param packed: The packed result for the phrase, if any.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an array of semantically diverse utterances.
+        """
+        if packed is None:
+            return self.generate_phrase_init_utterances(base_phrase=base_phrase, quantity=quantity, **kwargs)
+        utterances, salvaged = packed
+        if salvaged and len(utterances) < quantity:
+            utterances = utterances + self.generate_phrase_init_utterances(
+                base_phrase=base_phrase,
+                quantity=quantity - len(utterances),
+                **kwargs,
+            )
+        return utterances
+
+    def generate_phrase_multi_init_utterances(self,
+                                              *,
+                                              base_phrases: list[str],
+                                              quantity: int,
+                                              **kwargs) -> dict[str, list[str]]:
+        """
+        Generate semantically diverse utterances for several base phrases, packing them into single calls of up to
+        intent_pack_size phrases whose output fits the model output limit.  Phrases a pack fails to answer are
+        requested separately.
+        :param base_phrases: The base phrases.
+        :param quantity: The quantity of semantically diverse utterances per base phrase.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the semantically diverse utterances keyed by base phrase.
+        """
+        generated: dict[str, list[str]] = {}
+        for pack in self._init_packs(base_phrases, quantity):
+            packed = self._generate_packed_init(
+                base_phrases=pack,
+                quantity=quantity,
+                **kwargs,
+            ) if len(pack) > 1 else {}
+            for base_phrase in pack:
+                generated[base_phrase] = self._complete_init(
+                    base_phrase=base_phrase,
+                    quantity=quantity,
+                    packed=packed.get(base_phrase),
+                    **kwargs,
+                )
+        return generated
+
+    def _chunk_utterances(self, utterances: list[str]) -> list[list[str]]:
+        """
+        Split utterances into chunks sized by the client token budget.
+        :param utterances: The utterances.
+        :return: the chunks, in the original order.
+        """
+        return chunk_utterances(utterances, token_budget=self.chunk_token_budget, estimator=self.token_estimator)
+
+    def _is_local_transform(self, transform_phrase: str) -> bool:
+        """
+        Check whether a transform is routed to the local transform engine.
+        :param transform_phrase: The transformation instruction phrase.
+        :return: True if the transform is applied locally.
+        """
+        return self.local_transforms is not None and transform_phrase in self.local_transforms
+
+    def _apply_local_transforms(self, utterances: list[str], transform_phrases: list[str]) -> dict[str, list[str]]:
+        """
+        Apply the transforms routed to the local transform engine.
+        :param utterances: The utterances to transform.
+        :param transform_phrases: The transformation instruction phrases.
+        :return: the transformed utterances keyed by locally routed transform phrase.
+        """
+        if self.local_transforms is None:
+            return {}
+        return self.local_transforms.transform_many(utterances=utterances, transform_phrases=transform_phrases)
 
     def generate_phrase_transforms(self,
                                    *,
@@ -118,6 +664,43 @@ class Interactigen:
                                    **kwargs) -> list[str]:
         """
         Generate a list of transformed utterances from an input source and transformation instruction.
+
+        Inputs larger than the chunk token budget are split into chunks that are transformed in parallel and merged
+        back in the original order.
+        :param utterances: The utterances to transform.
+        :param transform_phrase: The transformation instruction phrase.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an array of transformed utterances.
+        """
+        if self._is_local_transform(transform_phrase):
+            return self.local_transforms.transform(utterances=utterances, transform_phrase=transform_phrase)
+        chunks = self._chunk_utterances(utterances)
+        if len(chunks) == 1:
+            return self._generate_phrase_transforms_chunk(
+                utterances=utterances,
+                transform_phrase=transform_phrase,
+                **kwargs,
+            )
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks))) as pool:
+            chunks_results = list(pool.map(
+                lambda chunk: self._generate_phrase_transforms_chunk(
+                    utterances=chunk,
+                    transform_phrase=transform_phrase,
+                    **kwargs,
+                ),
+                chunks,
+            ))
+
+        return [result for chunk_result in chunks_results for result in chunk_result]
+
+    def _generate_phrase_transforms_chunk(self,
+                                          *,
+                                          utterances: list[str],
+                                          transform_phrase: str,
+                                          **kwargs) -> list[str]:
+        """
+        Transform a single chunk of utterances in one model call.
         :param utterances: The utterances to transform.
         :param transform_phrase: The transformation instruction phrase.
         :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
@@ -128,9 +711,153 @@ class Interactigen:
             utterances=utterances,
             transform_phrase=transform_phrase,
         )
-        cmd_result = self.lc_wrap.execute(cmd, **kwargs)
+        cmd_result = self._execute(cmd, **kwargs)
         transform_chain_result = cmd_result.result
-        return transform_chain_result['utterances']
+        transformed = transform_chain_result['utterances']
+        if is_salvaged(transform_chain_result) and 0 < len(transformed) < len(utterances):
+            # Ask again only for the inputs the malformed response did not reach, while it makes progress.
+            transformed = transformed + self._generate_phrase_transforms_chunk(
+                utterances=utterances[len(transformed):],
+                transform_phrase=transform_phrase,
+                **kwargs,
+            )
+        return transformed
+
+    def _fits_multi_transform(self, utterances: list[str], transform_phrases: list[str]) -> bool:
+        """
+        Check whether several transforms of the same utterances fit the model output limit in a single call.
+        :param utterances: The utterances to transform.
+        :param transform_phrases: The transformation instruction phrases.
+        :return: True if a multi-transform call should be used.
+        """
+        if self.max_output_tokens is None or len(transform_phrases) < 2:
+            return False
+        # Each transformed utterance is roughly the size of its source plus JSON quoting, and each transform adds
+        # its own object wrapper.
+        per_transform_tokens = sum(self.token_estimator(utterance) + 2 for utterance in utterances) + 16
+        return per_transform_tokens * len(transform_phrases) <= self.max_output_tokens
+
+    def _multi_transform_groups(self, utterances: list[str], transform_phrases: list[str]) -> list[list[str]]:
+        """
+        Group the transforms of the same utterances into multi-transform calls: those routed to the same model, when
+        their combined output fits the model output limit.
+        :param utterances: The utterances to transform.
+        :param transform_phrases: The transformation instruction phrases.
+        :return: the transform phrases of each multi-transform call.
+        """
+        return [group for group in self.router.group_transforms(transform_phrases)
+                if self._fits_multi_transform(utterances, group)]
+
+    def generate_phrase_multi_transforms(self,
+                                         *,
+                                         utterances: list[str],
+                                         transform_phrases: list[str],
+                                         **kwargs) -> dict[str, list[str]]:
+        """
+        Apply several transformation instructions to the same utterances in a single model call.
+        :param utterances: The utterances to transform.
+        :param transform_phrases: The transformation instruction phrases.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the transformed utterances keyed by transform phrase.  Instructions the model skipped are absent.
+        """
+        from interactigen import GenMultiTransformedPhrasings
+        cmd = GenMultiTransformedPhrasings(
+            utterances=utterances,
+            transform_phrases=transform_phrases,
+        )
+        cmd_result = self._execute(cmd, **kwargs)
+        transformed = cmd_result.get_transformed_utterances()
+        if is_salvaged(cmd_result.result):
+            # Complete each transform the malformed response cut short from the inputs it did not reach.  Missing
+            # transforms are left to the caller's single-transform fallback.
+            for transform_phrase, results in transformed.items():
+                if len(results) < len(utterances):
+                    results.extend(self._generate_phrase_transforms_chunk(
+                        utterances=utterances[len(results):],
+                        transform_phrase=transform_phrase,
+                        **kwargs,
+                    ))
+        return transformed
+
+    def _generate_phrase_transforms_chunk_many(self,
+                                               *,
+                                               utterances: list[str],
+                                               transform_phrases: list[str],
+                                               **kwargs) -> dict[str, list[str]]:
+        """
+        Apply several transformation instructions to a single chunk of utterances, in one call when the output fits.
+        :param utterances: The utterances to transform.
+        :param transform_phrases: The transformation instruction phrases.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the transformed utterances keyed by transform phrase.
+        """
+        transformed = self._apply_local_transforms(utterances, transform_phrases)
+        model_phrases = [phrase for phrase in transform_phrases if phrase not in transformed]
+        for group in self._multi_transform_groups(utterances, model_phrases):
+            transformed.update(self.generate_phrase_multi_transforms(
+                utterances=utterances,
+                transform_phrases=group,
+                **kwargs,
+            ))
+        for transform_phrase in model_phrases:
+            if transform_phrase not in transformed:
+                transformed[transform_phrase] = self._generate_phrase_transforms_chunk(
+                    utterances=utterances,
+                    transform_phrase=transform_phrase,
+                    **kwargs,
+                )
+        return transformed
+
+    def _generate_phrase_transforms_many(self,
+                                         *,
+                                         utterances: list[str],
+                                         transform_phrases: list[str],
+                                         **kwargs) -> list[str]:
+        """
+        Apply several transformation instructions to the same utterances, combining them into single calls when the
+        output fits the model output limit.
+        :param utterances: The utterances to transform.
+        :param transform_phrases: The transformation instruction phrases.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an array of transformed utterances, in transform_phrases order.
+        """
+        transformed = self._generate_phrase_transforms_keyed(
+            utterances=utterances,
+            transform_phrases=transform_phrases,
+            **kwargs,
+        )
+
+        return [result for transform_phrase in transform_phrases for result in transformed[transform_phrase]]
+
+    def _generate_phrase_transforms_keyed(self,
+                                          *,
+                                          utterances: list[str],
+                                          transform_phrases: list[str],
+                                          **kwargs) -> dict[str, list[str]]:
+        """
+        Apply several transformation instructions to the same utterances, chunking the input and combining
+        transforms into single calls when the output fits the model output limit.
+        :param utterances: The utterances to transform.
+        :param transform_phrases: The transformation instruction phrases.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the transformed utterances keyed by transform phrase, merged across chunks in input order.
+        """
+        chunks = self._chunk_utterances(utterances)
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks))) as pool:
+            chunks_results = list(pool.map(
+                lambda chunk: self._generate_phrase_transforms_chunk_many(
+                    utterances=chunk,
+                    transform_phrases=transform_phrases,
+                    **kwargs,
+                ),
+                chunks,
+            ))
+
+        return {
+            transform_phrase: [
+                result for chunk_result in chunks_results for result in chunk_result[transform_phrase]
+            ] for transform_phrase in transform_phrases
+        }
 
     def generate_phrase_transforms_all(self,
                                        *,
@@ -142,15 +869,11 @@ class Interactigen:
         :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
         :return: an array of transformed utterances.
         """
-        all_transforms_result = [
-            result for in_entry in transform_phrases_all
-            for result in self.generate_phrase_transforms(
-                utterances=utterances,
-                transform_phrase=in_entry,
-                **kwargs,
-            )]
-
-        return all_transforms_result
+        return self._generate_phrase_transforms_many(
+            utterances=utterances,
+            transform_phrases=transform_phrases_all,
+            **kwargs,
+        )
 
     def generate_phrase_transforms_voice(self,
                                          *,
@@ -162,15 +885,11 @@ class Interactigen:
         :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
         :return: an array of transformed utterances.
         """
-        voice_transforms_result = [
-            result for in_entry in transform_phrases_voice
-            for result in self.generate_phrase_transforms(
-                utterances=utterances,
-                transform_phrase=in_entry,
-                **kwargs,
-            )]
-
-        return voice_transforms_result
+        return self._generate_phrase_transforms_many(
+            utterances=utterances,
+            transform_phrases=transform_phrases_voice,
+            **kwargs,
+        )
 
     def generate_phrase_transforms_text(self,
                                         *,
@@ -182,15 +901,11 @@ class Interactigen:
         :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
         :return: an array of transformed utterances.
         """
-        chat_transforms_result = [
-            result for in_entry in transform_phrases_text
-            for result in self.generate_phrase_transforms(
-                utterances=utterances,
-                transform_phrase=in_entry,
-                **kwargs,
-            )]
-
-        return chat_transforms_result
+        return self._generate_phrase_transforms_many(
+            utterances=utterances,
+            transform_phrases=transform_phrases_text,
+            **kwargs,
+        )
 
     def generate_phrase_base_utterances(self,
                                         *,
@@ -210,13 +925,11 @@ class Interactigen:
             **kwargs,
         )
 
-        transformed_utterances = [
-            result for in_entry in transform_phrases_base
-            for result in self.generate_phrase_transforms(
-                utterances=init_utterances,
-                transform_phrase=in_entry,
-                **kwargs,
-            )]
+        transformed_utterances = self._generate_phrase_transforms_many(
+            utterances=init_utterances,
+            transform_phrases=transform_phrases_base,
+            **kwargs,
+        )
 
         return init_utterances+transformed_utterances
 
@@ -225,35 +938,1478 @@ class Interactigen:
                                    base_phrase: str,
                                    init_quantity: int = 10,
                                    media_type: str = 'voice',
+                                   target_unique: int = None,
                                    **kwargs) -> list[str]:
         """
         Generate a fully augmented list of semantically diverse utterances from a base phrase.
         :param base_phrase: The base phrase.
         :param init_quantity: The initial quantity of semantically diverse utterances before any transformations.
         :param media_type: The intended media type for the phrases.  Default is 'voice'.
+        :param target_unique: The number of unique utterances to stop at.  The remaining transforms are skipped once
+                              it is reached, and new phrasings are requested when the pipeline falls short of it.
+                              Default is None, which runs the whole pipeline.
         :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
         :return: an array of semantically diverse utterances.
         """
-        final_utterances: list[str] = []
-        base_utterances = self.generate_phrase_base_utterances(
+        return list(self.generate_phrase_corpus(
             base_phrase=base_phrase,
             init_quantity=init_quantity,
+            media_type=media_type,
+            target_unique=target_unique,
             **kwargs,
+        ))
+
+    def generate_phrase_corpus(self,
+                               *,
+                               base_phrase: str,
+                               init_quantity: int = 10,
+                               media_type: str = 'voice',
+                               target_unique: int = None,
+                               **kwargs) -> UtteranceCorpus:
+        """
+        Generate a fully augmented corpus of semantically diverse utterances from a base phrase, with the stage and
+        transform that produced each one.
+
+        The client pipeline runs in waves: each wave starts once every stage it consumes has finished, and stages of
+        a wave sharing the same inputs are requested together.  Each stage reads its deduplicated inputs from the
+        corpus, and its output is added once its wave finishes, in pipeline order.  With target_unique, a wave's
+        transforms are requested a few at a time, just enough to cover the shortfall at one utterance per input
+        plus any that pack into the same calls.
+        :param base_phrase: The base phrase.
+        :param init_quantity: The initial quantity of semantically diverse utterances before any transformations.
+        :param media_type: The intended media type for the phrases.  Default is 'voice'.
+        :param target_unique: The number of unique utterances to stop at.  The remaining transforms are skipped once
+                              it is reached, and new phrasings are requested when the pipeline falls short of it.
+                              Default is None, which runs the whole pipeline.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the utterance corpus.
+        """
+        pipeline = self._get_pipeline(media_type)
+        corpus = UtteranceCorpus(dedup_index=self.dedup_factory(), capacity=target_unique)
+        corpus.extend(
+            self.generate_phrase_init_utterances(
+                base_phrase=base_phrase,
+                quantity=init_quantity,
+                **kwargs,
+            ),
+            stage=INIT_STAGE,
         )
-        final_utterances = final_utterances + base_utterances
 
-        all_transform_utterances = self.generate_phrase_transforms_all(utterances=base_utterances, **kwargs)
-        final_utterances = final_utterances + all_transform_utterances
+        def run_group(inputs: tuple[str, ...], transform_phrases: list[str]) -> dict[str, list[str]]:
+            utterances = list(corpus.view(stages=inputs))
+            if not utterances:
+                return {transform_phrase: [] for transform_phrase in transform_phrases}
+            return self._generate_phrase_transforms_keyed(
+                utterances=utterances,
+                transform_phrases=transform_phrases,
+                **kwargs,
+            )
+
+        for wave in pipeline.waves():
+            pending = [(stage, transform) for stage in wave for transform in stage.transforms]
+            while pending and not corpus.full:
+                batch, pending = self._quota_batch(corpus, pending)
+                groups = self._group_transforms(batch)
+                with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(groups))) as pool:
+                    transformed = dict(zip(groups, pool.map(run_group, groups, groups.values())))
+                for stage, transform in batch:
+                    corpus.extend(transformed[tuple(stage.inputs)][transform], stage=stage.name, transform=transform)
+
+        self._top_up(corpus, base_phrase=base_phrase, **kwargs)
+        return corpus
+
+    @staticmethod
+    def _group_transforms(pairs: list[tuple]) -> dict[tuple[str, ...], list[str]]:
+        """
+        Group the transform phrases of (stage, transform phrase) pairs by the inputs of their stage.
+        :param pairs: The (stage, transform phrase) pairs.
+        :return: the distinct transform phrases keyed by stage inputs, in pair order.
+        """
+        groups: dict[tuple[str, ...], list[str]] = {}
+        for stage, transform in pairs:
+            group = groups.setdefault(tuple(stage.inputs), [])
+            if transform not in group:
+                group.append(transform)
+        return groups
+
+    def _quota_batch(self, corpus: UtteranceCorpus, pending: list[tuple]) -> tuple[list[tuple], list[tuple]]:
+        """
+        Split off the (stage, transform phrase) pairs of a wave to request next: all of them, or when the corpus has
+        a quota, the fewest whose expected output of one utterance per input covers the shortfall, plus those that
+        fit in the same model calls.
+        :param corpus: The utterance corpus.
+        :param pending: The pairs not yet requested, in pipeline order.
+        :return: the pairs to request next and the pairs left.
+        """
+        if corpus.capacity is None:
+            return pending, []
+        chunks: dict[tuple[str, ...], list[list[str]]] = {}
+
+        def chunks_of(inputs: tuple[str, ...]) -> list[list[str]]:
+            if inputs not in chunks:
+                chunks[inputs] = [chunk for chunk in self._chunk_utterances(list(corpus.view(stages=inputs)))
+                                  if chunk]
+            return chunks[inputs]
+
+        def calls(pairs: list[tuple]) -> int:
+            total = 0
+            for inputs, transform_phrases in self._group_transforms(pairs).items():
+                model_phrases = [phrase for phrase in transform_phrases if not self._is_local_transform(phrase)]
+                for group in self.router.group_transforms(model_phrases):
+                    total += sum(1 if self._fits_multi_transform(chunk, group) else len(group)
+                                 for chunk in chunks_of(inputs))
+            return total
+
+        shortfall = corpus.capacity - len(corpus)
+        count = 0
+        expected = 0
+        while count < len(pending) and expected < shortfall:
+            expected += sum(len(chunk) for chunk in chunks_of(tuple(pending[count][0].inputs)))
+            count += 1
+        # Transforms packed into the calls already needed cost nothing extra.
+        needed = calls(pending[:count])
+        while count < len(pending) and calls(pending[:count + 1]) <= needed:
+            count += 1
+        return pending[:count], pending[count:]
+
+    @staticmethod
+    def _top_up_kwargs(kwargs: dict) -> dict:
+        """
+        Get the parameters of a new phrasing request made to reach a unique utterance quota.  Top-ups repeat the
+        prompt of the initial request, so they bypass the response cache and run journal, which would otherwise
+        replay the same response.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the parameters to request the top-up with.
+        """
+        return {**kwargs, 'use_cache': False, 'use_journal': False}
+
+    def _top_up(self, corpus: UtteranceCorpus, *, base_phrase: str, **kwargs) -> None:
+        """
+        Request the missing new phrasings until a corpus with a quota is full, giving up after max_top_ups requests
+        or as soon as one adds nothing new.
+        :param corpus: The utterance corpus.
+        :param base_phrase: The base phrase.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        """
+        for _ in range(self.max_top_ups):
+            if corpus.capacity is None or corpus.full:
+                return
+            utterances = self.generate_phrase_init_utterances(
+                base_phrase=base_phrase,
+                quantity=corpus.capacity - len(corpus),
+                **self._top_up_kwargs(kwargs),
+            )
+            if not corpus.extend(utterances, stage=INIT_STAGE):
+                return
+
+    async def _atop_up(self, corpus: UtteranceCorpus, *, base_phrase: str, **kwargs) -> None:
+        """
+        Asynchronously request the missing new phrasings until a corpus with a quota is full, giving up after
+        max_top_ups requests or as soon as one adds nothing new.
+        :param corpus: The utterance corpus.
+        :param base_phrase: The base phrase.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        """
+        for _ in range(self.max_top_ups):
+            if corpus.capacity is None or corpus.full:
+                return
+            utterances = await self.agenerate_phrase_init_utterances(
+                base_phrase=base_phrase,
+                quantity=corpus.capacity - len(corpus),
+                **self._top_up_kwargs(kwargs),
+            )
+            if not corpus.extend(utterances, stage=INIT_STAGE):
+                return
+
+    async def agenerate_phrase_init_utterances(self,
+                                               *,
+                                               base_phrase: str,
+                                               quantity: int,
+                                               **kwargs) -> list[str]:
+        """
+        Asynchronously generate a list of semantically diverse utterances from a base phrase.  Within a bulk run
+        with an intent_pack_size above 1, the request is packed with those of the other intents started with it.
+        :param base_phrase: The base phrase.
+        :param quantity: The quantity of semantically diverse utterances.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an array of semantically diverse utterances.
+        """
+        packer = _run_init_packer.get()
+        packed = await packer.request(base_phrase, quantity, kwargs) if packer is not None else None
+        if packed is not None:
+            return await self._acomplete_init(base_phrase=base_phrase, quantity=quantity, packed=packed, **kwargs)
+
+        from interactigen import GenNewPhrasings
+        cmd = GenNewPhrasings(
+            base_phrase=base_phrase,
+            quantity=quantity,
+        )
+        cmd_result = await self._aexecute(cmd, **kwargs)
+        base_chain_result = cmd_result.result
+        utterances = base_chain_result['utterances']
+        if is_salvaged(base_chain_result) and 0 < len(utterances) < quantity:
+            # Ask again only for the utterances the malformed response was missing, while it makes progress.
+            utterances = utterances + await self.agenerate_phrase_init_utterances(
+                base_phrase=base_phrase,
+                quantity=quantity - len(utterances),
+                **kwargs,
+            )
+        return utterances
+
+    async def _agenerate_packed_init(self,
+                                     *,
+                                     base_phrases: list[str],
+                                     quantity: int,
+                                     **kwargs) -> dict[str, tuple[list[str], bool]]:
+        """
+        Asynchronously generate new phrasings for several base phrases in a single model call.
+        :param base_phrases: The base phrases.
+        :param quantity: The quantity of semantically diverse utterances per base phrase.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the utterances and whether the response was salvaged, keyed by base phrase.  Phrases the model
+                 skipped are absent, and the result is empty if the call failed.
+        """
+        from interactigen import GenMultiNewPhrasings
+        cmd = GenMultiNewPhrasings(
+            base_phrases=base_phrases,
+            quantity=quantity,
+        )
+        try:
+            cmd_result = await self._aexecute(cmd, **kwargs)
+        except Exception as e:
+            log.warning(f"{cmd.session_id} | {cmd.cmd_name} | Falling back to single phrase calls: {e}")
+            return {}
+        salvaged = is_salvaged(cmd_result.result)
+        return {base_phrase: (utterances, salvaged)
+                for base_phrase, utterances in cmd_result.get_phrase_utterances().items()}
+
+    async def _acomplete_init(self,
+                              *,
+                              base_phrase: str,
+                              quantity: int,
+                              packed: tuple[list[str], bool] | None,
+                              **kwargs) -> list[str]:
+        """
+        Asynchronously complete the new phrasings of one base phrase of a pack: request them separately when the
+        pack skipped the phrase, or request the remainder when the response was cut short.
+        :param base_phrase: The base phrase.
+        :param quantity: The quantity of semantically diverse utterances.
+        :param packed: The packed result for the phrase, if any.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an array of semantically diverse utterances.
+        """
+        if packed is None:
+            return await self.agenerate_phrase_init_utterances(base_phrase=base_phrase, quantity=quantity, **kwargs)
+        utterances, salvaged = packed
+        if salvaged and len(utterances) < quantity:
+            utterances = utterances + await self.agenerate_phrase_init_utterances(
+                base_phrase=base_phrase,
+                quantity=quantity - len(utterances),
+                **kwargs,
+            )
+        return utterances
+
+    async def agenerate_phrase_multi_init_utterances(self,
+                                                     *,
+                                                     base_phrases: list[str],
+                                                     quantity: int,
+                                                     **kwargs) -> dict[str, list[str]]:
+        """
+        Asynchronously generate semantically diverse utterances for several base phrases, packing them into single
+        calls of up to intent_pack_size phrases whose output fits the model output limit.  Packs run concurrently,
+        and phrases a pack fails to answer are requested separately.
+        :param base_phrases: The base phrases.
+        :param quantity: The quantity of semantically diverse utterances per base phrase.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the semantically diverse utterances keyed by base phrase.
+        """
+        async def run_pack(pack: list[str]) -> list[list[str]]:
+            packed = await self._agenerate_packed_init(
+                base_phrases=pack,
+                quantity=quantity,
+                **kwargs,
+            ) if len(pack) > 1 else {}
+            return await asyncio.gather(*[self._acomplete_init(
+                base_phrase=base_phrase,
+                quantity=quantity,
+                packed=packed.get(base_phrase),
+                **kwargs,
+            ) for base_phrase in pack])
+
+        packs = self._init_packs(base_phrases, quantity)
+        results = await asyncio.gather(*[run_pack(pack) for pack in packs])
+        return {base_phrase: utterances for pack, pack_results in zip(packs, results)
+                for base_phrase, utterances in zip(pack, pack_results)}
+
+    async def agenerate_phrase_transforms(self,
+                                          *,
+                                          utterances: list[str],
+                                          transform_phrase: str,
+                                          **kwargs) -> list[str]:
+        """
+        Asynchronously generate a list of transformed utterances from an input source and transformation instruction.
+
+        Inputs larger than the chunk token budget are split into chunks that are transformed concurrently and merged
+        back in the original order.
+        :param utterances: The utterances to transform.
+        :param transform_phrase: The transformation instruction phrase.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an array of transformed utterances.
+        """
+        if self._is_local_transform(transform_phrase):
+            return self.local_transforms.transform(utterances=utterances, transform_phrase=transform_phrase)
+        chunks_results = await asyncio.gather(*[
+            self._agenerate_phrase_transforms_chunk(
+                utterances=chunk,
+                transform_phrase=transform_phrase,
+                **kwargs,
+            ) for chunk in self._chunk_utterances(utterances)
+        ])
+
+        return [result for chunk_result in chunks_results for result in chunk_result]
+
+    async def _agenerate_phrase_transforms_chunk(self,
+                                                 *,
+                                                 utterances: list[str],
+                                                 transform_phrase: str,
+                                                 **kwargs) -> list[str]:
+        """
+        Asynchronously transform a single chunk of utterances in one model call.
+        :param utterances: The utterances to transform.
+        :param transform_phrase: The transformation instruction phrase.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an array of transformed utterances.
+        """
+        from interactigen import GenTransformedPhrasings
+        cmd = GenTransformedPhrasings(
+            utterances=utterances,
+            transform_phrase=transform_phrase,
+        )
+        cmd_result = await self._aexecute(cmd, **kwargs)
+        transform_chain_result = cmd_result.result
+        transformed = transform_chain_result['utterances']
+        if is_salvaged(transform_chain_result) and 0 < len(transformed) < len(utterances):
+            # Ask again only for the inputs the malformed response did not reach, while it makes progress.
+            transformed = transformed + await self._agenerate_phrase_transforms_chunk(
+                utterances=utterances[len(transformed):],
+                transform_phrase=transform_phrase,
+                **kwargs,
+            )
+        return transformed
+
+    async def _agenerate_phrase_transforms_keyed(self,
+                                                 *,
+                                                 utterances: list[str],
+                                                 transform_phrases: list[str],
+                                                 **kwargs) -> dict[str, list[str]]:
+        """
+        Asynchronously apply several transformation instructions to the same utterances, chunking the input and
+        combining transforms into single calls when the output fits the model output limit.
+        :param utterances: The utterances to transform.
+        :param transform_phrases: The transformation instruction phrases.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the transformed utterances keyed by transform phrase, merged across chunks in input order.
+        """
+        chunks_results = await asyncio.gather(*[
+            self._agenerate_phrase_transforms_chunk_many(
+                utterances=chunk,
+                transform_phrases=transform_phrases,
+                **kwargs,
+            ) for chunk in self._chunk_utterances(utterances)
+        ])
+
+        return {
+            transform_phrase: [
+                result for chunk_result in chunks_results for result in chunk_result[transform_phrase]
+            ] for transform_phrase in transform_phrases
+        }
+
+    async def _agenerate_phrase_transforms_many(self,
+                                                *,
+                                                utterances: list[str],
+                                                transform_phrases: list[str],
+                                                **kwargs) -> list[str]:
+        """
+        Concurrently apply several transformation instructions to the same utterances, combining them into single
+        calls when the output fits the model output limit.
+        :param utterances: The utterances to transform.
+        :param transform_phrases: The transformation instruction phrases.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an array of transformed utterances, in transform_phrases order.
+        """
+        transformed = await self._agenerate_phrase_transforms_keyed(
+            utterances=utterances,
+            transform_phrases=transform_phrases,
+            **kwargs,
+        )
+
+        return [result for transform_phrase in transform_phrases for result in transformed[transform_phrase]]
+
+    async def agenerate_phrase_multi_transforms(self,
+                                                *,
+                                                utterances: list[str],
+                                                transform_phrases: list[str],
+                                                **kwargs) -> dict[str, list[str]]:
+        """
+        Asynchronously apply several transformation instructions to the same utterances in a single model call.
+        :param utterances: The utterances to transform.
+        :param transform_phrases: The transformation instruction phrases.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the transformed utterances keyed by transform phrase.  Instructions the model skipped are absent.
+        """
+        from interactigen import GenMultiTransformedPhrasings
+        cmd = GenMultiTransformedPhrasings(
+            utterances=utterances,
+            transform_phrases=transform_phrases,
+        )
+        cmd_result = await self._aexecute(cmd, **kwargs)
+        transformed = cmd_result.get_transformed_utterances()
+        if is_salvaged(cmd_result.result):
+            # Complete each transform the malformed response cut short from the inputs it did not reach.  Missing
+            # transforms are left to the caller's single-transform fallback.
+            for transform_phrase, results in transformed.items():
+                if len(results) < len(utterances):
+                    results.extend(await self._agenerate_phrase_transforms_chunk(
+                        utterances=utterances[len(results):],
+                        transform_phrase=transform_phrase,
+                        **kwargs,
+                    ))
+        return transformed
+
+    async def _agenerate_phrase_transforms_chunk_many(self,
+                                                      *,
+                                                      utterances: list[str],
+                                                      transform_phrases: list[str],
+                                                      **kwargs) -> dict[str, list[str]]:
+        """
+        Asynchronously apply several transformation instructions to a single chunk of utterances, in one call when
+        the output fits.
+        :param utterances: The utterances to transform.
+        :param transform_phrases: The transformation instruction phrases.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the transformed utterances keyed by transform phrase.
+        """
+        transformed = self._apply_local_transforms(utterances, transform_phrases)
+        model_phrases = [phrase for phrase in transform_phrases if phrase not in transformed]
+        for group_transformed in await asyncio.gather(*[
+            self.agenerate_phrase_multi_transforms(
+                utterances=utterances,
+                transform_phrases=group,
+                **kwargs,
+            ) for group in self._multi_transform_groups(utterances, model_phrases)
+        ]):
+            transformed.update(group_transformed)
+        missing = [transform_phrase for transform_phrase in transform_phrases if transform_phrase not in transformed]
+        missing_results = await asyncio.gather(*[
+            self._agenerate_phrase_transforms_chunk(
+                utterances=utterances,
+                transform_phrase=transform_phrase,
+                **kwargs,
+            ) for transform_phrase in missing
+        ])
+        transformed.update(zip(missing, missing_results))
+        return transformed
+
+    async def agenerate_phrase_transforms_all(self,
+                                              *,
+                                              utterances: list[str],
+                                              **kwargs) -> list[str]:
+        """
+        Asynchronously generate a list of transformed utterances based on rules to apply to all media types.
+        :param utterances: The utterances to transform.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an array of transformed utterances.
+        """
+        return await self._agenerate_phrase_transforms_many(
+            utterances=utterances,
+            transform_phrases=transform_phrases_all,
+            **kwargs,
+        )
+
+    async def agenerate_phrase_transforms_voice(self,
+                                                *,
+                                                utterances: list[str],
+                                                **kwargs) -> list[str]:
+        """
+        Asynchronously generate a list of transformed utterances based on rules to apply to voice-only media types.
+        :param utterances: The utterances to transform.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an array of transformed utterances.
+        """
+        return await self._agenerate_phrase_transforms_many(
+            utterances=utterances,
+            transform_phrases=transform_phrases_voice,
+            **kwargs,
+        )
+
+    async def agenerate_phrase_transforms_text(self,
+                                               *,
+                                               utterances: list[str],
+                                               **kwargs) -> list[str]:
+        """
+        Asynchronously generate a list of transformed utterances based on rules to apply to text-only media types.
+        :param utterances: The utterances to transform.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an array of transformed utterances.
+        """
+        return await self._agenerate_phrase_transforms_many(
+            utterances=utterances,
+            transform_phrases=transform_phrases_text,
+            **kwargs,
+        )
+
+    async def agenerate_phrase_base_utterances(self,
+                                               *,
+                                               base_phrase: str,
+                                               init_quantity: int,
+                                               **kwargs) -> list[str]:
+        """
+        Asynchronously generate a list of base + augmented semantically diverse utterances from a base phrase.
+        :param base_phrase: The base phrase.
+        :param init_quantity: The initial quantity of semantically diverse utterances before any transformations.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an array of semantically diverse utterances.
+        """
+        init_utterances = await self.agenerate_phrase_init_utterances(
+            base_phrase=base_phrase,
+            quantity=init_quantity,
+            **kwargs,
+        )
+
+        transformed_utterances = await self._agenerate_phrase_transforms_many(
+            utterances=init_utterances,
+            transform_phrases=transform_phrases_base,
+            **kwargs,
+        )
+
+        return init_utterances+transformed_utterances
+
+    async def agenerate_phrase_utterances(self,
+                                          *,
+                                          base_phrase: str,
+                                          init_quantity: int = 10,
+                                          media_type: str = 'voice',
+                                          target_unique: int = None,
+                                          **kwargs) -> list[str]:
+        """
+        Asynchronously generate a fully augmented list of semantically diverse utterances from a base phrase.
+        :param base_phrase: The base phrase.
+        :param init_quantity: The initial quantity of semantically diverse utterances before any transformations.
+        :param media_type: The intended media type for the phrases.  Default is 'voice'.
+        :param target_unique: The number of unique utterances to stop at.  The remaining transforms are skipped once
+                              it is reached, and new phrasings are requested when the pipeline falls short of it.
+                              Default is None, which runs the whole pipeline.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an array of semantically diverse utterances.
+        """
+        return list(await self.agenerate_phrase_corpus(
+            base_phrase=base_phrase,
+            init_quantity=init_quantity,
+            media_type=media_type,
+            target_unique=target_unique,
+            **kwargs,
+        ))
+
+    async def agenerate_phrase_corpus(self,
+                                      *,
+                                      base_phrase: str,
+                                      init_quantity: int = 10,
+                                      media_type: str = 'voice',
+                                      target_unique: int = None,
+                                      **kwargs) -> UtteranceCorpus:
+        """
+        Asynchronously generate a fully augmented corpus of semantically diverse utterances from a base phrase, with
+        the stage and transform that produced each one.
+
+        The client pipeline makes the same calls on the same deduplicated inputs as generate_phrase_corpus(), so
+        both return the same corpus.  Without target_unique, the stages of a wave sharing the same inputs are still
+        requested together, but each group starts as soon as the stages it consumes have been added to the corpus,
+        rather than once the previous wave has finished.  Calls run concurrently, bounded by max_concurrency.
+        :param base_phrase: The base phrase.
+        :param init_quantity: The initial quantity of semantically diverse utterances before any transformations.
+        :param media_type: The intended media type for the phrases.  Default is 'voice'.
+        :param target_unique: The number of unique utterances to stop at.  The remaining transforms are skipped once
+                              it is reached, and new phrasings are requested when the pipeline falls short of it.
+                              Default is None, which runs the whole pipeline.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the utterance corpus.
+        """
+        pipeline = self._get_pipeline(media_type)
+        corpus = UtteranceCorpus(dedup_index=self.dedup_factory(), capacity=target_unique)
+        corpus.extend(
+            await self.agenerate_phrase_init_utterances(
+                base_phrase=base_phrase,
+                quantity=init_quantity,
+                **kwargs,
+            ),
+            stage=INIT_STAGE,
+        )
+        await self._arun_pipeline(corpus=corpus, pipeline=pipeline, **kwargs)
+        await self._atop_up(corpus, base_phrase=base_phrase, **kwargs)
+        return corpus
+
+    async def _arun_pipeline(self,
+                             *,
+                             corpus: UtteranceCorpus,
+                             pipeline: Pipeline,
+                             events: asyncio.Queue = None,
+                             **kwargs) -> None:
+        """
+        Run a pipeline over a corpus holding the initial utterances, with each stage reading its deduplicated inputs
+        from the corpus and adding its output in the order of generate_phrase_corpus().
+        :param corpus: The utterance corpus.
+        :param pipeline: The pipeline.
+        :param events: The optional queue receiving each utterance event as it is streamed.  Default is None, which
+                       waits for complete responses.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        """
+        # Events are tagged with the first stage requesting a transform of the same inputs.
+        stage_names: dict[tuple[tuple[str, ...], str], str] = {}
+        for stage in pipeline.stages:
+            for transform in stage.transforms:
+                stage_names.setdefault((tuple(stage.inputs), transform), stage.name)
+
+        async def run_group(inputs: tuple[str, ...], transform_phrases: list[str]) -> dict[str, list[str]]:
+            utterances = list(corpus.view(stages=inputs))
+            if not utterances:
+                return {transform_phrase: [] for transform_phrase in transform_phrases}
+            if events is not None:
+                return await self._astream_phrase_transforms(
+                    utterances=utterances,
+                    transform_stages={transform_phrase: stage_names[inputs, transform_phrase]
+                                      for transform_phrase in transform_phrases},
+                    events=events,
+                    **kwargs,
+                )
+            return await self._agenerate_phrase_transforms_keyed(
+                utterances=utterances,
+                transform_phrases=transform_phrases,
+                **kwargs,
+            )
+
+        if corpus.capacity is not None:
+            # Quota batches depend on what the previous batch added, so they keep the wave barrier.
+            for wave in pipeline.waves():
+                pending = [(stage, transform) for stage in wave for transform in stage.transforms]
+                while pending and not corpus.full:
+                    batch, pending = self._quota_batch(corpus, pending)
+                    groups = self._group_transforms(batch)
+                    transformed = dict(zip(groups, await asyncio.gather(*[
+                        run_group(inputs, transform_phrases) for inputs, transform_phrases in groups.items()
+                    ])))
+                    for stage, transform in batch:
+                        corpus.extend(transformed[tuple(stage.inputs)][transform], stage=stage.name,
+                                      transform=transform)
+            return
+
+        added = {stage.name: asyncio.Event() for stage in pipeline.stages}
+
+        async def run_eager(inputs: tuple[str, ...], transform_phrases: list[str]) -> dict[str, list[str]]:
+            # A stage's utterances are final once every stage added before it is, whatever the later stages return.
+            for stage_input in inputs:
+                if stage_input in added:
+                    await added[stage_input].wait()
+            return await run_group(inputs, transform_phrases)
+
+        waves = pipeline.waves()
+        async with asyncio.TaskGroup() as task_group:
+            waves_tasks = [{
+                inputs: task_group.create_task(run_eager(inputs, transform_phrases))
+                for inputs, transform_phrases in self._group_transforms([
+                    (stage, transform) for stage in wave for transform in stage.transforms
+                ]).items()
+            } for wave in waves]
+            for wave, wave_tasks in zip(waves, waves_tasks):
+                for stage in wave:
+                    if stage.transforms:
+                        transformed = await wave_tasks[tuple(stage.inputs)]
+                        for transform in stage.transforms:
+                            corpus.extend(transformed[transform], stage=stage.name, transform=transform)
+                    added[stage.name].set()
+
+    async def _astream_command(self, cmd, **kwargs) -> AsyncIterator[tuple[int | None, str]]:
+        """
+        Stream a command's utterances as they arrive, consulting the run journal and response cache first and bounded
+        by the concurrency limit.
+        :param cmd: The command instance.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an async iterator of utterances, each paired with the "transform" number that produced it, if any.
+        """
+        use_cache = kwargs.pop('use_cache', True)
+        use_journal = kwargs.pop('use_journal', True)
+        call = self._begin_call(cmd)
+        source = None
+        error = None
+        try:
+            key = self._command_key(cmd, **kwargs)
+            parser = UtteranceStreamParser()
+            source = self._load_result(cmd, key, use_cache, use_journal)
+            if source is not None:
+                for item in parser.feed(json.dumps(cmd.result)) + parser.close():
+                    yield item
+                return
+
+            async with self._get_semaphore():
+                if self.rate_limiter is not None:
+                    # Streams are not retried, as utterances may already have been yielded.
+                    estimate = self._estimate_command_tokens(cmd)
+                    await self.rate_limiter.aacquire(tokens=estimate)
+                    start = time.monotonic()
+                    try:
+                        async for chunk in self.router.pool_for(cmd).astream(cmd, **self._dispatch_call(call, kwargs)):
+                            for item in parser.feed(chunk):
+                                yield item
+                    except Exception as e:
+                        self.rate_limiter.release(error=e)
+                        raise
+                    except BaseException:
+                        self.rate_limiter.release()
+                        raise
+                    self.rate_limiter.release(latency=time.monotonic() - start)
+                    self._settle_tokens(call, estimate)
+                else:
+                    async for chunk in self.router.pool_for(cmd).astream(cmd, **self._dispatch_call(call, kwargs)):
+                        for item in parser.feed(chunk):
+                            yield item
+
+            for item in parser.close():
+                yield item
+            try:
+                cmd.result = cmd.output_parser.parse(parser.text)
+            except Exception as e:
+                log.warning(f"{cmd.session_id} | {cmd.cmd_name} | Streamed response could not be parsed: {e}")
+                if call is not None:
+                    call.parse_failures += 1
+                return
+            if call is not None and is_salvaged(cmd.result):
+                call.parse_failures += 1
+            self._store_result(cmd, key, use_journal)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._end_call(call, cmd, source=source or 'model', error=error)
+
+    async def _astream_phrase_transforms_chunk(self,
+                                               *,
+                                               utterances: list[str],
+                                               transform_stages: dict[str, str],
+                                               events: asyncio.Queue,
+                                               **kwargs) -> dict[str, list[str]]:
+        """
+        Stream several transforms of a single chunk of utterances, in one call when the output fits.
+        :param utterances: The utterances to transform.
+        :param transform_stages: The stage name of each transformation instruction phrase.
+        :param events: The queue receiving each utterance event.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the transformed utterances keyed by transform phrase.
+        """
+        from interactigen import GenMultiTransformedPhrasings, GenTransformedPhrasings
+        transformed = self._apply_local_transforms(utterances, list(transform_stages))
+        for transform_phrase, local_utterances in transformed.items():
+            for local_utterance in local_utterances:
+                await events.put(UtteranceEvent(transform_stages[transform_phrase], transform_phrase, local_utterance))
+        transform_phrases = [phrase for phrase in transform_stages if phrase not in transformed]
+
+        async def stream_single(transform_phrase: str, inputs: list[str]) -> list[str]:
+            single_cmd = GenTransformedPhrasings(
+                utterances=inputs,
+                transform_phrase=transform_phrase,
+            )
+            single_transformed: list[str] = []
+            async for _, single_utterance in self._astream_command(single_cmd, **kwargs):
+                single_transformed.append(single_utterance)
+                await events.put(UtteranceEvent(transform_stages[transform_phrase], transform_phrase,
+                                                single_utterance))
+            if is_salvaged(single_cmd.result) and 0 < len(single_transformed) < len(inputs):
+                # Ask again only for the inputs the malformed response did not reach, while it makes progress.
+                single_transformed += await stream_single(transform_phrase, inputs[len(single_transformed):])
+            return single_transformed
+
+        async def stream_multi(group: list[str]) -> None:
+            cmd = GenMultiTransformedPhrasings(
+                utterances=utterances,
+                transform_phrases=group,
+            )
+            async for transform_idx, utterance in self._astream_command(cmd, **kwargs):
+                if transform_idx is None or not 1 <= transform_idx <= len(group):
+                    continue
+                transform_phrase = group[transform_idx - 1]
+                transformed.setdefault(transform_phrase, []).append(utterance)
+                await events.put(UtteranceEvent(transform_stages[transform_phrase], transform_phrase, utterance))
+            for transform_phrase in cmd.get_transformed_utterances():
+                transformed.setdefault(transform_phrase, [])
+            if is_salvaged(cmd.result):
+                # Complete each transform the malformed response cut short from the inputs it did not reach.  Missing
+                # transforms are left to the single-transform fallback.
+                for transform_phrase in group:
+                    results = transformed.get(transform_phrase)
+                    if results is not None and len(results) < len(utterances):
+                        results.extend(await stream_single(transform_phrase, utterances[len(results):]))
+
+        await asyncio.gather(*[stream_multi(group)
+                               for group in self._multi_transform_groups(utterances, transform_phrases)])
+
+        missing = [transform_phrase for transform_phrase in transform_phrases if transform_phrase not in transformed]
+        missing_results = await asyncio.gather(*[stream_single(transform_phrase, utterances)
+                                                 for transform_phrase in missing])
+        transformed.update(zip(missing, missing_results))
+        return transformed
+
+    async def _astream_phrase_transforms(self,
+                                         *,
+                                         utterances: list[str],
+                                         transform_stages: dict[str, str],
+                                         events: asyncio.Queue,
+                                         **kwargs) -> dict[str, list[str]]:
+        """
+        Concurrently stream several transforms of the same utterances.
+        :param utterances: The utterances to transform.
+        :param transform_stages: The stage name of each transformation instruction phrase.
+        :param events: The queue receiving each utterance event.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the transformed utterances keyed by transform phrase, merged across chunks in input order.
+        """
+        chunks_results = await asyncio.gather(*[
+            self._astream_phrase_transforms_chunk(
+                utterances=chunk,
+                transform_stages=transform_stages,
+                events=events,
+                **kwargs,
+            ) for chunk in self._chunk_utterances(utterances)
+        ])
+
+        return {
+            transform_phrase: [
+                result for chunk_result in chunks_results for result in chunk_result[transform_phrase]
+            ] for transform_phrase in transform_stages
+        }
+
+    async def astream_phrase_utterances(self,
+                                        *,
+                                        base_phrase: str,
+                                        init_quantity: int = 10,
+                                        media_type: str = 'voice',
+                                        target_unique: int = None,
+                                        **kwargs) -> AsyncIterator[UtteranceEvent]:
+        """
+        Asynchronously stream a fully augmented set of semantically diverse utterances from a base phrase.
+
+        Each utterance is yielded as soon as its string closes in the model response, tagged with the pipeline stage
+        name ('init' for the initial utterances) and transform phrase that produced it.  Duplicates are suppressed
+        with the client's dedup index.  Stages read their deduplicated inputs from a corpus and are scheduled like
+        agenerate_phrase_corpus(), so they make the same calls; without target_unique, the utterances yielded are
+        those of agenerate_phrase_utterances(), though concurrent transforms interleave.  Near-duplicates are
+        suppressed in arrival order, so with a NearDuplicateIndex the representative kept may differ.  With
+        target_unique, the stream ends as soon as that many utterances have been yielded, cancelling the remaining
+        stages.
+        :param base_phrase: The base phrase.
+        :param init_quantity: The initial quantity of semantically diverse utterances before any transformations.
+        :param media_type: The intended media type for the phrases.  Default is 'voice'.
+        :param target_unique: The number of unique utterances to stop at.  The remaining transforms are skipped once
+                              it is reached, and new phrasings are requested when the pipeline falls short of it.
+                              Default is None, which runs the whole pipeline.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an async iterator of utterance events.
+        """
+        from interactigen import GenNewPhrasings
+        pipeline = self._get_pipeline(media_type)
+        events: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def stream_init(quantity: int) -> list[str]:
+            cmd = GenNewPhrasings(
+                base_phrase=base_phrase,
+                quantity=quantity,
+            )
+            utterances: list[str] = []
+            async for _, utterance in self._astream_command(cmd, **kwargs):
+                utterances.append(utterance)
+                await events.put(UtteranceEvent(INIT_STAGE, None, utterance))
+            if is_salvaged(cmd.result) and 0 < len(utterances) < quantity:
+                # Ask again only for the utterances the malformed response was missing, while it makes progress.
+                utterances += await stream_init(quantity - len(utterances))
+            return utterances
+
+        async def produce():
+            try:
+                if _run_init_packer.get() is not None:
+                    # Packed with the other intents of a bulk run, rather than streamed.
+                    init_utterances = await self.agenerate_phrase_init_utterances(
+                        base_phrase=base_phrase,
+                        quantity=init_quantity,
+                        **kwargs,
+                    )
+                    for utterance in init_utterances:
+                        await events.put(UtteranceEvent(INIT_STAGE, None, utterance))
+                else:
+                    init_utterances = await stream_init(init_quantity)
+
+                corpus = UtteranceCorpus(dedup_index=self.dedup_factory(), capacity=target_unique)
+                corpus.extend(init_utterances, stage=INIT_STAGE)
+                await self._arun_pipeline(corpus=corpus, pipeline=pipeline, events=events, **kwargs)
+            finally:
+                await events.put(done)
+
+        producer = asyncio.create_task(produce())
+        dedup_index = self.dedup_factory()
+        try:
+            while (event := await events.get()) is not done:
+                if dedup_index.add(event.utterance):
+                    yield event
+                    if target_unique is not None and len(dedup_index) >= target_unique:
+                        return
+            await producer
+        finally:
+            producer.cancel()
+
+        if target_unique is None:
+            return
+        for _ in range(self.max_top_ups):
+            retained = len(dedup_index)
+            if retained >= target_unique:
+                return
+            cmd = GenNewPhrasings(
+                base_phrase=base_phrase,
+                quantity=target_unique - retained,
+            )
+            async for _, utterance in self._astream_command(cmd, **self._top_up_kwargs(kwargs)):
+                if len(dedup_index) < target_unique and dedup_index.add(utterance):
+                    yield UtteranceEvent(INIT_STAGE, None, utterance)
+            if len(dedup_index) == retained:
+                return
+
+    def stream_phrase_utterances(self,
+                                 *,
+                                 base_phrase: str,
+                                 init_quantity: int = 10,
+                                 media_type: str = 'voice',
+                                 target_unique: int = None,
+                                 **kwargs) -> Iterator[UtteranceEvent]:
+        """
+        Stream a fully augmented set of semantically diverse utterances from a base phrase.
+
+        Runs astream_phrase_utterances() on a private event loop in a worker thread.
+        :param base_phrase: The base phrase.
+        :param init_quantity: The initial quantity of semantically diverse utterances before any transformations.
+        :param media_type: The intended media type for the phrases.  Default is 'voice'.
+        :param target_unique: The number of unique utterances to stop at.  The remaining transforms are skipped once
+                              it is reached, and new phrasings are requested when the pipeline falls short of it.
+                              Default is None, which runs the whole pipeline.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an iterator of utterance events.
+        """
+        return _iterate_in_thread(self.astream_phrase_utterances(
+            base_phrase=base_phrase,
+            init_quantity=init_quantity,
+            media_type=media_type,
+            target_unique=target_unique,
+            **kwargs,
+        ))
+
+    async def _agenerate_dataset_entry(self,
+                                       *,
+                                       base_phrase: str,
+                                       init_quantity: int,
+                                       media_type: str,
+                                       **kwargs) -> DatasetResult:
+        """
+        Generate the utterances for one intent of a bulk run, capturing any failure in the result.
+        :param base_phrase: The base phrase.
+        :param init_quantity: The initial quantity of semantically diverse utterances before any transformations.
+        :param media_type: The intended media type for the phrases.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the intent result.
+        """
+        try:
+            utterances = await self.agenerate_phrase_utterances(
+                base_phrase=base_phrase,
+                init_quantity=init_quantity,
+                media_type=media_type,
+                **kwargs,
+            )
+            return DatasetResult(base_phrase=base_phrase, utterances=utterances)
+        except Exception as e:
+            log.error(f"Failed to generate utterances for '{base_phrase}': {e}")
+            return DatasetResult(base_phrase=base_phrase, error=e)
+
+    async def agenerate_dataset(self,
+                                phrases: Iterable[str],
+                                *,
+                                init_quantity: int = 10,
+                                media_type: str = 'voice',
+                                max_concurrency: int = None,
+                                max_pending: int = None,
+                                **kwargs) -> AsyncIterator[DatasetResult]:
+        """
+        Asynchronously generate fully augmented utterances for many intents, yielding each intent as it completes.
+
+        Every command of every intent shares one pool of max_concurrency model calls (and the client rate limiter,
+        if any), so throughput is bounded by provider limits rather than per-intent serialization.  Results are
+        yielded in completion order.
+        :param phrases: The base phrases, one per intent.  Consumed lazily.
+        :param init_quantity: The initial quantity of semantically diverse utterances before any transformations.
+        :param media_type: The intended media type for the phrases.  Default is 'voice'.
+        :param max_concurrency: The maximum number of in-flight model calls for this run.  Default is the client's.
+        :param max_pending: The maximum number of intents in progress at once.  Default is twice max_concurrency.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an async iterator of per-intent results.
+        """
+        results = self._arun_bulk(
+            phrases,
+            lambda base_phrase: self._agenerate_dataset_entry(
+                base_phrase=base_phrase,
+                init_quantity=init_quantity,
+                media_type=media_type,
+                **kwargs,
+            ),
+            max_concurrency=max_concurrency,
+            max_pending=max_pending,
+        )
+        async for result in results:
+            yield result
+
+    async def _arun_bulk(self,
+                         jobs: Iterable,
+                         run: Callable[[object], Awaitable[DatasetResult]],
+                         *,
+                         max_concurrency: int | None,
+                         max_pending: int | None,
+                         ) -> AsyncIterator[DatasetResult]:
+        """
+        Run the intents of a bulk run concurrently, sharing one pool of model calls, yielding each as it completes.
+        With an intent_pack_size above 1, intents are admitted in packs whose new phrasings share calls.
+        :param jobs: The intents.  Consumed lazily.
+        :param run: The coroutine function running one intent.
+        :param max_concurrency: The maximum number of in-flight model calls for this run.  Default is the client's.
+        :param max_pending: The maximum number of intents in progress at once.  Default is twice max_concurrency.
+        :return: an async iterator of per-intent results.
+        """
+        max_concurrency = max_concurrency if max_concurrency is not None else self.max_concurrency
+        if max_concurrency < 1:
+            raise Exception('max_concurrency must be at least 1')
+        max_pending = max_pending if max_pending is not None else 2 * max_concurrency
+        if max_pending < 1:
+            raise Exception('max_pending must be at least 1')
+        pack_size = min(self.intent_pack_size, max_pending)
+
+        token = _run_semaphore.set(asyncio.Semaphore(max_concurrency))
+        packer = _InitPacker(self) if pack_size > 1 else None
+        packer_token = _run_init_packer.set(packer)
+        pending: set[asyncio.Task] = set()
+        try:
+            jobs_iter = iter(jobs)
+            exhausted = False
+            while True:
+                # Admit intents a pack at a time, so that their new phrasing requests are packed together.
+                while not exhausted and len(pending) + pack_size <= max_pending:
+                    for _ in range(pack_size):
+                        job = next(jobs_iter, None)
+                        if job is None:
+                            exhausted = True
+                            break
+                        pending.add(asyncio.create_task(run(job)))
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if packer is not None:
+                packer.cancel()
+            _run_init_packer.reset(packer_token)
+            _run_semaphore.reset(token)
+
+    def generate_dataset(self,
+                         phrases: Iterable[str],
+                         *,
+                         init_quantity: int = 10,
+                         media_type: str = 'voice',
+                         max_concurrency: int = None,
+                         max_pending: int = None,
+                         **kwargs) -> Iterator[DatasetResult]:
+        """
+        Generate fully augmented utterances for many intents, yielding each intent as it completes.
+
+        The run executes agenerate_dataset() on a private event loop in a worker thread, so it is safe to call from
+        code that already has an event loop running, such as Jupyter notebooks.
+        :param phrases: The base phrases, one per intent.  Consumed lazily.
+        :param init_quantity: The initial quantity of semantically diverse utterances before any transformations.
+        :param media_type: The intended media type for the phrases.  Default is 'voice'.
+        :param max_concurrency: The maximum number of in-flight model calls for this run.  Default is the client's.
+        :param max_pending: The maximum number of intents in progress at once.  Default is twice max_concurrency.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an iterator of per-intent results.
+        """
+        return _iterate_in_thread(self.agenerate_dataset(
+            phrases,
+            init_quantity=init_quantity,
+            media_type=media_type,
+            max_concurrency=max_concurrency,
+            max_pending=max_pending,
+            **kwargs,
+        ))
+
+    async def _awrite_dataset_entry(self,
+                                    *,
+                                    intent: str,
+                                    base_phrase: str,
+                                    sink: DatasetSink,
+                                    init_quantity: int,
+                                    media_type: str,
+                                    **kwargs) -> DatasetResult:
+        """
+        Stream the utterances for one intent of a bulk run into a sink, capturing any failure in the result.
+        :param intent: The intent name.
+        :param base_phrase: The base phrase.
+        :param sink: The dataset sink.
+        :param init_quantity: The initial quantity of semantically diverse utterances before any transformations.
+        :param media_type: The intended media type for the phrases.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the intent result, counting the records written.
+        """
+        records = 0
+        try:
+            async for event in self.astream_phrase_utterances(
+                base_phrase=base_phrase,
+                init_quantity=init_quantity,
+                media_type=media_type,
+                **kwargs,
+            ):
+                sink.write(DatasetRecord(intent, base_phrase, event.stage, event.transform, event.utterance))
+                records += 1
+            return DatasetResult(base_phrase=base_phrase, records=records)
+        except Exception as e:
+            log.error(f"Failed to generate utterances for '{base_phrase}': {e}")
+            return DatasetResult(base_phrase=base_phrase, error=e, records=records)
+
+    async def awrite_dataset(self,
+                             phrases: Iterable[str | tuple[str, str]],
+                             sink: DatasetSink,
+                             *,
+                             init_quantity: int = 10,
+                             media_type: str = 'voice',
+                             max_concurrency: int = None,
+                             max_pending: int = None,
+                             **kwargs) -> AsyncIterator[DatasetResult]:
+        """
+        Asynchronously generate fully augmented utterances for many intents, writing each utterance to a sink as soon
+        as it is produced, with its intent, stage and transform provenance.  Memory use is bounded by the intents in
+        progress rather than the dataset size.
+
+        Each intent is yielded as it completes, with the number of records written but no utterances.  The records
+        of an intent that fails part way remain in the sink.  The sink is not closed.
+        :param phrases: The base phrases, one per intent, or (intent, base_phrase) pairs.  Consumed lazily.
+        :param sink: The dataset sink, e.g. a JsonlSink or ParquetSink with a HashSplitter.
+        :param init_quantity: The initial quantity of semantically diverse utterances before any transformations.
+        :param media_type: The intended media type for the phrases.  Default is 'voice'.
+        :param max_concurrency: The maximum number of in-flight model calls for this run.  Default is the client's.
+        :param max_pending: The maximum number of intents in progress at once.  Default is twice max_concurrency.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an async iterator of per-intent results.
+        """
+        results = self._arun_bulk(
+            ((phrase, phrase) if isinstance(phrase, str) else tuple(phrase) for phrase in phrases),
+            lambda job: self._awrite_dataset_entry(
+                intent=job[0],
+                base_phrase=job[1],
+                sink=sink,
+                init_quantity=init_quantity,
+                media_type=media_type,
+                **kwargs,
+            ),
+            max_concurrency=max_concurrency,
+            max_pending=max_pending,
+        )
+        async for result in results:
+            yield result
+
+    def write_dataset(self,
+                      phrases: Iterable[str | tuple[str, str]],
+                      sink: DatasetSink,
+                      *,
+                      init_quantity: int = 10,
+                      media_type: str = 'voice',
+                      max_concurrency: int = None,
+                      max_pending: int = None,
+                      **kwargs) -> Iterator[DatasetResult]:
+        """
+        Generate fully augmented utterances for many intents, writing each utterance to a sink as soon as it is
+        produced.
+
+        Runs awrite_dataset() on a private event loop in a worker thread.  The sink is only written from that thread.
+        :param phrases: The base phrases, one per intent, or (intent, base_phrase) pairs.  Consumed lazily.
+        :param sink: The dataset sink, e.g. a JsonlSink or ParquetSink with a HashSplitter.
+        :param init_quantity: The initial quantity of semantically diverse utterances before any transformations.
+        :param media_type: The intended media type for the phrases.  Default is 'voice'.
+        :param max_concurrency: The maximum number of in-flight model calls for this run.  Default is the client's.
+        :param max_pending: The maximum number of intents in progress at once.  Default is twice max_concurrency.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an iterator of per-intent results.
+        """
+        return _iterate_in_thread(self.awrite_dataset(
+            phrases,
+            sink,
+            init_quantity=init_quantity,
+            media_type=media_type,
+            max_concurrency=max_concurrency,
+            max_pending=max_pending,
+            **kwargs,
+        ))
+
+    def _run_batch(self,
+                   backend: BatchBackend,
+                   cmds: list,
+                   *,
+                   poll_interval: float,
+                   timeout: float | None,
+                   **kwargs) -> list[Exception | None]:
+        """
+        Execute commands as one batch job, consulting the run journal and response cache first.
+        :param backend: The batch backend.
+        :param cmds: The command instances.
+        :param poll_interval: The seconds between job status checks.
+        :param timeout: The seconds to wait for the job to finish before cancelling it, or None to wait indefinitely.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the exception each command failed with, or None, in command order.
+        """
+        use_cache = kwargs.pop('use_cache', True)
+        use_journal = kwargs.pop('use_journal', True)
+        errors: list[Exception | None] = [None] * len(cmds)
+        pending = []
+        for position, cmd in enumerate(cmds):
+            call = self._begin_call(cmd)
+            key = None
+            if self.cache is not None or self.journal is not None:
+                key = ResponseCache.key_for(cmd, model=backend, **kwargs)
+            source = self._load_result(cmd, key, use_cache, use_journal)
+            if source is not None:
+                self._end_call(call, cmd, source=source, error=None)
+            else:
+                pending.append((position, cmd, key, call))
+        if not pending:
+            return errors
+
+        job_id = backend.submit([BatchRequest.of(str(position), cmd, **kwargs) for position, cmd, _, _ in pending])
+        for _, _, _, call in pending:
+            if call is not None:
+                call.dispatched()
+        log.info(f"Submitted batch job {job_id} of {len(pending)} commands")
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        timed_out = False
+        while (status := backend.status(job_id)) not in terminal_statuses:
+            if deadline is not None and time.monotonic() >= deadline:
+                timed_out = True
+                break
+            time.sleep(poll_interval)
+        if timed_out:
+            # The commands the job completed are kept, the others fail with a timeout like those of a failed job.
+            log.warning(f"Batch job {job_id} did not finish within {timeout} seconds, cancelling it")
+            try:
+                backend.cancel(job_id)
+            except Exception as e:
+                log.warning(f"Batch job {job_id} could not be cancelled: {e}")
+        else:
+            log.info(f"Batch job {job_id} {status}")
+
+        results = {result.custom_id: result for result in backend.results(job_id)}
+        for position, cmd, key, call in pending:
+            result = results.get(str(position))
+            error = None
+            if result is None and timed_out:
+                error = TimeoutError(f"Batch job {job_id} did not finish within {timeout} seconds")
+            elif result is None:
+                error = Exception(f"Batch job {job_id} ended {status} without completing the command")
+            elif result.error is not None:
+                error = Exception(f"Batch request failed: {result.error}")
+            else:
+                if call is not None and result.usage:
+                    call.prompt_tokens = result.usage.get('prompt_tokens', 0)
+                    call.completion_tokens = result.usage.get('completion_tokens', 0)
+                try:
+                    cmd.result = cmd.output_parser.parse(result.text)
+                    if call is not None and is_salvaged(cmd.result):
+                        call.parse_failures += 1
+                    self._store_result(cmd, key, use_journal)
+                except Exception as e:
+                    error = e
+            if error is not None:
+                log.error(f"{cmd.session_id} | {cmd.cmd_name} | {error}")
+            errors[position] = error
+            self._end_call(call, cmd, source='batch', error=error)
+        return errors
+
+    def generate_dataset_batch(self,
+                               phrases: Iterable[str],
+                               backend: BatchBackend,
+                               *,
+                               init_quantity: int = 10,
+                               media_type: str = 'voice',
+                               poll_interval: float = 60.0,
+                               timeout: float = None,
+                               **kwargs) -> list[DatasetResult]:
+        """
+        Generate fully augmented utterances for many intents through a provider batch API, for large offline runs
+        where cost and rate limits matter more than latency.
+
+        The new phrasings of every intent are submitted as one batch job, packed by intent_pack_size, with a
+        follow-up job for the intents a pack failed to answer.  The transforms of each pipeline wave for every intent
+        are then submitted as another, each job polled until it finishes.  Transforms that a multi-transform response
+        skipped, and the remainder of responses salvaged from malformed output, go in a follow-up job.  Local
+        transforms are applied in process.  The run journal and response cache are consulted before submitting, so
+        a restarted run only resubmits unfinished commands.  Model routes do not apply: the backend's model serves
+        every command.
+        :param phrases: The base phrases, one per intent.
+        :param backend: The batch backend, e.g. an OpenAIBatchBackend, or a LocalBatchBackend for testing.
+        :param init_quantity: The initial quantity of semantically diverse utterances before any transformations.
+        :param media_type: The intended media type for the phrases.  Default is 'voice'.
+        :param poll_interval: The seconds between job status checks.  Default is 60.
+        :param timeout: The seconds to wait for each job to finish.  A job still running is then cancelled, and its
+                        commands without a result fail with a TimeoutError.  Default is None, which waits
+                        indefinitely.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: the per-intent results, in phrases order.  An intent whose command fails carries the error and is
+                 left out of later jobs.
+        """
+        from interactigen import (GenMultiNewPhrasings, GenMultiTransformedPhrasings, GenNewPhrasings,
+                                  GenTransformedPhrasings)
+        base_phrases = list(phrases)
+        pipeline = self._get_pipeline(media_type)
+        corpora = [UtteranceCorpus(dedup_index=self.dedup_factory()) for _ in base_phrases]
+        errors: list[Exception | None] = [None] * len(base_phrases)
+
+        def run(jobs: list[tuple]) -> list[tuple]:
+            cmd_errors = self._run_batch(backend, [job[1] for job in jobs], poll_interval=poll_interval,
+                                         timeout=timeout, **kwargs)
+            for job, error in zip(jobs, cmd_errors):
+                # A failed pack is not an intent failure, its phrases fall back to their own commands.
+                if error is not None and job[0] is not None and errors[job[0]] is None:
+                    errors[job[0]] = error
+            return [job for job, error in zip(jobs, cmd_errors)
+                    if error is None and (job[0] is None or errors[job[0]] is None)]
+
+        # The new phrasings of each base phrase, and whether the response was salvaged.
+        init_results: dict[str, tuple[list[str], bool]] = {}
+        pack_jobs = [(None, GenMultiNewPhrasings(base_phrases=pack, quantity=init_quantity))
+                     for pack in self._init_packs(base_phrases, init_quantity) if len(pack) > 1]
+        for _, cmd in run(pack_jobs):
+            salvaged = is_salvaged(cmd.result)
+            init_results.update((base_phrase, (utterances, salvaged))
+                                for base_phrase, utterances in cmd.get_phrase_utterances().items())
+        init_jobs = [(idx, GenNewPhrasings(base_phrase=base_phrase, quantity=init_quantity))
+                     for idx, base_phrase in enumerate(base_phrases) if base_phrase not in init_results]
+        for idx, cmd in run(init_jobs):
+            init_results[cmd.base_phrase] = (cmd.result['utterances'], is_salvaged(cmd.result))
+        follow_up_jobs = []
+        for idx, base_phrase in enumerate(base_phrases):
+            if errors[idx] is not None:
+                continue
+            utterances, salvaged = init_results[base_phrase]
+            corpora[idx].extend(utterances, stage=INIT_STAGE)
+            if salvaged and len(utterances) < init_quantity:
+                follow_up_jobs.append((idx, GenNewPhrasings(base_phrase=base_phrase,
+                                                            quantity=init_quantity - len(utterances))))
+        for idx, cmd in run(follow_up_jobs):
+            corpora[idx].extend(cmd.result['utterances'], stage=INIT_STAGE)
+
+        for wave in pipeline.waves():
+            # The transformed utterances of each chunk of inputs, per intent and stage inputs, in chunk order.
+            chunk_results: list[dict[tuple[str, ...], list[dict[str, list[str]]]]] = [{} for _ in base_phrases]
+            jobs = []
+            for idx, corpus in enumerate(corpora):
+                if errors[idx] is not None:
+                    continue
+                for group in Pipeline.group_by_inputs(wave):
+                    transform_phrases = Pipeline.transforms_of(group)
+                    utterances = list(corpus.view(stages=group[0].inputs))
+                    if not transform_phrases or not utterances:
+                        continue
+                    for chunk in self._chunk_utterances(utterances):
+                        transformed = self._apply_local_transforms(chunk, transform_phrases)
+                        chunk_results[idx].setdefault(tuple(group[0].inputs), []).append(transformed)
+                        model_phrases = [phrase for phrase in transform_phrases if phrase not in transformed]
+                        multi_groups = self._multi_transform_groups(chunk, model_phrases)
+                        jobs.extend((idx, GenMultiTransformedPhrasings(utterances=chunk, transform_phrases=phrases),
+                                     transformed) for phrases in multi_groups)
+                        grouped = {phrase for phrases in multi_groups for phrase in phrases}
+                        jobs.extend((idx, GenTransformedPhrasings(utterances=chunk, transform_phrase=phrase),
+                                     transformed) for phrase in model_phrases if phrase not in grouped)
+
+            follow_up_jobs = []
+            for idx, cmd, transformed in run(jobs):
+                if isinstance(cmd, GenMultiTransformedPhrasings):
+                    results = cmd.get_transformed_utterances()
+                    transformed.update(results)
+                    for transform_phrase in cmd.transform_phrases:
+                        # Skipped transforms fall back to a single-transform call, cut short ones are completed.
+                        done = len(results.get(transform_phrase, []))
+                        if transform_phrase not in results or (is_salvaged(cmd.result) and done < len(cmd.utterances)):
+                            follow_up_jobs.append((idx, GenTransformedPhrasings(
+                                utterances=cmd.utterances[done:],
+                                transform_phrase=transform_phrase,
+                            ), transformed))
+                else:
+                    transformed[cmd.transform_phrase] = list(cmd.result['utterances'])
+                    done = len(transformed[cmd.transform_phrase])
+                    if is_salvaged(cmd.result) and done < len(cmd.utterances):
+                        follow_up_jobs.append((idx, GenTransformedPhrasings(
+                            utterances=cmd.utterances[done:],
+                            transform_phrase=cmd.transform_phrase,
+                        ), transformed))
+            for idx, cmd, transformed in run(follow_up_jobs):
+                transformed.setdefault(cmd.transform_phrase, []).extend(cmd.result['utterances'])
+
+            for idx, corpus in enumerate(corpora):
+                if errors[idx] is not None:
+                    continue
+                for stage in wave:
+                    for transform in stage.transforms:
+                        for transformed in chunk_results[idx].get(tuple(stage.inputs), []):
+                            corpus.extend(transformed.get(transform, []), stage=stage.name, transform=transform)
+
+        return [DatasetResult(base_phrase=base_phrase, utterances=list(corpus) if error is None else [], error=error)
+                for base_phrase, corpus, error in zip(base_phrases, corpora, errors)]
+
+
+def _iterate_in_thread(agen: AsyncIterator) -> Iterator:
+    """
+    Drive an async iterator on a private event loop in a worker thread and yield its items synchronously.
+    :param agen: The async iterator.
+    :return: an iterator over the same items.
+    """
+    items: queue.Queue = queue.Queue()
+    stopped = threading.Event()
+    done = object()
+
+    async def drain():
+        try:
+            async for item in agen:
+                items.put((True, item))
+                if stopped.is_set():
+                    break
+        finally:
+            await agen.aclose()
 
-        if media_type == 'voice':
-            voice_transform_utterances = self.generate_phrase_transforms_voice(utterances=base_utterances, **kwargs)
-            final_utterances = final_utterances + voice_transform_utterances
-        else:  # media_type == 'text'
-            chat_transform_utterances = self.generate_phrase_transforms_text(utterances=base_utterances, **kwargs)
-            final_utterances = final_utterances + chat_transform_utterances
+    def worker():
+        try:
+            asyncio.run(drain())
+        except BaseException as e:
+            items.put((False, e))
+        finally:
+            items.put((True, done))
 
-        # dedup
-        seen = set()
-        unique_utterances = [x for x in final_utterances if not (x in seen or seen.add(x))]
+    thread = threading.Thread(target=worker, name='interactigen-worker', daemon=True)
+    thread.start()
+    try:
+        while True:
+            ok, item = items.get()
+            if not ok:
+                raise item
+            if item is done:
+                break
+            yield item
+    finally:
+        stopped.set()
 
-        return unique_utterances
@@ -0,0 +1,151 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import os
+import threading
+import time
+import logging
+
+# Initialize the logger.
+log = logging.getLogger('interactigenLogger')
+
+
+class RunJournal:
+    """
+    Append-only JSON Lines journal of completed commands, used to resume interrupted generation runs.
+
+    Each line records a command's content address (see ResponseCache.key_for()), name, inputs and parsed result.
+    Reopening the journal indexes the recorded commands, so a restarted run replays them instead of calling the model
+    and only pays for the unfinished work.  Only line offsets are kept in memory.
+    """
+
+    def __init__(self,
+                 *,
+                 path: str,
+                 fsync: bool = False,
+                 ):
+        """
+        Create a new instance, indexing any records already in the journal.
+        :param path: The journal file path.
+        :param fsync: Whether to fsync after each record, trading throughput for durability on power loss.
+        """
+        if not path:
+            raise Exception('path is required')
+
+        self.path = path
+        self.fsync = fsync
+        self.replayed = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._offsets: dict[str, int] = {}
+        self._load()
+        self._file = open(path, 'a+b')
+
+    def __str__(self):
+        return (f"RunJournal(path={self.path}" +
+                f", entries={len(self)}" +
+                f", replayed={self.replayed}" +
+                f", recorded={self.recorded}" +
+                ")")
+
+    def __repr__(self):
+        return (f"RunJournal(path={self.path!r}" +
+                f", entries={len(self)!r}" +
+                f", replayed={self.replayed!r}" +
+                f", recorded={self.recorded!r}" +
+                ")")
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __contains__(self, key: str):
+        return key in self._offsets
+
+    def _load(self) -> None:
+        """
+        Index the existing records, truncating a partially written final record left by a crash.
+        """
+        if not os.path.exists(self.path):
+            return
+        good_end = 0
+        with open(self.path, 'r+b') as journal_file:
+            while line := journal_file.readline():
+                try:
+                    record = json.loads(line)
+                    key = record['key']
+                except (ValueError, KeyError, TypeError):
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                self._offsets[key] = good_end
+                good_end = journal_file.tell()
+            if good_end < os.path.getsize(self.path):
+                log.warning(f"Truncating incomplete journal record in {self.path} at offset {good_end}")
+                journal_file.truncate(good_end)
+
+    def get(self, key: str):
+        """
+        Replay a recorded command result.
+        :param key: The command content address.
+        :return: the recorded result, or None if the command has not completed.
+        """
+        offset = self._offsets.get(key)
+        if offset is None:
+            return None
+        with self._lock:
+            self._file.seek(offset)
+            line = self._file.readline()
+            self.replayed += 1
+        return json.loads(line)['result']
+
+    def record(self, key: str, cmd_name: str, inputs: dict, result) -> None:
+        """
+        Append a completed command.
+        :param key: The command content address.
+        :param cmd_name: The command name.
+        :param inputs: The command inputs.
+        :param result: The JSON-serializable parsed result.
+        """
+        line = json.dumps({
+            'key': key,
+            'cmd_name': cmd_name,
+            'time': time.time(),
+            'inputs': inputs,
+            'result': result,
+        }, default=str).encode('utf-8') + b'\n'
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._offsets[key] = offset
+            self.recorded += 1
+
+    def close(self) -> None:
+        """
+        Close the journal file.
+        """
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,521 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Mapping
+
+import hashlib
+import random
+import re
+
+# Splits a whitespace-delimited token into leading punctuation, word and trailing punctuation.
+_token_pattern = re.compile(r"^(\W*)(.*?)(\W*)$", re.S)
+
+# The QWERTY keys adjacent to each letter key.
+_keyboard_rows = ['qwertyuiop', 'asdfghjkl', 'zxcvbnm']
+_keyboard_neighbors: dict[str, str] = {}
+for _row_idx, _row in enumerate(_keyboard_rows):
+    for _col_idx, _key in enumerate(_row):
+        _neighbors = _row[max(0, _col_idx - 1):_col_idx] + _row[_col_idx + 1:_col_idx + 2]
+        for _other_idx in (_row_idx - 1, _row_idx + 1):
+            if 0 <= _other_idx < len(_keyboard_rows):
+                _neighbors += _keyboard_rows[_other_idx][max(0, _col_idx - 1):_col_idx + 1]
+        _keyboard_neighbors[_key] = _neighbors
+
+# Groups of interchangeable words and phrases.
+synonym_groups = [
+    ['want', 'need', 'would like'],
+    ['check', 'see', 'look at', 'view'],
+    ['show', 'display', 'give'],
+    ['help', 'assist', 'support'],
+    ['buy', 'purchase', 'get'],
+    ['cancel', 'stop', 'end', 'terminate'],
+    ['change', 'update', 'modify', 'edit'],
+    ['start', 'begin', 'open'],
+    ['find', 'locate', 'look up', 'search for'],
+    ['send', 'transfer', 'move'],
+    ['pay', 'settle', 'cover'],
+    ['book', 'reserve', 'schedule'],
+    ['fix', 'repair', 'sort out'],
+    ['talk', 'speak', 'chat'],
+    ['call', 'phone', 'ring'],
+    ['order', 'request'],
+    ['money', 'cash', 'funds'],
+    ['balance', 'amount', 'total'],
+    ['account', 'profile'],
+    ['bill', 'invoice', 'statement'],
+    ['problem', 'issue', 'trouble'],
+    ['question', 'query'],
+    ['fast', 'quick', 'rapid'],
+    ['big', 'large', 'huge'],
+    ['small', 'little', 'tiny'],
+    ['right now', 'now', 'immediately', 'asap'],
+    ['please', 'pls', 'kindly'],
+    ['hi', 'hello', 'hey'],
+    ['thanks', 'thank you', 'cheers'],
+    ['yes', 'yeah', 'yep', 'sure'],
+    ['no', 'nope', 'nah'],
+    ['car', 'vehicle', 'auto'],
+    ['home', 'house'],
+    ['trip', 'journey', 'travel'],
+    ['ticket', 'pass'],
+    ['price', 'cost', 'rate'],
+    ['info', 'information', 'details'],
+    ['phone', 'mobile', 'cell'],
+    ['can you', 'could you', 'would you'],
+]
+
+# Words and phrases speech recognizers commonly confuse, from homophones to near-homophones.
+asr_confusions = {
+    'to': ['two', 'too'],
+    'two': ['to', 'too'],
+    'too': ['to', 'two'],
+    'for': ['four', 'fore'],
+    'four': ['for'],
+    'i': ['eye', 'aye'],
+    'you': ['ewe', 'u'],
+    'your': ["you're", 'yore'],
+    "you're": ['your'],
+    'there': ['their', "they're"],
+    'their': ['there', "they're"],
+    'know': ['no'],
+    'no': ['know'],
+    'new': ['knew', 'gnu'],
+    'right': ['write', 'rite'],
+    'write': ['right'],
+    'here': ['hear'],
+    'hear': ['here'],
+    'buy': ['by', 'bye'],
+    'by': ['buy', 'bye'],
+    'wait': ['weight'],
+    'weight': ['wait'],
+    'check': ['czech', 'cheque'],
+    'account': ['a count', 'accounts'],
+    'balance': ['ballots', 'valance'],
+    'cancel': ['council', 'counsel'],
+    'card': ['cart', 'car'],
+    'pay': ['play', 'bay'],
+    'bill': ['build', 'bell'],
+    'order': ['border', 'odor'],
+    'can': ["can't", 'ken'],
+    "can't": ['can'],
+    'want': ["won't", 'one'],
+    'one': ['won', 'want'],
+    'eight': ['ate'],
+    'hour': ['our', 'are'],
+    'our': ['hour', 'are'],
+    'meet': ['meat'],
+    'see': ['sea', 'c'],
+    'week': ['weak'],
+    'mail': ['male'],
+    'sale': ['sail'],
+    'fare': ['fair'],
+    'flight': ['fright', 'flite'],
+    'help': ['health', 'hell'],
+    'phone': ['foam', 'fun'],
+    'number': ['lumber', 'numb'],
+    'transfer': ['transfers', 'trans fur'],
+    'send': ['sand', 'spend'],
+    'fifteen': ['fifty'],
+    'fifty': ['fifteen'],
+    'thirteen': ['thirty'],
+    'thirty': ['thirteen'],
+}
+
+# Suffix rewrites approximating dropped or blurred word endings in recognized speech.
+asr_suffix_rules = [
+    ('ing', 'in'),
+    ('ed', 'd'),
+    ('ts', 's'),
+    ('th', 'f'),
+    ('er', 'a'),
+]
+
+# Emojis commonly attached to words, and a fallback pool for any utterance.
+emoji_keywords = {
+    'money': '💰', 'cash': '💵', 'pay': '💳', 'card': '💳', 'bank': '🏦', 'balance': '💰',
+    'phone': '📱', 'call': '📞', 'email': '📧', 'mail': '📧', 'message': '💬',
+    'home': '🏠', 'house': '🏠', 'car': '🚗', 'flight': '✈️', 'travel': '✈️', 'trip': '🧳',
+    'time': '⏰', 'today': '📅', 'tomorrow': '📅', 'schedule': '📅', 'book': '📅',
+    'food': '🍔', 'pizza': '🍕', 'coffee': '☕', 'order': '📦', 'delivery': '🚚', 'package': '📦',
+    'help': '🆘', 'problem': '⚠️', 'issue': '⚠️', 'cancel': '❌', 'stop': '🛑',
+    'thanks': '🙏', 'thank': '🙏', 'please': '🙏', 'love': '❤️', 'happy': '😊', 'sad': '😢',
+    'hi': '👋', 'hello': '👋', 'hey': '👋', 'yes': '👍', 'no': '👎', 'ok': '👌', 'okay': '👌',
+}
+emoji_pool = ['🙂', '😊', '😅', '🤔', '🙏', '👍', '😀', '😩', '🤷', '❓']
+
+
+def _case_like(template: str, word: str) -> str:
+    """
+    Apply the capitalization of a word to its replacement.
+    :param template: The original word.
+    :param word: The replacement.
+    :return: the replacement, capitalized like the original.
+    """
+    if len(template) > 1 and template.isupper():
+        return word.upper()
+    if template[:1].isupper():
+        return word[:1].upper() + word[1:]
+    return word
+
+
+class LocalTransform(ABC):
+    """
+    Abstract algorithmic transform applied locally instead of by the model.
+
+    Each utterance is transformed with a random generator seeded by the engine seed, the transform phrase and the
+    utterance itself, so results do not depend on batch composition, chunking or call order.
+    """
+
+    @abstractmethod
+    def transform_utterance(self, utterance: str, rng: random.Random) -> str:
+        """
+        Transform one utterance.
+        :param utterance: The utterance.
+        :param rng: The utterance's random generator.
+        :return: the transformed utterance.
+        """
+        pass
+
+    def apply(self, utterances: Iterable[str], *, seed: str) -> list[str]:
+        """
+        Transform a batch of utterances.
+
+        The batch is processed per distinct utterance rather than with vectorized random draws across it, which
+        would make each result depend on the rest of the batch.  Repeated utterances are transformed once.
+        :param utterances: The utterances.
+        :param seed: The seed identifying the engine and transform phrase.
+        :return: the transformed utterances, in order.
+        """
+        transform_utterance = self.transform_utterance
+        seed_hash = hashlib.blake2b(f"{seed}\x00".encode('utf-8'), digest_size=8)
+        rng = random.Random()
+        results: dict[str, str] = {}
+        transformed = []
+        for utterance in utterances:
+            result = results.get(utterance)
+            if result is None:
+                utterance_hash = seed_hash.copy()
+                utterance_hash.update(utterance.encode('utf-8'))
+                rng.seed(int.from_bytes(utterance_hash.digest()))
+                result = results[utterance] = transform_utterance(utterance, rng)
+            transformed.append(result)
+        return transformed
+
+    def __str__(self):
+        return f"{type(self).__name__}()"
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class NgramSwapTransform(LocalTransform):
+    """
+    Reverse the word order of a random bigram or trigram.
+    """
+
+    def transform_utterance(self, utterance: str, rng: random.Random) -> str:
+        words = utterance.split()
+        if len(words) < 2:
+            return utterance
+        size = rng.choice((2, 3)) if len(words) >= 3 else 2
+        start = rng.randrange(len(words) - size + 1)
+        words[start:start + size] = reversed(words[start:start + size])
+        return ' '.join(words)
+
+
+class _PhraseReplaceTransform(LocalTransform):
+    """
+    Replace words and multi-word phrases using a lookup table, preferring the longest match.
+    """
+
+    def __init__(self, *, table: Mapping[str, list[str]], rate: float):
+        """
+        Create a new instance.
+        :param table: The replacements of each lower-case word or phrase.
+        :param rate: The probability of replacing each matched word or phrase.  At least one match is replaced.
+        """
+        self.table = {key.lower(): list(values) for key, values in table.items() if values}
+        self.rate = rate
+        self.max_words = max((len(key.split()) for key in self.table), default=1)
+
+    def _matches(self, cores: list[str]) -> list[tuple[int, int, str]]:
+        """
+        Find the non-overlapping table matches in a list of words.
+        :param cores: The words, without punctuation.
+        :return: the (start, end, key) of each match.
+        """
+        matches = []
+        idx = 0
+        lowered = [core.lower() for core in cores]
+        while idx < len(lowered):
+            for size in range(min(self.max_words, len(lowered) - idx), 0, -1):
+                key = ' '.join(lowered[idx:idx + size])
+                if key in self.table:
+                    matches.append((idx, idx + size, key))
+                    idx += size
+                    break
+            else:
+                idx += 1
+        return matches
+
+    def transform_utterance(self, utterance: str, rng: random.Random) -> str:
+        tokens = [_token_pattern.match(token).groups() for token in utterance.split()]
+        matches = self._matches([core for _, core, _ in tokens])
+        if not matches:
+            return self.fallback(utterance, rng)
+        chosen = [match for match in matches if rng.random() < self.rate] or [rng.choice(matches)]
+        for start, end, key in reversed(chosen):
+            replacement = _case_like(tokens[start][1], rng.choice(self.table[key]))
+            tokens[start:end] = [(tokens[start][0], replacement, tokens[end - 1][2])]
+        return ' '.join(f"{prefix}{core}{suffix}" for prefix, core, suffix in tokens)
+
+    def fallback(self, utterance: str, rng: random.Random) -> str:
+        """
+        Transform an utterance without any table match.
+        :param utterance: The utterance.
+        :param rng: The utterance's random generator.
+        :return: the transformed utterance.  Default is the utterance unchanged.
+        """
+        return utterance
+
+    def __str__(self):
+        return f"{type(self).__name__}(entries={len(self.table)}, rate={self.rate})"
+
+    def __repr__(self):
+        return f"{type(self).__name__}(entries={len(self.table)!r}, rate={self.rate!r})"
+
+
+class SynonymTransform(_PhraseReplaceTransform):
+    """
+    Swap words and phrases for common synonyms from a lexicon.
+    """
+
+    def __init__(self,
+                 *,
+                 groups: Iterable[Iterable[str]] = None,
+                 rate: float = 0.3,
+                 ):
+        """
+        Create a new instance.
+        :param groups: The groups of interchangeable words and phrases.  Default is synonym_groups.
+        :param rate: The probability of swapping each known word or phrase.  At least one is swapped.
+        """
+        table: dict[str, list[str]] = {}
+        for group in (groups if groups is not None else synonym_groups):
+            group = list(group)
+            for word in group:
+                table.setdefault(word, []).extend(other for other in group if other != word)
+        super().__init__(table=table, rate=rate)
+
+
+class AsrConfusionTransform(_PhraseReplaceTransform):
+    """
+    Introduce common speech recognition mistranslations from a phonetic confusion table, falling back to blurred word
+    endings.
+    """
+
+    def __init__(self,
+                 *,
+                 confusions: Mapping[str, list[str]] = None,
+                 suffix_rules: Iterable[tuple[str, str]] = None,
+                 rate: float = 0.3,
+                 ):
+        """
+        Create a new instance.
+        :param confusions: The words or phrases each word or phrase is misrecognized as.  Default is asr_confusions.
+        :param suffix_rules: The (ending, replacement) rewrites used when no confusion applies.  Default is
+                             asr_suffix_rules.
+        :param rate: The probability of confusing each known word or phrase.  At least one is confused.
+        """
+        super().__init__(table=confusions if confusions is not None else asr_confusions, rate=rate)
+        self.suffix_rules = list(suffix_rules if suffix_rules is not None else asr_suffix_rules)
+
+    def fallback(self, utterance: str, rng: random.Random) -> str:
+        words = utterance.split()
+        candidates = [
+            (idx, ending, replacement) for idx, word in enumerate(words)
+            for ending, replacement in self.suffix_rules
+            if len(word) > len(ending) + 1 and word.lower().endswith(ending)
+        ]
+        if not candidates:
+            return utterance
+        idx, ending, replacement = rng.choice(candidates)
+        words[idx] = words[idx][:-len(ending)] + _case_like(words[idx][-len(ending):], replacement)
+        return ' '.join(words)
+
+
+class TypoTransform(LocalTransform):
+    """
+    Introduce common spelling mistakes: keyboard-adjacent substitutions, dropped, doubled and transposed letters.
+    """
+
+    def __init__(self,
+                 *,
+                 rate: float = 0.15,
+                 ):
+        """
+        Create a new instance.
+        :param rate: The probability of misspelling each word of at least three letters.  At least one is misspelled.
+        """
+        self.rate = rate
+
+    @staticmethod
+    def misspell(word: str, rng: random.Random) -> str:
+        """
+        Misspell a word once.
+        :param word: The word.
+        :param rng: The random generator.
+        :return: the misspelled word.
+        """
+        idx = rng.randrange(len(word))
+        kind = rng.randrange(4)
+        letter = word[idx]
+        if kind == 0 and letter.lower() in _keyboard_neighbors:
+            neighbor = rng.choice(_keyboard_neighbors[letter.lower()])
+            return word[:idx] + (neighbor.upper() if letter.isupper() else neighbor) + word[idx + 1:]
+        if kind == 1 and len(word) > 3:
+            return word[:idx] + word[idx + 1:]
+        if kind == 2 and idx < len(word) - 1:
+            return word[:idx] + word[idx + 1] + letter + word[idx + 2:]
+        return word[:idx] + letter + word[idx:]
+
+    def transform_utterance(self, utterance: str, rng: random.Random) -> str:
+        tokens = [_token_pattern.match(token).groups() for token in utterance.split()]
+        candidates = [idx for idx, (_, core, _) in enumerate(tokens) if len(core) >= 3 and core.isalpha()]
+        if not candidates:
+            return utterance
+        chosen = [idx for idx in candidates if rng.random() < self.rate] or [rng.choice(candidates)]
+        for idx in chosen:
+            prefix, core, suffix = tokens[idx]
+            tokens[idx] = (prefix, self.misspell(core, rng), suffix)
+        return ' '.join(f"{prefix}{core}{suffix}" for prefix, core, suffix in tokens)
+
+    def __str__(self):
+        return f"TypoTransform(rate={self.rate})"
+
+    def __repr__(self):
+        return f"TypoTransform(rate={self.rate!r})"
+
+
+class EmojiTransform(LocalTransform):
+    """
+    Introduce common emojis after matching keywords, or at the end of the utterance.
+    """
+
+    def __init__(self,
+                 *,
+                 keywords: Mapping[str, str] = None,
+                 pool: Iterable[str] = None,
+                 ):
+        """
+        Create a new instance.
+        :param keywords: The emoji following each lower-case keyword.  Default is emoji_keywords.
+        :param pool: The emojis added to utterances without keywords.  Default is emoji_pool.
+        """
+        self.keywords = dict(keywords if keywords is not None else emoji_keywords)
+        self.pool = list(pool if pool is not None else emoji_pool)
+
+    def transform_utterance(self, utterance: str, rng: random.Random) -> str:
+        words = utterance.split()
+        matches = [idx for idx, word in enumerate(words)
+                   if _token_pattern.match(word).group(2).lower() in self.keywords]
+        if matches:
+            idx = rng.choice(matches)
+            words.insert(idx + 1, self.keywords[_token_pattern.match(words[idx]).group(2).lower()])
+        elif self.pool:
+            words.append(rng.choice(self.pool))
+        return ' '.join(words)
+
+    def __str__(self):
+        return f"EmojiTransform(keywords={len(self.keywords)}, pool={len(self.pool)})"
+
+    def __repr__(self):
+        return f"EmojiTransform(keywords={len(self.keywords)!r}, pool={len(self.pool)!r})"
+
+
+def default_local_transforms() -> dict[str, LocalTransform]:
+    """
+    Build the local transforms of the mechanical default transform phrases.
+    :return: the local transform of each transformation instruction phrase.
+    """
+    return {
+        'flip bigrams or trigrams': NgramSwapTransform(),
+        'swap common synonyms': SynonymTransform(),
+        'introduce common speech recognition mistranslations': AsrConfusionTransform(),
+        'introduce common spelling mistakes': TypoTransform(),
+        'introduce common emojis': EmojiTransform(),
+    }
+
+
+class LocalTransformEngine:
+    """
+    Applies transformation instruction phrases algorithmically, without model calls.  The client routes every
+    transform phrase the engine knows to it, and the rest to the model.
+    """
+
+    def __init__(self,
+                 *,
+                 transforms: Mapping[str, LocalTransform] = None,
+                 seed: int = 0,
+                 ):
+        """
+        Create a new instance.
+        :param transforms: The local transform of each transformation instruction phrase to route locally.  Default
+                           is default_local_transforms().  Pass a subset to keep some of them on the model.
+        :param seed: The random seed.  The same seed and inputs always produce the same outputs.
+        """
+        self.transforms = dict(transforms if transforms is not None else default_local_transforms())
+        self.seed = seed
+
+    def __contains__(self, transform_phrase: str) -> bool:
+        return transform_phrase in self.transforms
+
+    def transform(self, *, utterances: list[str], transform_phrase: str) -> list[str]:
+        """
+        Apply a transformation instruction phrase to utterances.
+        :param utterances: The utterances to transform.
+        :param transform_phrase: The transformation instruction phrase.
+        :return: an array of transformed utterances.
+        """
+        local_transform = self.transforms.get(transform_phrase)
+        if local_transform is None:
+            raise Exception(f"No local transform for '{transform_phrase}'")
+        return local_transform.apply(utterances, seed=f"{self.seed}\x00{transform_phrase}")
+
+    def transform_many(self, *, utterances: list[str], transform_phrases: list[str]) -> dict[str, list[str]]:
+        """
+        Apply every locally routed transformation instruction phrase to the same utterances.
+        :param utterances: The utterances to transform.
+        :param transform_phrases: The transformation instruction phrases.  Phrases not routed locally are skipped.
+        :return: the transformed utterances keyed by transform phrase.
+        """
+        return {
+            transform_phrase: self.transform(utterances=utterances, transform_phrase=transform_phrase)
+            for transform_phrase in transform_phrases if transform_phrase in self.transforms
+        }
+
+    def __str__(self):
+        return f"LocalTransformEngine(transforms={list(self.transforms)}, seed={self.seed})"
+
+    def __repr__(self):
+        return f"LocalTransformEngine(transforms={self.transforms!r}, seed={self.seed!r})"
@@ -0,0 +1,201 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from collections.abc import Iterable
+
+# The name of the implicit root stage holding the initially generated utterances.
+INIT_STAGE = 'init'
+
+
+class Stage:
+    """
+    A named set of transforms applied to the outputs of upstream stages.
+    """
+
+    def __init__(self,
+                 *,
+                 name: str,
+                 transforms: Iterable[str],
+                 inputs: Iterable[str] = (INIT_STAGE,),
+                 media_types: Iterable[str] | None = None,
+                 excluded_media_types: Iterable[str] | None = None,
+                 ):
+        """
+        Create a new instance.
+        :param name: The stage name.
+        :param transforms: The transformation instruction phrases, each applied to the stage inputs.
+        :param inputs: The upstream stage names whose outputs the transforms are applied to.  Default is the initial
+                       utterances only.
+        :param media_types: The media types this stage applies to.  Default is all media types.
+        :param excluded_media_types: The media types this stage does not apply to.  Default is none.
+        """
+        if not name:
+            raise Exception('name is required')
+        if name == INIT_STAGE:
+            raise Exception(f"'{INIT_STAGE}' is reserved for the initial utterances")
+
+        self.name = name
+        self.transforms = list(transforms)
+        self.inputs = list(inputs)
+        self.media_types = set(media_types) if media_types is not None else None
+        self.excluded_media_types = set(excluded_media_types) if excluded_media_types is not None else None
+
+        if not self.inputs:
+            raise Exception('inputs is required')
+
+    def applies_to(self, media_type: str) -> bool:
+        """
+        Check whether the stage applies to a media type.
+        :param media_type: The media type.
+        :return: True if the stage applies.
+        """
+        if self.excluded_media_types is not None and media_type in self.excluded_media_types:
+            return False
+        return self.media_types is None or media_type in self.media_types
+
+    def __str__(self):
+        return (f"Stage(name={self.name}" +
+                f", transforms={self.transforms}" +
+                f", inputs={self.inputs}" +
+                f", media_types={self.media_types}" +
+                f", excluded_media_types={self.excluded_media_types}" +
+                ")")
+
+    def __repr__(self):
+        return (f"Stage(name={self.name!r}" +
+                f", transforms={self.transforms!r}" +
+                f", inputs={self.inputs!r}" +
+                f", media_types={self.media_types!r}" +
+                f", excluded_media_types={self.excluded_media_types!r}" +
+                ")")
+
+
+class Pipeline:
+    """
+    A DAG of transform stages rooted at the initially generated utterances.  Stages are listed in dependency order:
+    each stage may only consume the initial utterances and stages defined before it.
+    """
+
+    def __init__(self,
+                 *,
+                 stages: Iterable[Stage],
+                 ):
+        """
+        Create a new instance.
+        :param stages: The stages, in dependency order.
+        """
+        self.stages = list(stages)
+
+        seen = {INIT_STAGE}
+        for stage in self.stages:
+            if stage.name in seen:
+                raise Exception(f"Duplicate stage name '{stage.name}'")
+            for stage_input in stage.inputs:
+                if stage_input not in seen:
+                    raise Exception(f"Stage '{stage.name}' input '{stage_input}' must be defined before it")
+            seen.add(stage.name)
+
+    def for_media_type(self, media_type: str) -> 'Pipeline':
+        """
+        Select the stages applying to a media type.  Inputs from excluded stages are dropped.
+        :param media_type: The media type.
+        :return: the media type pipeline.
+        """
+        stages = [stage for stage in self.stages if stage.applies_to(media_type)]
+        names = {INIT_STAGE} | {stage.name for stage in stages}
+        selected = []
+        for stage in stages:
+            inputs = [stage_input for stage_input in stage.inputs if stage_input in names]
+            if not inputs:
+                names.discard(stage.name)
+                continue
+            selected.append(Stage(name=stage.name, transforms=stage.transforms, inputs=inputs,
+                                  media_types=stage.media_types, excluded_media_types=stage.excluded_media_types))
+        return Pipeline(stages=selected)
+
+    def consumers(self, stage_name: str) -> list[Stage]:
+        """
+        Get the stages consuming a stage's output.
+        :param stage_name: The upstream stage name.
+        :return: the downstream stages, in pipeline order.
+        """
+        return [stage for stage in self.stages if stage_name in stage.inputs]
+
+    def waves(self) -> list[list[Stage]]:
+        """
+        Partition the stages into waves whose inputs are all produced by earlier waves, for barrier execution.
+        :return: the waves, in execution order.
+        """
+        waves: list[list[Stage]] = []
+        done = {INIT_STAGE}
+        pending = list(self.stages)
+        while pending:
+            wave = [stage for stage in pending if all(stage_input in done for stage_input in stage.inputs)]
+            waves.append(wave)
+            done.update(stage.name for stage in wave)
+            pending = [stage for stage in pending if stage not in wave]
+        return waves
+
+    @staticmethod
+    def group_by_inputs(stages: Iterable[Stage]) -> list[list[Stage]]:
+        """
+        Group stages sharing identical inputs, whose transforms can be requested together.
+        :param stages: The stages.
+        :return: the groups, in first-seen order.
+        """
+        groups: dict[tuple[str, ...], list[Stage]] = {}
+        for stage in stages:
+            groups.setdefault(tuple(stage.inputs), []).append(stage)
+        return list(groups.values())
+
+    @staticmethod
+    def transforms_of(stages: Iterable[Stage]) -> list[str]:
+        """
+        Collect the distinct transforms of several stages.
+        :param stages: The stages.
+        :return: the transformation instruction phrases, in first-seen order.
+        """
+        return list(dict.fromkeys(transform for stage in stages for transform in stage.transforms))
+
+    def __str__(self):
+        return f"Pipeline(stages={[stage.name for stage in self.stages]})"
+
+    def __repr__(self):
+        return f"Pipeline(stages={self.stages!r})"
+
+
+def default_pipeline() -> Pipeline:
+    """
+    Build the default pipeline from the module-level transform phrase lists.  The base transforms are applied to the
+    initial utterances, and the all-media and media type transforms to the initial plus base utterances.  The text
+    transforms apply to every media type other than voice.
+    :return: the default pipeline.
+    """
+    from interactigen.interactigen import (transform_phrases_base, transform_phrases_all, transform_phrases_voice,
+                                           transform_phrases_text)
+    return Pipeline(stages=[
+        Stage(name='base', transforms=transform_phrases_base, inputs=[INIT_STAGE]),
+        Stage(name='all', transforms=transform_phrases_all, inputs=[INIT_STAGE, 'base']),
+        Stage(name='voice', transforms=transform_phrases_voice, inputs=[INIT_STAGE, 'base'], media_types=['voice']),
+        Stage(name='text', transforms=transform_phrases_text, inputs=[INIT_STAGE, 'base'],
+              excluded_media_types=['voice']),
+    ])
@@ -0,0 +1,478 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from collections import deque
+from collections.abc import Awaitable, Callable
+from email.utils import parsedate_to_datetime
+
+import asyncio
+import datetime
+import logging
+import random
+import threading
+import time
+
+# Initialize the logger.
+log = logging.getLogger('interactigenLogger')
+
+# The HTTP statuses of throttled requests, including the overloaded status some providers use.
+throttle_statuses = frozenset({429, 529})
+# The HTTP statuses of transient server failures.
+transient_statuses = frozenset({408, 409, 500, 502, 503, 504})
+# Exception class name fragments of throttling and transient failures raised by provider SDKs.
+throttle_error_names = ('RateLimit', 'Throttl', 'Overloaded', 'ResourceExhausted', 'TooManyRequests')
+transient_error_names = ('Timeout', 'APIConnectionError', 'ServiceUnavailable', 'InternalServerError',
+                         'ServerError', 'ConnectionError')
+
+
+class _TokenBucket:
+    """
+    Token bucket limiting a rate per minute across threads and event loops.
+    """
+
+    def __init__(self,
+                 *,
+                 per_minute: float,
+                 burst: float | None = None,
+                 ):
+        """
+        Create a new instance.
+        :param per_minute: The sustained rate.
+        :param burst: The bucket capacity.  Default is one second worth of the rate, and at least one.
+        """
+        if per_minute <= 0:
+            raise Exception('rate limits must be positive')
+
+        self.per_minute = per_minute
+        self.burst = burst if burst is not None else max(1.0, per_minute / 60.0)
+        self._rate = per_minute / 60.0
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return (f"_TokenBucket(per_minute={self.per_minute}" +
+                f", burst={self.burst}" +
+                ")")
+
+    def __repr__(self):
+        return (f"_TokenBucket(per_minute={self.per_minute!r}" +
+                f", burst={self.burst!r}" +
+                ")")
+
+    def reserve(self, cost: float = 1.0) -> float:
+        """
+        Reserve capacity from the bucket, allowing it to go into debt.
+        :param cost: The capacity to reserve.
+        :return: the number of seconds the caller must wait before proceeding.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= cost
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
+
+
+def error_status(error: BaseException) -> int | None:
+    """
+    Get the HTTP status of a provider error, across the common SDK exception shapes.
+    :param error: The error.
+    :return: the HTTP status, or None if unknown.
+    """
+    for candidate in (error, getattr(error, 'response', None)):
+        for name in ('status_code', 'http_status', 'status'):
+            status = getattr(candidate, name, None)
+            if isinstance(status, int):
+                return status
+    return None
+
+
+def retry_after(error: BaseException) -> float | None:
+    """
+    Get the delay a provider asked for before retrying, from a retry_after attribute or the Retry-After response
+    header, in seconds or as an HTTP date.
+    :param error: The error.
+    :return: the delay in seconds, or None if not given.
+    """
+    value = getattr(error, 'retry_after', None)
+    if isinstance(value, (int, float)):
+        return max(0.0, float(value))
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or getattr(error, 'headers', None)
+    if not headers:
+        return None
+    try:
+        milliseconds = headers.get('retry-after-ms') or headers.get('Retry-After-Ms')
+        if milliseconds is not None:
+            return max(0.0, float(milliseconds) / 1000.0)
+        value = headers.get('retry-after') or headers.get('Retry-After')
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def is_throttled(error: BaseException) -> bool:
+    """
+    Check whether an error reports that the provider throttled the request.
+    :param error: The error.
+    :return: True if the request was throttled.
+    """
+    return (error_status(error) in throttle_statuses or
+            any(name in type(error).__name__ for name in throttle_error_names))
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Check whether an error is worth retrying: throttling, timeouts, connection and server failures.
+    :param error: The error.
+    :return: True if the request may succeed when retried.
+    """
+    if is_throttled(error) or isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = error_status(error)
+    if status is not None:
+        return status in transient_statuses
+    return any(name in type(error).__name__ for name in transient_error_names)
+
+
+class RateController:
+    """
+    Shared rate limiter for every command issued by an Interactigen client: request and token rate buckets, an AIMD
+    adaptive concurrency limit, and jittered retries of transient errors honouring Retry-After.
+
+    The concurrency limit grows by additive_increase per limit's worth of successful calls and shrinks by
+    multiplicative_decrease on throttling, or when latency exceeds latency_target, at most once per
+    decrease_interval.  A Retry-After from the provider pauses every caller, not only the throttled one.
+
+    The controller owns the retries of transient errors.  Each attempt goes to a single endpoint of the command's
+    ModelPool, the failed endpoint cooling down so that the next attempt moves on to another; the pool only fails
+    over within a call the controller does not retry, such as a stream.  Output parsing errors are retried by the
+    command executor and never reach the controller.
+    """
+
+    def __init__(self,
+                 *,
+                 requests_per_minute: float | None = None,
+                 tokens_per_minute: float | None = None,
+                 initial_concurrency: float = 4,
+                 min_concurrency: float = 1,
+                 max_concurrency: float = 64,
+                 additive_increase: float = 1.0,
+                 multiplicative_decrease: float = 0.5,
+                 latency_target: float | None = None,
+                 decrease_interval: float = 1.0,
+                 max_retries: int = 6,
+                 initial_backoff: float = 1.0,
+                 max_backoff: float = 60.0,
+                 is_retryable: Callable[[BaseException], bool] = is_transient,
+                 ):
+        """
+        Create a new instance.
+        :param requests_per_minute: The request rate limit, with a burst of one second worth of requests.  None
+                                    disables it.
+        :param tokens_per_minute: The token rate limit, charged with each call's estimated tokens and settled with
+                                  its actual usage when known.  None disables it.
+        :param initial_concurrency: The starting concurrency limit.
+        :param min_concurrency: The lowest concurrency limit.
+        :param max_concurrency: The highest concurrency limit.
+        :param additive_increase: The concurrency limit increase per limit's worth of successful calls.
+        :param multiplicative_decrease: The factor applied to the concurrency limit on congestion.
+        :param latency_target: The call latency, in seconds, above which the concurrency limit is decreased.  None
+                               reacts to throttling only.
+        :param decrease_interval: The minimum seconds between concurrency limit decreases, so that a burst of
+                                  concurrent throttling errors counts once.
+        :param max_retries: The maximum number of retries of a call.
+        :param initial_backoff: The backoff ceiling of the first retry, in seconds, doubling on each retry.
+        :param max_backoff: The largest backoff ceiling, in seconds.
+        :param is_retryable: The function deciding whether an error is transient.  Default is is_transient().
+        """
+        if not 0 < min_concurrency <= initial_concurrency <= max_concurrency:
+            raise Exception('concurrency limits must satisfy 0 < min <= initial <= max')
+        if not 0 < multiplicative_decrease < 1:
+            raise Exception('multiplicative_decrease must be between 0 and 1')
+        if max_retries < 0:
+            raise Exception('max_retries must not be negative')
+
+        self.request_limiter = _TokenBucket(per_minute=requests_per_minute) \
+            if requests_per_minute is not None else None
+        self.token_limiter = _TokenBucket(per_minute=tokens_per_minute) \
+            if tokens_per_minute is not None else None
+        self.concurrency_limit = float(initial_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.additive_increase = additive_increase
+        self.multiplicative_decrease = multiplicative_decrease
+        self.latency_target = latency_target
+        self.decrease_interval = decrease_interval
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.is_retryable = is_retryable
+        self.retries = 0
+        self.throttled = 0
+        self._in_flight = 0
+        self._waiters: deque = deque()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return (f"RateController(concurrency_limit={self.concurrency_limit:.2f}" +
+                f", in_flight={self._in_flight}" +
+                f", request_limiter={self.request_limiter}" +
+                f", token_limiter={self.token_limiter}" +
+                ")")
+
+    def __repr__(self):
+        return (f"RateController(concurrency_limit={self.concurrency_limit!r}" +
+                f", in_flight={self._in_flight!r}" +
+                f", request_limiter={self.request_limiter!r}" +
+                f", token_limiter={self.token_limiter!r}" +
+                f", retries={self.retries!r}" +
+                f", throttled={self.throttled!r}" +
+                ")")
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _grant(self) -> None:
+        """
+        Hand free concurrency slots to waiters, in arrival order.  Must be called with the lock held.
+        """
+        while self._waiters and self._in_flight < max(1, int(self.concurrency_limit)):
+            waiter = self._waiters.popleft()
+            self._in_flight += 1
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+            else:
+                loop, future = waiter
+                loop.call_soon_threadsafe(self._resolve, future)
+
+    def _resolve(self, future: asyncio.Future) -> None:
+        """
+        Complete an async waiter's slot grant on its own event loop, returning the slot if it was cancelled.
+        :param future: The waiter's future.
+        """
+        if future.done():
+            self._release_slot()
+        else:
+            future.set_result(None)
+
+    def _release_slot(self) -> None:
+        """
+        Return a concurrency slot.
+        """
+        with self._lock:
+            self._in_flight -= 1
+            self._grant()
+
+    def _pause_wait(self) -> float:
+        """
+        Get the remaining provider-requested pause.
+        :return: the seconds to wait.
+        """
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def _reserve(self, tokens: float) -> float:
+        """
+        Reserve request and token rate capacity.
+        :param tokens: The estimated tokens of the call.
+        :return: the seconds to wait before proceeding.
+        """
+        wait = 0.0
+        if self.request_limiter is not None:
+            wait = max(wait, self.request_limiter.reserve())
+        if self.token_limiter is not None and tokens:
+            wait = max(wait, self.token_limiter.reserve(tokens))
+        return wait
+
+    def acquire(self, *, tokens: float = 0) -> None:
+        """
+        Block until a call may proceed: a concurrency slot is free, no pause is in effect and the rate buckets allow
+        it.  Every acquire() must be followed by release().
+        :param tokens: The estimated tokens of the call.
+        """
+        while (pause := self._pause_wait()) > 0:
+            time.sleep(pause)
+        with self._lock:
+            if not self._waiters and self._in_flight < max(1, int(self.concurrency_limit)):
+                self._in_flight += 1
+                event = None
+            else:
+                event = threading.Event()
+                self._waiters.append(event)
+        if event is not None:
+            event.wait()
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, *, tokens: float = 0) -> None:
+        """
+        Wait without blocking the event loop until a call may proceed.  Every aacquire() must be followed by
+        release().
+        :param tokens: The estimated tokens of the call.
+        """
+        while (pause := self._pause_wait()) > 0:
+            await asyncio.sleep(pause)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._waiters and self._in_flight < max(1, int(self.concurrency_limit)):
+                self._in_flight += 1
+                waiter = None
+            else:
+                waiter = (loop, loop.create_future())
+                self._waiters.append(waiter)
+        if waiter is not None:
+            try:
+                await waiter[1]
+            except asyncio.CancelledError:
+                with self._lock:
+                    granted = waiter not in self._waiters
+                    if not granted:
+                        self._waiters.remove(waiter)
+                # A cancelled future is returned by _resolve(); a resolved one is ours to return.
+                if granted and waiter[1].done() and not waiter[1].cancelled():
+                    self._release_slot()
+                raise
+        wait = self._reserve(tokens)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self._release_slot()
+                raise
+
+    def release(self, *, latency: float | None = None, error: BaseException | None = None) -> None:
+        """
+        Return a concurrency slot and adapt the concurrency limit to the call outcome.
+        :param latency: The call latency in seconds, if it completed.
+        :param error: The error the call failed with, if any.
+        """
+        now = time.monotonic()
+        with self._lock:
+            congested = False
+            if error is not None and is_throttled(error):
+                self.throttled += 1
+                congested = True
+                delay = retry_after(error)
+                if delay is not None:
+                    self._paused_until = max(self._paused_until, now + delay)
+            elif error is None and self.latency_target is not None and latency is not None:
+                congested = latency > self.latency_target
+            if congested:
+                if now - self._last_decrease >= self.decrease_interval:
+                    self._last_decrease = now
+                    self.concurrency_limit = max(self.min_concurrency,
+                                                 self.concurrency_limit * self.multiplicative_decrease)
+                    log.info(f"Concurrency limit decreased to {self.concurrency_limit:.2f}")
+            elif error is None and latency is not None:
+                self.concurrency_limit = min(self.max_concurrency,
+                                             self.concurrency_limit + self.additive_increase / self.concurrency_limit)
+            self._in_flight -= 1
+            self._grant()
+
+    def settle(self, tokens: float) -> None:
+        """
+        Correct the token bucket once a call's actual usage is known.
+        :param tokens: The actual tokens used minus the estimate reserved.
+        """
+        if self.token_limiter is not None and tokens:
+            self.token_limiter.reserve(tokens)
+
+    def _backoff(self, attempt: int, error: BaseException) -> float | None:
+        """
+        Decide whether and how long to wait before retrying a failed call.
+        :param attempt: The number of the retry about to be made, from 1.
+        :param error: The error.
+        :return: the seconds to wait, or None to give up.
+        """
+        if attempt > self.max_retries or not self.is_retryable(error):
+            return None
+        # Full jitter spreads out the retries of concurrent callers failing together.
+        delay = random.uniform(0.0, min(self.max_backoff, self.initial_backoff * 2 ** (attempt - 1)))
+        requested = retry_after(error)
+        with self._lock:
+            self.retries += 1
+        return max(delay, requested or 0.0)
+
+    def call(self, func: Callable[[], object], *, tokens: float = 0):
+        """
+        Call a function within the controller's limits, retrying transient errors.
+        :param func: The function issuing one model call.
+        :param tokens: The estimated tokens of the call.
+        :return: the function result.
+        """
+        attempt = 0
+        while True:
+            self.acquire(tokens=tokens)
+            start = time.monotonic()
+            try:
+                result = func()
+            except Exception as e:
+                self.release(error=e)
+                attempt += 1
+                delay = self._backoff(attempt, e)
+                if delay is None:
+                    raise
+                log.warning(f"Retrying in {delay:.2f}s after transient error ({attempt}/{self.max_retries}): {e}")
+                time.sleep(delay)
+                continue
+            self.release(latency=time.monotonic() - start)
+            return result
+
+    async def acall(self, func: Callable[[], Awaitable], *, tokens: float = 0):
+        """
+        Await a coroutine function within the controller's limits, retrying transient errors.
+        :param func: The coroutine function issuing one model call.
+        :param tokens: The estimated tokens of the call.
+        :return: the coroutine result.
+        """
+        attempt = 0
+        while True:
+            await self.aacquire(tokens=tokens)
+            start = time.monotonic()
+            try:
+                result = await func()
+            except Exception as e:
+                self.release(error=e)
+                attempt += 1
+                delay = self._backoff(attempt, e)
+                if delay is None:
+                    raise
+                log.warning(f"Retrying in {delay:.2f}s after transient error ({attempt}/{self.max_retries}): {e}")
+                await asyncio.sleep(delay)
+                continue
+            except asyncio.CancelledError:
+                self.release()
+                raise
+            self.release(latency=time.monotonic() - start)
+            return result
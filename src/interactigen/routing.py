@@ -0,0 +1,351 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.language_models.llms import BaseLLM
+
+from interacticore import LangChainCommand
+from interactigen.async_wrap import AsyncLangChainWrap
+from interactigen.ratelimit import is_transient, retry_after
+
+from collections.abc import AsyncIterator, Iterable
+
+import logging
+import threading
+import time
+
+# Initialize the logger.
+log = logging.getLogger('interactigenLogger')
+
+
+class ModelEndpoint:
+    """
+    A model endpoint of a pool, with its load and health.
+    """
+
+    def __init__(self,
+                 *,
+                 model: BaseLanguageModel,
+                 ):
+        """
+        Create a new instance.
+        :param model: The LangChain chat or LLM model.
+        """
+        chat = model if isinstance(model, BaseChatModel) else None
+        llm = model if isinstance(model, BaseLLM) else None
+        if chat is None and llm is None:
+            raise Exception('Unknown LangChain model type')
+        self.model = model
+        self.lc_wrap = AsyncLangChainWrap(
+            chat=chat,
+            llm=llm,
+        )
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.available_at = 0.0
+
+    def __str__(self):
+        return (f"ModelEndpoint(" +
+                f"model={type(self.model).__name__}" +
+                f", in_flight={self.in_flight}" +
+                f", calls={self.calls}" +
+                f", failures={self.failures}" +
+                ")")
+
+    def __repr__(self):
+        return (f"ModelEndpoint(" +
+                f"model={self.model!r}" +
+                f", in_flight={self.in_flight!r}" +
+                f", calls={self.calls!r}" +
+                f", failures={self.failures!r}" +
+                ")")
+
+
+class ModelPool:
+    """
+    Pool of equivalent model endpoints, such as deployments of one model in several regions or accounts, balanced
+    across commands with failover.
+
+    A call failing with a throttling or transient error moves on to the next endpoint not yet tried, and the failed
+    endpoint is tried last until its Retry-After, or cooldown seconds, has elapsed.  The error of the last endpoint
+    is raised when every endpoint fails.  Without failover, a call is made on the preferred endpoint only, leaving
+    the retries to the caller's RateController, whose next attempt moves on to another endpoint.
+    """
+
+    strategies = ('least_loaded', 'round_robin')
+
+    def __init__(self,
+                 *,
+                 models: list[BaseLanguageModel],
+                 strategy: str = 'least_loaded',
+                 cooldown: float = 30.0,
+                 ):
+        """
+        Create a new instance.
+        :param models: The equivalent LangChain models.  The first identifies the pool in cache and journal keys.
+        :param strategy: 'least_loaded' sends each command to the endpoint with the fewest calls in flight, breaking
+                         ties in turn; 'round_robin' sends commands to the endpoints in turn.  Default is
+                         'least_loaded'.
+        :param cooldown: The seconds a failed endpoint is tried last when the error carries no Retry-After.  Default
+                         is 30.
+        """
+        if not models:
+            raise Exception('models is required')
+        if strategy not in self.strategies:
+            raise Exception(f"Unknown strategy '{strategy}', expected one of {self.strategies}")
+        self.endpoints = [ModelEndpoint(model=model) for model in models]
+        self.strategy = strategy
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._turn = 0
+
+    def __str__(self):
+        return (f"ModelPool(" +
+                f"endpoints={len(self.endpoints)}" +
+                f", strategy={self.strategy}" +
+                f", cooldown={self.cooldown}" +
+                ")")
+
+    def __repr__(self):
+        return (f"ModelPool(" +
+                f"endpoints={self.endpoints!r}" +
+                f", strategy={self.strategy!r}" +
+                f", cooldown={self.cooldown!r}" +
+                ")")
+
+    @staticmethod
+    def of(models: 'BaseLanguageModel | list[BaseLanguageModel] | ModelPool') -> 'ModelPool':
+        """
+        Get a pool for a model, a list of equivalent models, or a pool.
+        :param models: The model, models or pool.
+        :return: the pool.
+        """
+        if isinstance(models, ModelPool):
+            return models
+        if isinstance(models, (list, tuple)):
+            return ModelPool(models=list(models))
+        return ModelPool(models=[models])
+
+    @property
+    def model(self) -> BaseLanguageModel:
+        return self.endpoints[0].model
+
+    def _candidates(self) -> list[ModelEndpoint]:
+        """
+        Order the endpoints to try for the next command.
+        :return: the endpoints, preferred first.
+        """
+        with self._lock:
+            turn = self._turn
+            self._turn = (turn + 1) % len(self.endpoints)
+            candidates = self.endpoints[turn:] + self.endpoints[:turn]
+            if self.strategy == 'least_loaded':
+                candidates.sort(key=lambda endpoint: endpoint.in_flight)
+            now = time.monotonic()
+            # Endpoints cooling down go last, soonest available first.  The sorts are stable, keeping the turn order.
+            candidates.sort(key=lambda endpoint: max(endpoint.available_at - now, 0.0))
+            return candidates
+
+    def _begin(self, endpoint: ModelEndpoint) -> None:
+        with self._lock:
+            endpoint.in_flight += 1
+            endpoint.calls += 1
+
+    def _end(self, endpoint: ModelEndpoint, error: Exception | None) -> None:
+        with self._lock:
+            endpoint.in_flight -= 1
+            if error is None:
+                endpoint.available_at = 0.0
+                return
+            endpoint.failures += 1
+            delay = retry_after(error)
+            endpoint.available_at = time.monotonic() + (delay if delay is not None else self.cooldown)
+
+    def _failover(self, endpoint: ModelEndpoint, cmd: LangChainCommand, error: Exception) -> None:
+        self._end(endpoint, error)
+        log.warning(f"{cmd.session_id} | {cmd.cmd_name} | Endpoint {endpoint} failed, failing over: {error}")
+
+    def execute(self, cmd: LangChainCommand, *, failover: bool = True, **kwargs) -> LangChainCommand:
+        """
+        Submit a command for execution on the preferred endpoint, failing over on transient errors.
+        :param cmd: The command instance.
+        :param failover: Whether to try the other endpoints when the preferred one fails.  Default is True.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: The completed command instance.
+        """
+        error = None
+        candidates = self._candidates()
+        for endpoint in candidates if failover else candidates[:1]:
+            self._begin(endpoint)
+            try:
+                cmd = endpoint.lc_wrap.execute(cmd, **kwargs)
+            except Exception as e:
+                if not is_transient(e):
+                    self._end(endpoint, None)
+                    raise
+                self._failover(endpoint, cmd, e)
+                error = e
+                continue
+            except BaseException:
+                self._end(endpoint, None)
+                raise
+            self._end(endpoint, None)
+            return cmd
+        raise error
+
+    async def aexecute(self, cmd: LangChainCommand, *, failover: bool = True, **kwargs) -> LangChainCommand:
+        """
+        Submit a command for asynchronous execution on the preferred endpoint, failing over on transient errors.
+        :param cmd: The command instance.
+        :param failover: Whether to try the other endpoints when the preferred one fails.  Default is True.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: The completed command instance.
+        """
+        error = None
+        candidates = self._candidates()
+        for endpoint in candidates if failover else candidates[:1]:
+            self._begin(endpoint)
+            try:
+                cmd = await endpoint.lc_wrap.aexecute(cmd, **kwargs)
+            except Exception as e:
+                if not is_transient(e):
+                    self._end(endpoint, None)
+                    raise
+                self._failover(endpoint, cmd, e)
+                error = e
+                continue
+            except BaseException:
+                self._end(endpoint, None)
+                raise
+            self._end(endpoint, None)
+            return cmd
+        raise error
+
+    async def astream(self, cmd: LangChainCommand, **kwargs) -> AsyncIterator[str]:
+        """
+        Submit a command for streaming execution on the preferred endpoint, failing over on transient errors raised
+        before the first chunk.
+        :param cmd: The command instance.
+        :param kwargs: Additional parameters for underlying models, endpoints, and frameworks.
+        :return: an async iterator of response text chunks.
+        """
+        error = None
+        for endpoint in self._candidates():
+            self._begin(endpoint)
+            started = False
+            try:
+                async for chunk in endpoint.lc_wrap.astream(cmd, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                # Chunks already yielded cannot be taken back, so only a stream that has not started fails over.
+                if started or not is_transient(e):
+                    self._end(endpoint, None)
+                    raise
+                self._failover(endpoint, cmd, e)
+                error = e
+                continue
+            except BaseException:
+                self._end(endpoint, None)
+                raise
+            self._end(endpoint, None)
+            return
+        raise error
+
+
+# The command each packed command variant shares its route with, unless routed by its own name.
+_packed_commands = {
+    'GenMultiNewPhrasings': 'GenNewPhrasings',
+    'GenMultiTransformedPhrasings': 'GenTransformedPhrasings',
+}
+
+
+class ModelRouter:
+    """
+    Table routing each command to a model pool: by transform phrase first, then by command name, then to the default
+    pool.
+    """
+
+    def __init__(self,
+                 *,
+                 default: BaseLanguageModel | list[BaseLanguageModel] | ModelPool,
+                 routes: dict[str, BaseLanguageModel | list[BaseLanguageModel] | ModelPool] = None,
+                 ):
+        """
+        Create a new instance.
+        :param default: The model, equivalent models or pool receiving the commands no route matches.
+        :param routes: The model, equivalent models or pool keyed by transform phrase or command name, such as
+                       'GenNewPhrasings'.
+        """
+        self.default = ModelPool.of(default)
+        self.routes = {key: ModelPool.of(models) for key, models in (routes or {}).items()}
+
+    def __str__(self):
+        return (f"ModelRouter(" +
+                f"default={self.default}" +
+                f", routes={list(self.routes)}" +
+                ")")
+
+    def __repr__(self):
+        return (f"ModelRouter(" +
+                f"default={self.default!r}" +
+                f", routes={self.routes!r}" +
+                ")")
+
+    def pool_for(self, cmd: LangChainCommand) -> ModelPool:
+        """
+        Get the model pool a command is routed to.
+        :param cmd: The command instance.
+        :return: the model pool.
+        """
+        transform_phrases = getattr(cmd, 'transform_phrases', None) or [getattr(cmd, 'transform_phrase', None)]
+        for transform_phrase in transform_phrases:
+            if transform_phrase in self.routes:
+                return self.routes[transform_phrase]
+        return self._command_pool(cmd.cmd_name)
+
+    def _command_pool(self, cmd_name: str) -> ModelPool:
+        """
+        Get the model pool a command name is routed to: its own route, then the route of the command it packs, then
+        the default pool.
+        :param cmd_name: The command name.
+        :return: the model pool.
+        """
+        if cmd_name in self.routes:
+            return self.routes[cmd_name]
+        return self.routes.get(_packed_commands.get(cmd_name), self.default)
+
+    def group_transforms(self, transform_phrases: Iterable[str]) -> list[list[str]]:
+        """
+        Group transform phrases by the pool they are routed to, so that each multi-transform call goes to one pool.
+        Phrases without a route of their own go to the GenMultiTransformedPhrasings command route.
+        :param transform_phrases: The transformation instruction phrases.
+        :return: the groups, in order of first appearance.
+        """
+        groups: dict[int, list[str]] = {}
+        for transform_phrase in transform_phrases:
+            pool = self.routes.get(transform_phrase)
+            if pool is None:
+                pool = self._command_pool('GenMultiTransformedPhrasings')
+            groups.setdefault(id(pool), []).append(transform_phrase)
+        return list(groups.values())
@@ -0,0 +1,103 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+from langchain_core.outputs import Generation
+from langchain_core.utils.json import parse_json_markdown
+
+from interacticore import BrokenJsonOutputParser
+from interactigen.streaming import UtteranceStreamParser
+
+from json import JSONDecodeError
+from typing import Any
+
+import json
+import logging
+
+# Initialize the logger.
+log = logging.getLogger('interactigenLogger')
+
+
+def salvage_utterances(text: str, *, group: str = 'transform') -> dict | None:
+    """
+    Recover every complete utterance string from a truncated or malformed utterances response.
+    :param text: The response text.
+    :param group: The key numbering each group of utterances in a grouped format.  Default is 'transform'.
+    :return: the recovered PhraseUtterances or grouped result, such as PhraseTransformsUtterances, marked as
+             salvaged, or None when no utterance could be recovered.
+    """
+    parser = UtteranceStreamParser(group=group)
+    items = parser.feed(text) + parser.close()
+    if not items:
+        return None
+    if all(number is None for number, _ in items):
+        return {'utterances': [utterance for _, utterance in items], 'salvaged': True}
+    groups: list[dict] = []
+    for number, utterance in items:
+        if not groups or groups[-1][group] != number:
+            groups.append({group: number, 'utterances': []})
+        groups[-1]['utterances'].append(utterance)
+    return {f"{group}s": groups, 'salvaged': True}
+
+
+def is_salvaged(result) -> bool:
+    """
+    Check whether a command result was recovered from a response that could not be parsed, and may be incomplete.
+    :param result: The command result.
+    :return: True if the result was salvaged.
+    """
+    return isinstance(result, dict) and bool(result.get('salvaged'))
+
+
+class SalvagingJsonOutputParser(BrokenJsonOutputParser):
+    """
+    JSON output parser that salvages the complete utterance strings of a response that is not valid JSON, such as
+    one cut off by the output token limit, and marks the result so that the missing part can be requested again.
+    """
+
+    # The key numbering each group of utterances in a grouped response format.
+    salvage_group: str = 'transform'
+
+    def parse_result(self, result: list[Generation], *, partial: bool = False) -> Any:
+        if partial:
+            return super().parse_result(result, partial=partial)
+        text = result[0].text.strip()
+        try:
+            return parse_json_markdown(text, parser=_strict_json)
+        except JSONDecodeError:
+            pass
+        # The lenient parser accepts a truncated response, but keeps its last string even when it is cut off.
+        salvaged = salvage_utterances(text, group=self.salvage_group)
+        if salvaged is None:
+            # Text that is not JSON at all raises, and is retried.  JSON cut off before its first utterance closed
+            # yields nothing.
+            super().parse_result(result, partial=partial)
+            log.warning(f"Salvaged no utterances from a malformed response of {len(text)} characters")
+            return {'utterances': [], 'salvaged': True}
+        log.warning(f"Salvaged the complete utterances of a malformed response of {len(text)} characters")
+        return salvaged
+
+    @property
+    def _type(self) -> str:
+        return "salvaging_json_output_parser"
+
+
+def _strict_json(text: str) -> Any:
+    return json.loads(text, strict=False)
@@ -0,0 +1,313 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen.dedup import normalize_utterance
+
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Mapping
+from typing import NamedTuple
+
+import hashlib
+import json
+import os
+
+# The record fields, in output column order.
+record_fields = ['intent', 'base_phrase', 'stage', 'transform', 'utterance', 'split']
+
+
+class DatasetRecord(NamedTuple):
+    """
+    A single generated utterance with its provenance, as written to a dataset sink.
+    """
+    intent: str
+    base_phrase: str
+    stage: str
+    transform: str | None
+    utterance: str
+    split: str | None = None
+
+
+def _utterance_key(record: DatasetRecord) -> str:
+    return normalize_utterance(record.utterance)
+
+
+class HashSplitter:
+    """
+    Deterministic train/test/validation assignment by hashing a record key, so a record lands in the same split
+    regardless of generation order, sharding or run, without keeping any state.
+    """
+
+    def __init__(self,
+                 *,
+                 ratios: Mapping[str, float] = None,
+                 key: Callable[[DatasetRecord], str] = _utterance_key,
+                 seed: int = 0,
+                 ):
+        """
+        Create a new instance.
+        :param ratios: The proportion of records in each split.  Normalized to sum to one.  Default is 80% 'train',
+                       10% 'validation' and 10% 'test'.
+        :param key: The function computing the hashed key of a record.  Default is the normalized utterance, so
+                    duplicates differing only in case or punctuation share a split.  Hash the intent instead to hold
+                    out whole intents.
+        :param seed: The hash seed.  Changing it reshuffles the splits.
+        """
+        ratios = dict(ratios if ratios is not None else {'train': 0.8, 'validation': 0.1, 'test': 0.1})
+        if not ratios or any(ratio < 0 for ratio in ratios.values()) or sum(ratios.values()) <= 0:
+            raise Exception('ratios must be non-negative with a positive sum')
+        total = sum(ratios.values())
+        self.ratios = {split: ratio / total for split, ratio in ratios.items()}
+        self.key = key
+        self.seed = seed
+        self._seed_hash = hashlib.blake2b(f"{seed}\x00".encode('utf-8'), digest_size=8)
+        self._bounds: list[tuple[int, str]] = []
+        cumulative = 0.0
+        for split, ratio in self.ratios.items():
+            cumulative += ratio
+            self._bounds.append((min(2 ** 64, round(cumulative * 2 ** 64)), split))
+
+    def __str__(self):
+        return f"HashSplitter(ratios={self.ratios}, seed={self.seed})"
+
+    def __repr__(self):
+        return f"HashSplitter(ratios={self.ratios!r}, key={self.key!r}, seed={self.seed!r})"
+
+    def assign(self, record: DatasetRecord) -> str:
+        """
+        Assign a record to a split.
+        :param record: The record.
+        :return: the split name.
+        """
+        key_hash = self._seed_hash.copy()
+        key_hash.update(self.key(record).encode('utf-8'))
+        point = int.from_bytes(key_hash.digest())
+        for bound, split in self._bounds:
+            if point < bound:
+                return split
+        return self._bounds[-1][1]
+
+
+class DatasetSink(ABC):
+    """
+    Abstract destination receiving dataset records as they are generated.  Records are assigned to splits as they
+    are written, so memory use does not grow with the dataset.
+    """
+
+    def __init__(self,
+                 *,
+                 splitter: HashSplitter = None,
+                 ):
+        """
+        Create a new instance.
+        :param splitter: The split assignment.  Default is no splitting.
+        """
+        self.splitter = splitter
+        self.counts: dict[str | None, int] = {}
+        self.closed = False
+
+    def write(self, record: DatasetRecord) -> DatasetRecord:
+        """
+        Write a record, assigning its split.
+        :param record: The record.
+        :return: the record as written.
+        """
+        if self.closed:
+            raise Exception('sink is closed')
+        if self.splitter is not None and record.split is None:
+            record = record._replace(split=self.splitter.assign(record))
+        self._write(record)
+        self.counts[record.split] = self.counts.get(record.split, 0) + 1
+        return record
+
+    @abstractmethod
+    def _write(self, record: DatasetRecord) -> None:
+        """
+        Write a record with its split assigned.
+        :param record: The record.
+        """
+        pass
+
+    def flush(self) -> None:
+        """
+        Flush buffered records.
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Flush buffered records and close the sink.
+        """
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+
+def _split_path(path: str, split: str | None) -> str:
+    """
+    Get the file of a split from a path template.
+    :param path: The path, optionally containing '{split}'.
+    :param split: The split name.
+    :return: the file path.
+    """
+    return path.replace('{split}', split or 'all')
+
+
+class JsonlSink(DatasetSink):
+    """
+    Write dataset records as JSON lines.  A path containing '{split}' writes one file per split; otherwise every
+    record goes to one file with a "split" field.
+    """
+
+    def __init__(self,
+                 path: str,
+                 *,
+                 splitter: HashSplitter = None,
+                 ):
+        """
+        Create a new instance.
+        :param path: The output path, optionally containing '{split}'.
+        :param splitter: The split assignment.  Default is no splitting.
+        """
+        super().__init__(splitter=splitter)
+        self.path = path
+        self._files: dict[str, object] = {}
+
+    def __str__(self):
+        return f"JsonlSink(path={self.path}, splitter={self.splitter})"
+
+    def __repr__(self):
+        return f"JsonlSink(path={self.path!r}, splitter={self.splitter!r})"
+
+    def _write(self, record: DatasetRecord) -> None:
+        file_path = _split_path(self.path, record.split)
+        file = self._files.get(file_path)
+        if file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+            file = self._files[file_path] = open(file_path, 'w', encoding='utf-8')
+        file.write(json.dumps(record._asdict(), ensure_ascii=False) + '\n')
+
+    def flush(self) -> None:
+        for file in self._files.values():
+            file.flush()
+
+    def close(self) -> None:
+        for file in self._files.values():
+            file.close()
+        self._files.clear()
+        super().close()
+
+
+class ParquetSink(DatasetSink):
+    """
+    Write dataset records as Parquet, one Arrow record batch per batch_size records.  A path containing '{split}'
+    writes one file per split; otherwise every record goes to one file with a "split" column.  Requires the pyarrow
+    package.
+    """
+
+    def __init__(self,
+                 path: str,
+                 *,
+                 splitter: HashSplitter = None,
+                 batch_size: int = 8192,
+                 compression: str = 'snappy',
+                 ):
+        """
+        Create a new instance.
+        :param path: The output path, optionally containing '{split}'.
+        :param splitter: The split assignment.  Default is no splitting.
+        :param batch_size: The records buffered per file before a record batch is written.
+        :param compression: The Parquet compression codec.
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise Exception('ParquetSink requires the pyarrow package') from e
+        if batch_size < 1:
+            raise Exception('batch_size must be at least 1')
+
+        super().__init__(splitter=splitter)
+        self.path = path
+        self.batch_size = batch_size
+        self.compression = compression
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._schema = pyarrow.schema([(field, pyarrow.string()) for field in record_fields])
+        self._writers: dict[str, object] = {}
+        self._buffers: dict[str, list[DatasetRecord]] = {}
+
+    def __str__(self):
+        return f"ParquetSink(path={self.path}, splitter={self.splitter})"
+
+    def __repr__(self):
+        return (f"ParquetSink(path={self.path!r}" +
+                f", splitter={self.splitter!r}" +
+                f", batch_size={self.batch_size!r}" +
+                f", compression={self.compression!r}" +
+                ")")
+
+    def _write(self, record: DatasetRecord) -> None:
+        file_path = _split_path(self.path, record.split)
+        buffer = self._buffers.setdefault(file_path, [])
+        buffer.append(record)
+        if len(buffer) >= self.batch_size:
+            self._flush_file(file_path)
+
+    def _flush_file(self, file_path: str) -> None:
+        """
+        Write the buffered records of a file as one record batch.
+        :param file_path: The file path.
+        """
+        buffer = self._buffers.get(file_path)
+        if not buffer:
+            return
+        writer = self._writers.get(file_path)
+        if writer is None:
+            os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+            writer = self._writers[file_path] = self._pq.ParquetWriter(file_path, self._schema,
+                                                                       compression=self.compression)
+        columns = list(zip(*buffer))
+        writer.write_batch(self._pa.record_batch(
+            [self._pa.array(column, type=self._pa.string()) for column in columns],
+            schema=self._schema,
+        ))
+        buffer.clear()
+
+    def flush(self) -> None:
+        for file_path in list(self._buffers):
+            self._flush_file(file_path)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.flush()
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+        super().close()
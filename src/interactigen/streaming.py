@@ -0,0 +1,182 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+
+
+class _Container:
+    """
+    A JSON object or array open in the stream.
+    """
+
+    def __init__(self, *, is_object: bool, key: str | None):
+        """
+        Create a new instance.
+        :param is_object: Whether the container is an object, rather than an array.
+        :param key: The key the container is stored under in its parent object, if any.
+        """
+        self.is_object = is_object
+        self.key = key
+        self.expect_key = is_object
+        self.member_key: str | None = None
+        self.scalars: dict = {}
+        # The utterances of a group object received before its group number.
+        self.pending: list[str] = []
+
+
+class UtteranceStreamParser:
+    """
+    Incremental parser emitting each string of an "utterances" array the moment its closing quote arrives.
+
+    Handles the PhraseUtterances response format and grouped formats such as PhraseTransformsUtterances.  Text
+    before the first opening brace, such as a preamble or Markdown fence, is ignored.  The utterances of a group
+    whose number follows its "utterances" array are held back until the number arrives, or the group closes without
+    one; call close() at the end of the response for those of a group left open.
+    """
+
+    def __init__(self, *, group: str = 'transform'):
+        """
+        Create a new instance.
+        :param group: The key numbering the object enclosing each "utterances" array in a grouped format.  Default
+                      is 'transform', for PhraseTransformsUtterances.
+        """
+        self.group = group
+        self._started = False
+        self._stack: list[_Container] = []
+        self._in_string = False
+        self._escaped = False
+        self._string: list[str] = []
+        self._literal: list[str] = []
+        self.text = ''
+
+    def feed(self, text: str) -> list[tuple[int | None, str]]:
+        """
+        Consume the next piece of the response.
+        :param text: The response text received since the last call.
+        :return: the utterances completed by this text, each paired with the enclosing group number, if any.
+        """
+        self.text += text
+        completed: list[tuple[int | None, str]] = []
+        for char in text:
+            if not self._started:
+                if char != '{':
+                    continue
+                self._started = True
+            if self._in_string:
+                self._consume_string_char(char, completed)
+            else:
+                self._consume_char(char, completed)
+        return completed
+
+    def close(self) -> list[tuple[int | None, str]]:
+        """
+        End the response, releasing the utterances of the groups left open, such as by a truncated response.
+        :return: the utterances held back, each paired with the enclosing group number, if any.
+        """
+        completed: list[tuple[int | None, str]] = []
+        if not self._in_string:
+            self._flush_literal(completed)
+        for container in self._stack:
+            completed.extend((None, utterance) for utterance in container.pending)
+            container.pending = []
+        return completed
+
+    def _consume_string_char(self, char: str, completed: list) -> None:
+        if self._escaped:
+            self._escaped = False
+            self._string.append(char)
+        elif char == '\\':
+            self._escaped = True
+            self._string.append(char)
+        elif char == '"':
+            self._in_string = False
+            try:
+                value = json.loads(f'"{"".join(self._string)}"', strict=False)
+            except json.JSONDecodeError:
+                value = ''.join(self._string)
+            self._string = []
+            self._on_string(value, completed)
+        else:
+            self._string.append(char)
+
+    def _consume_char(self, char: str, completed: list) -> None:
+        if char in ',]}' or char.isspace():
+            self._flush_literal(completed)
+        if char == '"':
+            self._in_string = True
+        elif char in '{[':
+            parent = self._stack[-1] if self._stack else None
+            key = parent.member_key if parent is not None and parent.is_object else None
+            self._stack.append(_Container(is_object=char == '{', key=key))
+        elif char in ']}':
+            if self._stack:
+                completed.extend((None, utterance) for utterance in self._stack.pop().pending)
+        elif char == ',':
+            if self._stack and self._stack[-1].is_object:
+                self._stack[-1].expect_key = True
+        elif char == ':':
+            if self._stack and self._stack[-1].is_object:
+                self._stack[-1].expect_key = False
+        elif not char.isspace():
+            self._literal.append(char)
+
+    def _flush_literal(self, completed: list) -> None:
+        if not self._literal:
+            return
+        try:
+            value = json.loads(''.join(self._literal))
+        except json.JSONDecodeError:
+            value = None
+        self._literal = []
+        if self._stack and self._stack[-1].is_object and self._stack[-1].member_key is not None:
+            self._set_scalar(self._stack[-1], value, completed)
+
+    def _set_scalar(self, container: _Container, value, completed: list) -> None:
+        container.scalars[container.member_key] = value
+        if container.member_key == self.group and container.pending:
+            number = self._group_number(container)
+            completed.extend((number, utterance) for utterance in container.pending)
+            container.pending = []
+
+    def _group_number(self, container: _Container) -> int | None:
+        number = container.scalars.get(self.group)
+        try:
+            return int(number) if number is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def _on_string(self, value: str, completed: list) -> None:
+        if not self._stack:
+            return
+        top = self._stack[-1]
+        if top.is_object:
+            if top.expect_key:
+                top.member_key = value
+            else:
+                self._set_scalar(top, value, completed)
+        elif top.key == 'utterances':
+            parent = self._stack[-2] if len(self._stack) > 1 else None
+            if parent is not None and len(self._stack) > 2 and self.group not in parent.scalars:
+                # A nested object is a group whose number may still follow.
+                parent.pending.append(value)
+            else:
+                completed.append((self._group_number(parent) if parent is not None else None, value))
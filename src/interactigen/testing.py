@@ -0,0 +1,243 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.pydantic_v1 import PrivateAttr
+
+from interactigen.chunking import estimate_tokens
+
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager, nullcontext
+
+import ast
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+
+# The user prompts of the interactigen commands, as rendered.
+_new_phrasings_pattern = re.compile(r"generate (\d+) semantically diverse ways (.*)\.$", re.S)
+_multi_new_phrasings_pattern = re.compile(r"For each of the following numbered phrases, separately generate (\d+) "
+                                          r"semantically diverse ways to express it:\n\n(.*)$", re.S)
+_transformed_pattern = re.compile(r"utterances:\n\n(.*)\n\nPlease repeat these examples, but (.*)$", re.S)
+_multi_transformed_pattern = re.compile(r"utterances:\n\n(.*)\n\nFor each of the following numbered instructions, "
+                                        r"separately repeat these examples, but apply the instruction:\n\n(.*)$", re.S)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline chat model answering interactigen commands deterministically, with a configurable latency distribution,
+    token rate, output size and malformed response rate.  Use it to benchmark and test pipelines without calling a
+    provider.
+
+    Responses and simulated delays derive only from the seed, the prompt and how often that prompt was seen, so runs
+    are reproducible regardless of concurrency.
+    """
+
+    latency: float = 0.05
+    """The median time to first token, in seconds."""
+    latency_sigma: float = 0.0
+    """The log-normal spread of the time to first token.  0.0 makes it constant."""
+    tokens_per_second: float | None = None
+    """The output token rate.  None returns the whole response after the time to first token."""
+    output_size: int = 1
+    """The number of utterances returned per requested utterance when transforming."""
+    duplicate_rate: float = 0.0
+    """The probability that a transformed utterance repeats its input verbatim."""
+    malformed_rate: float = 0.0
+    """The probability that a response is not valid JSON."""
+    truncated_rate: float = 0.0
+    """The probability that a response is cut off half way, as when it reaches the output token limit."""
+    seed: int = 0
+    """The random seed."""
+    calls: int = 0
+    """The number of requests answered so far."""
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _attempts: dict = PrivateAttr(default_factory=dict)
+
+    @property
+    def _llm_type(self) -> str:
+        return 'interactigen-fake'
+
+    def _rng(self, prompt: str) -> random.Random:
+        """
+        Get the random generator for a request.
+        :param prompt: The rendered prompt.
+        :return: the random generator, seeded by the seed, prompt and attempt number.
+        """
+        digest = hashlib.blake2b(prompt.encode('utf-8'), digest_size=8).hexdigest()
+        with self._lock:
+            self.calls += 1
+            attempt = self._attempts.get(digest, 0)
+            self._attempts[digest] = attempt + 1
+        return random.Random(f"{self.seed}:{digest}:{attempt}")
+
+    def _vary(self, rng: random.Random, utterance: str, tag: str) -> str:
+        """
+        Produce a transformed utterance.
+        :param rng: The request's random generator.
+        :param utterance: The input utterance.
+        :param tag: The text identifying the variant.
+        :return: the transformed utterance.
+        """
+        if rng.random() < self.duplicate_rate:
+            return utterance
+        words = utterance.split()
+        if len(words) > 2:
+            idx = rng.randrange(len(words) - 1)
+            words[idx], words[idx + 1] = words[idx + 1], words[idx]
+        return ' '.join(words + [tag])
+
+    def _answer(self, prompt: str, rng: random.Random) -> str:
+        """
+        Answer a rendered prompt.
+        :param prompt: The rendered prompt.
+        :param rng: The request's random generator.
+        :return: the response text.
+        """
+        if rng.random() < self.malformed_rate:
+            return "I'm sorry, I can only help with that as a bulleted list."
+        match = _multi_new_phrasings_pattern.search(prompt)
+        if match:
+            quantity, phrases = int(match.group(1)), []
+            for line in match.group(2).splitlines():
+                idx, _, base_phrase = line.partition('. ')
+                phrases.append({
+                    'phrase': int(idx),
+                    'utterances': [f"{base_phrase} {k}" for k in range(quantity)],
+                })
+            return json.dumps({'phrases': phrases})
+        match = _new_phrasings_pattern.search(prompt)
+        if match:
+            quantity, base_phrase = int(match.group(1)), match.group(2)
+            return json.dumps({'utterances': [f"{base_phrase} {idx}" for idx in range(quantity)]})
+        match = _multi_transformed_pattern.search(prompt)
+        if match:
+            utterances = ast.literal_eval(match.group(1))
+            transforms = []
+            for line in match.group(2).splitlines():
+                idx, _, phrase = line.partition('. ')
+                transforms.append({
+                    'transform': int(idx),
+                    'utterances': [self._vary(rng, utterance, f"t{idx}v{k}")
+                                   for utterance in utterances for k in range(self.output_size)],
+                })
+            return json.dumps({'transforms': transforms})
+        match = _transformed_pattern.search(prompt)
+        if match:
+            utterances = ast.literal_eval(match.group(1))
+            tag = hashlib.blake2b(match.group(2).encode('utf-8'), digest_size=2).hexdigest()
+            return json.dumps({'utterances': [self._vary(rng, utterance, f"{tag}v{k}")
+                                              for utterance in utterances for k in range(self.output_size)]})
+        return json.dumps({'utterances': []})
+
+    def _respond(self, messages) -> tuple[str, str, float, float]:
+        """
+        Prepare the response to a request.
+        :param messages: The request messages.
+        :return: the prompt, response text, time to first token and generation time.
+        """
+        prompt = '\n'.join(str(message.content) for message in messages)
+        rng = self._rng(prompt)
+        first_token = self.latency * rng.lognormvariate(0.0, self.latency_sigma) if self.latency_sigma else self.latency
+        text = self._answer(str(messages[-1].content), rng)
+        if rng.random() < self.truncated_rate:
+            text = text[:len(text) // 2]
+        generation = estimate_tokens(text) / self.tokens_per_second if self.tokens_per_second else 0.0
+        return prompt, text, first_token, generation
+
+    def _result(self, prompt: str, text: str) -> ChatResult:
+        """
+        Build the chat result, reporting estimated token usage.
+        :param prompt: The rendered prompt.
+        :param text: The response text.
+        :return: the chat result.
+        """
+        usage = {'prompt_tokens': estimate_tokens(prompt), 'completion_tokens': estimate_tokens(text)}
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=text))],
+            llm_output={'token_usage': usage},
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt, text, first_token, generation = self._respond(messages)
+        time.sleep(first_token + generation)
+        return self._result(prompt, text)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt, text, first_token, generation = self._respond(messages)
+        await asyncio.sleep(first_token + generation)
+        return self._result(prompt, text)
+
+    def _chunks(self, text: str, generation: float) -> tuple[list[str], float]:
+        """
+        Split a response into token-sized stream chunks.
+        :param text: The response text.
+        :param generation: The generation time of the whole response.
+        :return: the chunks and the delay between them.
+        """
+        chunks = [text[idx:idx + 4] for idx in range(0, len(text), 4)]
+        return chunks, generation / max(1, len(chunks))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        prompt, text, first_token, generation = self._respond(messages)
+        time.sleep(first_token)
+        chunks, delay = self._chunks(text, generation)
+        for chunk in chunks:
+            if delay:
+                time.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        prompt, text, first_token, generation = self._respond(messages)
+        await asyncio.sleep(first_token)
+        chunks, delay = self._chunks(text, generation)
+        for chunk in chunks:
+            if delay:
+                await asyncio.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+
+@contextmanager
+def tracing_disabled() -> Iterator[None]:
+    """
+    Disable the LangSmith tracing that command execution otherwise always enables, so that offline runs neither reach
+    the network nor wait for trace uploads at exit.
+    """
+    import interacticore.interacticore
+    import interactigen.async_wrap
+
+    modules = [interacticore.interacticore, interactigen.async_wrap]
+    originals = [module.tracing_v2_enabled for module in modules]
+    for module in modules:
+        module.tracing_v2_enabled = lambda *args, **kwargs: nullcontext()
+    try:
+        yield
+    finally:
+        for module, original in zip(modules, originals):
+            module.tracing_v2_enabled = original
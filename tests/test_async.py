@@ -0,0 +1,68 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import Interactigen
+from interactigen.testing import FakeChatModel
+
+import asyncio
+
+
+class ConcurrencyProbe(FakeChatModel):
+    """
+    Fake chat model recording the peak number of concurrent requests.
+    """
+
+    active: int = 0
+    peak: int = 0
+
+    async def _agenerate(self, *args, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await super()._agenerate(*args, **kwargs)
+        finally:
+            self.active -= 1
+
+
+def test_async_utterances_are_unique_and_include_new_phrasings():
+    client = Interactigen(model=FakeChatModel(latency=0))
+    utterances = asyncio.run(client.agenerate_phrase_utterances(base_phrase='to pay', init_quantity=5))
+    assert len(utterances) == len(set(utterances))
+    assert {f"to pay {idx}" for idx in range(5)} <= set(utterances)
+
+
+def test_transform_fan_out_is_bounded_by_max_concurrency():
+    model = ConcurrencyProbe(latency=0.01)
+    client = Interactigen(model=model, max_concurrency=2, max_output_tokens=None)
+    asyncio.run(client.agenerate_phrase_utterances(base_phrase='to pay', init_quantity=5))
+    assert model.peak == 2
+
+
+def test_async_transforms_keep_input_order():
+    model = FakeChatModel(latency=0)
+    client = Interactigen(model=model, chunk_token_budget=10)
+    # The fake model keeps the word order of two-word utterances.
+    utterances = [f"pay bill{idx}" for idx in range(40)]
+    transformed = asyncio.run(client.agenerate_phrase_transforms(utterances=utterances,
+                                                                 transform_phrase='use one to three words'))
+    assert model.calls > 1
+    assert [result.split()[:2] for result in transformed] == [utterance.split() for utterance in utterances]
@@ -0,0 +1,153 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import BatchRequest, GenNewPhrasings, Instrumentation, Interactigen, LocalBatchBackend, RunJournal
+from interactigen.batch import parse_result_line
+from interactigen.testing import FakeChatModel
+
+import json
+import os
+import time
+
+phrases = ['to pay', 'to check balance', 'to be broken']
+
+
+class FailingChatModel(FakeChatModel):
+    """
+    Fake chat model that rejects every prompt mentioning 'broken'.
+    """
+
+    def _answer(self, prompt, rng):
+        if 'broken' in prompt:
+            raise ValueError('prompt rejected')
+        return super()._answer(prompt, rng)
+
+
+class StalledBatchBackend(LocalBatchBackend):
+    """
+    Local batch backend whose jobs never report a terminal status, though their results are written.
+    """
+
+    def status(self, job_id: str) -> str:
+        return 'finalizing'
+
+
+class CallRecorder(Instrumentation):
+    """
+    Instrumentation recording every command started and ended.
+    """
+
+    def __init__(self):
+        self.started = []
+        self.ended = []
+
+    def on_command_start(self, call):
+        self.started.append(call)
+
+    def on_command_end(self, call):
+        self.ended.append(call)
+
+
+def wait(backend: LocalBatchBackend, job_id: str) -> str:
+    for _ in range(500):
+        status = backend.status(job_id)
+        if status != 'in_progress':
+            return status
+        time.sleep(0.01)
+    raise TimeoutError(job_id)
+
+
+def run_batch(model: FakeChatModel, directory, **kwargs) -> dict:
+    backend = LocalBatchBackend(directory=str(directory), model=model)
+    results = Interactigen(model=model, **kwargs).generate_dataset_batch(phrases, backend, init_quantity=5,
+                                                                         poll_interval=0.01, timeout=30)
+    return {result.base_phrase: result for result in results}
+
+
+def test_local_backend_round_trip(tmp_path):
+    model = FakeChatModel(latency=0)
+    backend = LocalBatchBackend(directory=str(tmp_path), model=model)
+    requests = [BatchRequest.of(f"req-{idx}", GenNewPhrasings(base_phrase=base_phrase, quantity=3))
+                for idx, base_phrase in enumerate(phrases[:2])]
+    job_id = backend.submit(requests)
+    assert wait(backend, job_id) == 'completed'
+    results = sorted(backend.results(job_id))
+    assert [result.custom_id for result in results] == ['req-0', 'req-1']
+    assert json.loads(results[0].text) == {'utterances': ['to pay 0', 'to pay 1', 'to pay 2']}
+    assert all(result.error is None and result.usage for result in results)
+    assert model.calls == 2
+
+
+def test_result_lines_report_errors():
+    assert parse_result_line({'custom_id': 'a', 'error': {'message': 'boom'}}).error == 'boom'
+    assert parse_result_line({'custom_id': 'a', 'response': {'status_code': 500, 'body': {}}}).error == 'HTTP 500'
+    assert parse_result_line({'custom_id': 'a', 'response': {'body': {}}}).text is None
+
+
+def test_batch_run_matches_online_run(tmp_path):
+    results = run_batch(FailingChatModel(latency=0), tmp_path)
+    assert list(results) == phrases
+    assert isinstance(results['to be broken'].error, Exception)
+    for base_phrase in phrases[:2]:
+        expected = Interactigen(model=FakeChatModel(latency=0)).generate_phrase_utterances(
+            base_phrase=base_phrase, init_quantity=5)
+        assert sorted(results[base_phrase].utterances) == sorted(expected)
+    # The new phrasings, then one job per pipeline wave.
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_rerun_with_journal_submits_nothing(tmp_path):
+    journal_path = str(tmp_path / 'run.jsonl')
+    journal = RunJournal(path=journal_path)
+    first = run_batch(FakeChatModel(latency=0), tmp_path / 'first', journal=journal)
+    journal.close()
+
+    model = FakeChatModel(latency=0)
+    journal = RunJournal(path=journal_path)
+    second = run_batch(model, tmp_path / 'second', journal=journal)
+    journal.close()
+    assert {phrase: result.utterances for phrase, result in second.items()} == \
+           {phrase: result.utterances for phrase, result in first.items()}
+    assert model.calls == 0
+    assert not os.path.exists(tmp_path / 'second')
+
+
+def test_timed_out_job_is_cancelled_and_ends_every_call(tmp_path):
+    model = FakeChatModel(latency=1.0)
+    backend = LocalBatchBackend(directory=str(tmp_path), model=model)
+    recorder = CallRecorder()
+    results = Interactigen(model=model, instrumentation=[recorder]).generate_dataset_batch(
+        phrases, backend, init_quantity=5, poll_interval=0.01, timeout=0.05)
+    assert all(isinstance(result.error, TimeoutError) for result in results)
+    assert len(recorder.started) == len(recorder.ended) == len(phrases)
+    assert all(isinstance(call.error, TimeoutError) for call in recorder.ended)
+    assert [backend.status(job_id) for job_id in os.listdir(tmp_path)] == ['cancelled']
+
+
+def test_timed_out_job_keeps_completed_results(tmp_path):
+    backend = StalledBatchBackend(directory=str(tmp_path), model=FakeChatModel(latency=0))
+    client = Interactigen(model=FakeChatModel(latency=0))
+    cmds = [GenNewPhrasings(base_phrase=base_phrase, quantity=3) for base_phrase in phrases]
+    errors = client._run_batch(backend, cmds, poll_interval=0.01, timeout=0.5)
+    assert errors == [None] * len(phrases)
+    assert [cmd.result['utterances'] for cmd in cmds] == [[f"{phrase} {idx}" for idx in range(3)]
+                                                          for phrase in phrases]
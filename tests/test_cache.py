@@ -0,0 +1,88 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import GenNewPhrasings, Interactigen, ResponseCache
+from interactigen.testing import FakeChatModel
+
+import asyncio
+import time
+
+
+def test_second_run_is_served_from_cache(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    first = FakeChatModel(latency=0)
+    expected = Interactigen(model=first, cache=ResponseCache(path=path)).generate_phrase_utterances(
+        base_phrase='to pay', init_quantity=5)
+    assert first.calls > 0
+
+    # A new client over the same file replays every command.
+    second = FakeChatModel(latency=0)
+    client = Interactigen(model=second, cache=ResponseCache(path=path))
+    assert client.generate_phrase_utterances(base_phrase='to pay', init_quantity=5) == expected
+    assert second.calls == 0
+    assert client.cache.stats()['misses'] == 0
+
+
+def test_async_run_shares_the_cache():
+    model = FakeChatModel(latency=0)
+    client = Interactigen(model=model, cache=ResponseCache(path=':memory:'))
+    asyncio.run(client.agenerate_phrase_utterances(base_phrase='to pay', init_quantity=5))
+    calls = model.calls
+    asyncio.run(client.agenerate_phrase_utterances(base_phrase='to pay', init_quantity=5))
+    assert model.calls == calls
+
+
+def test_use_cache_false_calls_the_model_and_refreshes():
+    model = FakeChatModel(latency=0)
+    cache = ResponseCache(path=':memory:')
+    client = Interactigen(model=model, cache=cache)
+    client.generate_phrase_init_utterances(base_phrase='to pay', quantity=5)
+    client.generate_phrase_init_utterances(base_phrase='to pay', quantity=5, use_cache=False)
+    assert model.calls == 2
+    assert len(cache) == 1
+
+
+def test_key_depends_on_prompt_inputs():
+    model = FakeChatModel(latency=0)
+    key = ResponseCache.key_for(GenNewPhrasings(base_phrase='to pay', quantity=5), model=model)
+    assert key == ResponseCache.key_for(GenNewPhrasings(base_phrase='to pay', quantity=5), model=model)
+    assert key != ResponseCache.key_for(GenNewPhrasings(base_phrase='to pay', quantity=6), model=model)
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResponseCache(path=':memory:', max_entries=2)
+    for key in ('a', 'b'):
+        cache.put(key, 'GenNewPhrasings', {'utterances': [key]})
+        time.sleep(0.01)
+    assert cache.get('a') == {'utterances': ['a']}
+    time.sleep(0.01)
+    cache.put('c', 'GenNewPhrasings', {'utterances': ['c']})
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+
+
+def test_expired_entries_miss():
+    cache = ResponseCache(path=':memory:', ttl=0.05)
+    cache.put('a', 'GenNewPhrasings', {'utterances': ['a']})
+    assert cache.get('a') is not None
+    time.sleep(0.1)
+    assert cache.get('a') is None
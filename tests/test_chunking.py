@@ -0,0 +1,93 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import Interactigen, Pipeline, Stage
+from interactigen.chunking import chunk_utterances, estimate_tokens
+from interactigen.testing import FakeChatModel
+
+import pytest
+import threading
+
+utterances = [f"pay bill{idx}" for idx in range(12)]
+probe_lock = threading.Lock()
+
+
+class ThreadConcurrencyProbe(FakeChatModel):
+    """
+    Fake chat model recording the peak number of concurrent requests across threads.
+    """
+
+    active: int = 0
+    peak: int = 0
+
+    def _generate(self, *args, **kwargs):
+        with probe_lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            return super()._generate(*args, **kwargs)
+        finally:
+            with probe_lock:
+                self.active -= 1
+
+
+def test_chunks_keep_order_and_fit_budget():
+    chunks = chunk_utterances(utterances, token_budget=12)
+    assert len(chunks) > 1
+    assert [utterance for chunk in chunks for utterance in chunk] == utterances
+    for chunk in chunks:
+        assert sum(estimate_tokens(utterance) + 1 for utterance in chunk) <= 12
+
+
+def test_oversize_utterance_forms_its_own_chunk():
+    long = 'word ' * 40
+    assert chunk_utterances(['a', long, 'b'], token_budget=5) == [['a'], [long], ['b']]
+
+
+def test_no_budget_disables_chunking():
+    assert chunk_utterances(utterances, token_budget=None) == [utterances]
+    with pytest.raises(Exception):
+        chunk_utterances(utterances, token_budget=0)
+
+
+def test_transform_call_per_chunk_in_input_order():
+    model = FakeChatModel(latency=0)
+    client = Interactigen(model=model, chunk_token_budget=12)
+    results = client.generate_phrase_transforms(utterances=utterances, transform_phrase='Add a typo.')
+    assert model.calls == len(chunk_utterances(utterances, token_budget=12))
+    assert len(results) == len(utterances)
+    assert [result.split()[1] for result in results] == [f"bill{idx}" for idx in range(12)]
+
+
+def test_sync_fan_out_is_bounded_by_max_concurrency():
+    model = ThreadConcurrencyProbe(latency=0.02)
+    # Two groups of stages with different inputs in one wave, each transforming several chunks.
+    pipeline = Pipeline(stages=[
+        Stage(name='typos', transforms=['introduce common spelling mistakes']),
+        Stage(name='casual', transforms=['sound more casual']),
+        Stage(name='short', transforms=['use one to three words'], inputs=['typos']),
+        Stage(name='emojis', transforms=['introduce common emojis'], inputs=['casual']),
+    ])
+    client = Interactigen(model=model, max_concurrency=2, chunk_token_budget=12, max_output_tokens=None,
+                          pipeline=pipeline)
+    client.generate_phrase_utterances(base_phrase='to pay', init_quantity=12)
+    assert model.peak == 2
@@ -0,0 +1,96 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen.cli import IntentRecord, main, parse_shard, read_intents
+
+import argparse
+import json
+import pytest
+
+intents = [f"intent_{idx}" for idx in range(12)]
+
+
+def write_intents(path) -> None:
+    with open(path, 'w', encoding='utf-8') as file:
+        for intent in intents:
+            file.write(json.dumps({'intent': intent, 'base_phrase': f"to do thing {intent[7:]}"}) + '\n')
+
+
+def read_output(path) -> list[dict]:
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file]
+
+
+def test_parse_shard():
+    assert parse_shard('2/5') == (2, 5)
+    for value in ('5/5', '-1/2', 'a/b', '3'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_shard(value)
+
+
+def test_shards_partition_intents():
+    records = [IntentRecord(base_phrase=f"to {intent}", intent=intent) for intent in intents]
+    shards = [[record.intent for record in records if record.shard(3) == index] for index in range(3)]
+    assert sorted(intent for shard in shards for intent in shard) == sorted(intents)
+    assert all(shards)
+    # Assignment depends only on the intent name.
+    assert all(IntentRecord(base_phrase='to do something else', intent=record.intent).shard(3) == record.shard(3)
+               for record in records)
+
+
+def test_read_intents_from_csv_and_jsonl(tmp_path):
+    csv_path = tmp_path / 'intents.csv'
+    csv_path.write_text('intent,base_phrase\npay,to pay\n,to check balance\nempty,\n', encoding='utf-8')
+    records = read_intents(str(csv_path))
+    assert [(record.intent, record.base_phrase) for record in records] == [
+        ('pay', 'to pay'), ('to check balance', 'to check balance')]
+
+    jsonl_path = tmp_path / 'intents.jsonl'
+    write_intents(jsonl_path)
+    assert [record.intent for record in read_intents(str(jsonl_path))] == intents
+
+    with pytest.raises(Exception):
+        read_intents(str(csv_path), phrase_field='phrase')
+
+
+def test_sharded_runs_cover_intents_disjointly_and_completely(tmp_path):
+    input_path = tmp_path / 'intents.jsonl'
+    write_intents(input_path)
+    outputs = []
+    for index in range(3):
+        output = str(tmp_path / f"shard{index}.jsonl")
+        assert main(['generate', str(input_path), '-o', output, '--shard', f"{index}/3", '--workers', '1',
+                     '--model', 'interactigen.testing:FakeChatModel', '--model-kwargs', '{"latency": 0}',
+                     '--init-quantity', '5']) == 0
+        outputs.append(output)
+
+    shards = [[record['intent'] for record in read_output(output)] for output in outputs]
+    assert sorted(intent for shard in shards for intent in shard) == sorted(intents)
+    assert all(record['shard'] == f"{index}/3" and record['utterances']
+               for index, output in enumerate(outputs) for record in read_output(output))
+
+    merged = str(tmp_path / 'merged.jsonl')
+    assert main(['merge', *outputs, '-o', merged]) == 0
+    records = read_output(merged)
+    assert [record['intent'] for record in records] == sorted(intents)
+    utterances = [utterance for record in records for utterance in record['utterances']]
+    assert len(utterances) == len(set(utterances))
@@ -0,0 +1,73 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import ExactDuplicateIndex, UtteranceCorpus, UtteranceEvent, normalize_utterance
+
+import pytest
+
+
+def build() -> UtteranceCorpus:
+    corpus = UtteranceCorpus()
+    corpus.extend(['pay bill', 'check balance'], stage='init')
+    corpus.extend(['bill pay', 'pay bill'], stage='base', transform='flip bigrams or trigrams')
+    corpus.extend(['pay invoice'], stage='base', transform='swap common synonyms')
+    return corpus
+
+
+def test_duplicates_are_dropped_on_insert_with_first_provenance():
+    corpus = build()
+    assert list(corpus) == ['pay bill', 'check balance', 'bill pay', 'pay invoice']
+    assert not corpus.add('pay bill', stage='voice', transform='introduce common speech recognition mistranslations')
+    assert corpus.provenance(0) == UtteranceEvent('init', None, 'pay bill')
+    assert corpus.provenance(2) == UtteranceEvent('base', 'flip bigrams or trigrams', 'bill pay')
+    assert corpus.stages() == ['init', 'base']
+    assert corpus.transforms() == ['flip bigrams or trigrams', 'swap common synonyms']
+    assert 'check balance' in corpus and corpus[3] == 'pay invoice'
+
+
+def test_dedup_index_is_pluggable():
+    corpus = UtteranceCorpus(dedup_index=ExactDuplicateIndex(normalizer=normalize_utterance))
+    assert corpus.extend(['Pay bill!', 'pay bill', 'PAY BILL'], stage='init') == 1
+
+
+def test_views_filter_live():
+    corpus = build()
+    initial = corpus.view(transforms=[None])
+    base = corpus.view(stages='base')
+    voice = corpus.view(stages=['voice'])
+    assert list(initial) == ['pay bill', 'check balance']
+    assert list(base) == ['bill pay', 'pay invoice']
+    assert len(voice) == 0
+
+    corpus.add('pay the bill', stage='voice', transform='introduce common speech recognition mistranslations')
+    assert list(voice) == ['pay the bill']
+    assert [event.stage for event in corpus.view().records()] == ['init', 'init', 'base', 'base', 'voice']
+
+
+def test_capacity_stops_inserts():
+    corpus = UtteranceCorpus(capacity=3)
+    assert corpus.extend(['a', 'b', 'a', 'c', 'd'], stage='init') == 3
+    assert corpus.full
+    assert not corpus.add('e', stage='init')
+    assert list(corpus) == ['a', 'b', 'c']
+    with pytest.raises(Exception):
+        UtteranceCorpus(capacity=0)
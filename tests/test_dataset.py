@@ -0,0 +1,82 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import Interactigen
+from interactigen.testing import FakeChatModel
+
+import asyncio
+
+phrases = [f"to do thing {idx}" for idx in range(6)]
+
+
+class FailingChatModel(FakeChatModel):
+    """
+    Fake chat model that rejects every prompt mentioning 'broken'.
+    """
+
+    active: int = 0
+    peak: int = 0
+
+    def _answer(self, prompt, rng):
+        if 'broken' in prompt:
+            raise ValueError('prompt rejected')
+        return super()._answer(prompt, rng)
+
+    async def _agenerate(self, *args, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await super()._agenerate(*args, **kwargs)
+        finally:
+            self.active -= 1
+
+
+def test_every_intent_is_yielded():
+    client = Interactigen(model=FakeChatModel(latency=0))
+    results = list(client.generate_dataset(iter(phrases), init_quantity=5))
+    assert sorted(result.base_phrase for result in results) == phrases
+    for result in results:
+        assert result.ok
+        assert len(result.utterances) == len(set(result.utterances)) > 5
+
+
+def test_failing_intent_is_captured_and_others_complete():
+    client = Interactigen(model=FailingChatModel(latency=0))
+    results = {
+        result.base_phrase: result
+        for result in client.generate_dataset(phrases + ['to be broken'], init_quantity=5)
+    }
+    assert len(results) == 7
+    assert isinstance(results['to be broken'].error, ValueError)
+    assert results['to be broken'].utterances == []
+    assert all(results[phrase].ok for phrase in phrases)
+
+
+def test_run_shares_one_bounded_pool():
+    model = FailingChatModel(latency=0.01)
+    client = Interactigen(model=model, max_concurrency=16)
+
+    async def run():
+        return [result async for result in client.agenerate_dataset(phrases, init_quantity=5, max_concurrency=3)]
+
+    assert len(asyncio.run(run())) == len(phrases)
+    assert model.peak == 3
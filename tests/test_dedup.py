@@ -0,0 +1,77 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import (
+    ExactDuplicateIndex,
+    Interactigen,
+    NearDuplicateIndex,
+    dedup_utterances,
+    normalize_utterance,
+)
+from interactigen.testing import FakeChatModel
+
+import pytest
+
+
+def test_normalize_folds_case_punctuation_and_whitespace():
+    assert normalize_utterance('  Pay my BILL,  please!  ') == 'pay my bill please'
+    assert normalize_utterance('what’s due?') == 'what s due'
+
+
+def test_exact_index_keeps_first_seen_order_and_labels():
+    index = ExactDuplicateIndex(normalizer=normalize_utterance)
+    assert index.filter(['Pay bill', 'pay bill!', 'check balance'], label='billing') == ['Pay bill', 'check balance']
+    assert len(index) == 2
+    assert index.lookup('PAY BILL') == ('Pay bill', 'billing')
+    assert 'check  balance' in index
+    assert dedup_utterances(['a', 'b', 'a']) == ['a', 'b']
+
+
+def test_near_index_drops_close_variants_only():
+    index = NearDuplicateIndex(threshold=0.7)
+    assert index.add('i would like to pay my electricity bill today', label='pay')
+    assert not index.add('I would like to pay my electricity bill today!')
+    assert not index.add('i would like to pay my electricity bills today')
+    assert index.add('what is the balance on my savings account')
+    assert index.lookup('i would like to pay my electricity bills today') == (
+        'i would like to pay my electricity bill today', 'pay')
+    assert len(index) == 2
+
+
+def test_near_index_is_deterministic_per_seed():
+    utterances = [f"please pay the {word} bill now" for word in ('gas', 'water', 'phone', 'gas')]
+    assert (dedup_utterances(utterances, index=NearDuplicateIndex(seed=3)) ==
+            dedup_utterances(utterances, index=NearDuplicateIndex(seed=3)))
+
+
+def test_near_index_rejects_bad_parameters():
+    with pytest.raises(Exception):
+        NearDuplicateIndex(threshold=0.0)
+    with pytest.raises(Exception):
+        NearDuplicateIndex(num_perm=0)
+
+
+def test_client_uses_its_dedup_factory():
+    client = Interactigen(model=FakeChatModel(latency=0, duplicate_rate=0.5),
+                          dedup_factory=lambda: ExactDuplicateIndex(normalizer=normalize_utterance))
+    utterances = client.generate_phrase_utterances(base_phrase='to pay', init_quantity=5)
+    assert len({normalize_utterance(utterance) for utterance in utterances}) == len(utterances)
@@ -0,0 +1,68 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import interactigen
+
+import json
+import os
+import pytest
+import subprocess
+import sys
+
+heavy_modules = ['langchain_core', 'interacticore', 'pydantic', 'interactigen.interactigen', 'interactigen.commands']
+
+
+def loaded_modules(statement: str) -> list[str]:
+    """
+    Run a statement in a fresh interpreter.
+    :param statement: The statement.
+    :return: the heavy modules it loaded.
+    """
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+    code = (f"import json, sys\n{statement}\n"
+            f"print(json.dumps([name for name in {heavy_modules!r} if name in sys.modules]))")
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [src, os.environ.get('PYTHONPATH')]))}
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True, env=env).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_bare_import_loads_no_heavy_modules():
+    assert loaded_modules('import interactigen') == []
+
+
+def test_lightweight_names_stay_light():
+    assert loaded_modules('import interactigen\n'
+                          'interactigen.RunJournal, interactigen.NearDuplicateIndex, interactigen.Pipeline') == []
+
+
+def test_client_does_not_load_the_command_prompts():
+    loaded = loaded_modules('import interactigen\ninteractigen.Interactigen')
+    assert 'interactigen.interactigen' in loaded
+    assert 'interactigen.commands' not in loaded
+
+
+def test_every_public_name_resolves():
+    for name in interactigen.__all__:
+        assert getattr(interactigen, name) is not None
+    assert set(interactigen.__all__) <= set(dir(interactigen))
+    with pytest.raises(AttributeError):
+        interactigen.NoSuchName
@@ -0,0 +1,84 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import Instrumentation, Interactigen, MetricsAggregator, ResponseCache
+from interactigen.instrumentation import CommandCall
+from interactigen.testing import FakeChatModel
+
+import pytest
+
+
+class RecordingHook(Instrumentation):
+    """
+    Instrumentation hook recording every finished command.
+    """
+
+    def __init__(self):
+        self.started: list[CommandCall] = []
+        self.ended: list[CommandCall] = []
+
+    def on_command_start(self, call: CommandCall) -> None:
+        self.started.append(call)
+
+    def on_command_end(self, call: CommandCall) -> None:
+        self.ended.append(call)
+
+
+def generate(**kwargs) -> tuple[MetricsAggregator, RecordingHook]:
+    metrics, hook = MetricsAggregator(), RecordingHook()
+    client = Interactigen(model=FakeChatModel(latency=0), instrumentation=[metrics, hook], **kwargs)
+    client.generate_phrase_utterances(base_phrase='to pay', init_quantity=5)
+    return metrics, hook
+
+
+def test_aggregator_counts_commands():
+    metrics, hook = generate()
+    commands = metrics.snapshot()['commands']
+    assert commands['GenNewPhrasings']['calls'] == 1
+    assert commands['GenNewPhrasings']['utterances'] == 5
+    assert commands['GenMultiTransformedPhrasings']['calls'] == 2
+    assert commands['GenMultiTransformedPhrasings']['model_calls'] == 2
+    assert len(hook.started) == len(hook.ended) == 3
+    assert all(call.source == 'model' and call.error is None and call.prompt_tokens > 0 for call in hook.ended)
+
+
+def test_transform_shares_add_up_to_command_totals():
+    metrics, hook = generate()
+    for call in hook.ended:
+        if len(call.transforms) > 1:
+            assert sum(call.share(transform) for transform in call.transforms) == pytest.approx(1.0)
+    snapshot = metrics.snapshot()
+    multi = snapshot['commands']['GenMultiTransformedPhrasings']
+    transforms = snapshot['transforms'].values()
+    for key in ('prompt_tokens', 'completion_tokens', 'utterances'):
+        assert sum(series[key] for series in transforms) == pytest.approx(multi[key], abs=len(transforms))
+    assert {series['calls'] for series in transforms} == {1}
+
+
+def test_cached_commands_are_not_model_calls():
+    cache = ResponseCache(path=':memory:')
+    generate(cache=cache)
+    metrics, hook = generate(cache=cache)
+    assert {call.source for call in hook.ended} == {'cache'}
+    assert all(series['model_calls'] == 0 for series in metrics.snapshot()['commands'].values())
+    metrics.reset()
+    assert metrics.snapshot() == {'commands': {}, 'transforms': {}}
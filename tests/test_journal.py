@@ -0,0 +1,87 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import Interactigen, RunJournal
+from interactigen.testing import FakeChatModel
+
+import os
+
+phrases = ['to pay', 'to check balance', 'to be broken']
+
+
+class FailingChatModel(FakeChatModel):
+    """
+    Fake chat model that rejects every prompt mentioning 'broken' until repaired.
+    """
+
+    repaired: bool = False
+
+    def _answer(self, prompt, rng):
+        if 'broken' in prompt and not self.repaired:
+            raise ValueError('prompt rejected')
+        return super()._answer(prompt, rng)
+
+
+def run(model: FakeChatModel, path: str) -> dict[str, list[str]]:
+    journal = RunJournal(path=path)
+    try:
+        results = Interactigen(model=model, journal=journal).generate_dataset(phrases, init_quantity=5)
+        return {result.base_phrase: result.utterances for result in results if result.ok}
+    finally:
+        journal.close()
+
+
+def test_completed_run_replays_without_calls(tmp_path):
+    path = str(tmp_path / 'run.jsonl')
+    first = run(FakeChatModel(latency=0), path)
+    model = FakeChatModel(latency=0)
+    assert run(model, path) == first
+    assert model.calls == 0
+
+
+def test_resumed_run_only_pays_for_unfinished_work(tmp_path):
+    path = str(tmp_path / 'run.jsonl')
+    interrupted = run(FailingChatModel(latency=0), path)
+    assert sorted(interrupted) == ['to check balance', 'to pay']
+
+    # Journal keys include the model identity, so the resumed run uses the same model type.
+    model, fresh = FailingChatModel(latency=0, repaired=True), FailingChatModel(latency=0, repaired=True)
+    resumed = run(model, path)
+    assert resumed == run(fresh, str(tmp_path / 'fresh.jsonl'))
+    assert model.calls == fresh.calls // len(phrases)
+
+
+def test_partial_final_record_is_truncated(tmp_path):
+    path = str(tmp_path / 'run.jsonl')
+    journal = RunJournal(path=path)
+    journal.record('a', 'GenNewPhrasings', {'quantity': 1}, {'utterances': ['pay']})
+    journal.close()
+    size = os.path.getsize(path)
+    with open(path, 'ab') as journal_file:
+        journal_file.write(b'{"key": "b", "cmd_na')
+
+    journal = RunJournal(path=path)
+    assert 'a' in journal and 'b' not in journal
+    assert journal.get('a') == {'utterances': ['pay']}
+    assert journal.replayed == 1
+    journal.close()
+    assert os.path.getsize(path) == size
@@ -0,0 +1,80 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import (
+    EmojiTransform,
+    Interactigen,
+    LocalTransformEngine,
+    NgramSwapTransform,
+    SynonymTransform,
+    TypoTransform,
+)
+from interactigen.testing import FakeChatModel
+
+import pytest
+
+utterances = [f"I want to pay my {bill} bill today" for bill in ('phone', 'gas', 'water')]
+
+
+def test_results_do_not_depend_on_batch_composition():
+    engine = LocalTransformEngine()
+    for transform_phrase in engine.transforms:
+        batch = engine.transform(utterances=utterances + utterances[:1], transform_phrase=transform_phrase)
+        alone = [engine.transform(utterances=[utterance], transform_phrase=transform_phrase)[0]
+                 for utterance in utterances]
+        assert batch == alone + alone[:1]
+
+
+def test_seed_changes_results():
+    transform_phrase = 'introduce common spelling mistakes'
+    results = {
+        tuple(LocalTransformEngine(seed=seed).transform(utterances=utterances, transform_phrase=transform_phrase))
+        for seed in range(5)
+    }
+    assert len(results) > 1
+
+
+def test_transforms_change_utterances():
+    for local_transform in (NgramSwapTransform(), SynonymTransform(), TypoTransform(), EmojiTransform()):
+        transformed = local_transform.apply(utterances, seed='test')
+        assert len(transformed) == len(utterances)
+        assert all(result != utterance for result, utterance in zip(transformed, utterances))
+
+
+def test_unknown_phrase_is_rejected():
+    with pytest.raises(Exception):
+        LocalTransformEngine().transform(utterances=utterances, transform_phrase='sound more casual')
+
+
+def test_locally_routed_transforms_skip_the_model():
+    model = FakeChatModel(latency=0)
+    client = Interactigen(model=model, local_transforms=LocalTransformEngine())
+    results = client.generate_phrase_utterances(base_phrase='to pay', init_quantity=5)
+    # Only the initial utterances and the base transforms are generated by the model.
+    assert model.calls == 2
+    assert len(results) > 15
+
+    model = FakeChatModel(latency=0)
+    client = Interactigen(model=model, local_transforms=LocalTransformEngine(
+        transforms={'swap common synonyms': SynonymTransform()}))
+    client.generate_phrase_transforms_all(utterances=utterances)
+    assert model.calls == 1
@@ -0,0 +1,83 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import Interactigen
+from interactigen.testing import FakeChatModel
+
+import json
+
+utterances = [f"pay bill{idx}" for idx in range(5)]
+transform_phrases = ['flip bigrams or trigrams', 'swap common synonyms', 'introduce common spelling mistakes']
+
+
+class SkippingChatModel(FakeChatModel):
+    """
+    Fake chat model that leaves the second instruction out of every multi-transform answer.
+    """
+
+    def _answer(self, prompt, rng):
+        text = super()._answer(prompt, rng)
+        if 'numbered instructions' not in prompt:
+            return text
+        result = json.loads(text)
+        result['transforms'] = [entry for entry in result['transforms'] if entry['transform'] != 2]
+        return json.dumps(result)
+
+
+def test_transforms_share_one_call():
+    model = FakeChatModel(latency=0)
+    client = Interactigen(model=model)
+    results = client.generate_phrase_multi_transforms(utterances=utterances, transform_phrases=transform_phrases)
+    assert model.calls == 1
+    assert list(results) == transform_phrases
+    assert all(len(results[phrase]) == len(utterances) for phrase in transform_phrases)
+
+
+def test_results_keep_transform_order():
+    model = FakeChatModel(latency=0)
+    results = Interactigen(model=model).generate_phrase_transforms_all(utterances=utterances)
+    assert model.calls == 1
+    assert len(results) == 2 * len(utterances)
+    assert all('t1v' in result for result in results[:len(utterances)])
+    assert all('t2v' in result for result in results[len(utterances):])
+
+
+def test_skipped_transform_falls_back_to_a_single_call():
+    model = SkippingChatModel(latency=0)
+    client = Interactigen(model=model)
+    results = client.generate_phrase_transforms_all(utterances=utterances)
+    assert model.calls == 2
+    assert len(results) == 2 * len(utterances)
+
+
+def test_no_output_limit_disables_multi_transform_calls():
+    model = FakeChatModel(latency=0)
+    client = Interactigen(model=model, max_output_tokens=None)
+    results = client.generate_phrase_transforms_all(utterances=utterances)
+    assert model.calls == 2
+    assert len(results) == 2 * len(utterances)
+
+
+def test_default_voice_run_takes_three_calls():
+    model = FakeChatModel(latency=0)
+    Interactigen(model=model).generate_phrase_utterances(base_phrase='to pay', init_quantity=5)
+    assert model.calls == 3
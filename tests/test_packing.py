@@ -0,0 +1,92 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import Interactigen, MetricsAggregator
+from interactigen.instrumentation import count_utterances
+from interactigen.testing import FakeChatModel
+
+import json
+
+phrases = [f"to do thing {idx}" for idx in range(10)]
+
+
+class SkippingChatModel(FakeChatModel):
+    """
+    Fake chat model that leaves the second phrase out of every packed answer, and rejects packs mentioning 'fail'.
+    """
+
+    def _answer(self, prompt, rng):
+        text = super()._answer(prompt, rng)
+        if 'numbered phrases' not in prompt:
+            return text
+        if 'fail' in prompt:
+            raise ValueError('pack rejected')
+        result = json.loads(text)
+        result['phrases'] = [entry for entry in result['phrases'] if entry['phrase'] != 2]
+        return json.dumps(result)
+
+
+def run_dataset(client: Interactigen, base_phrases: list[str]) -> dict[str, int]:
+    results = client.generate_dataset(base_phrases, max_pending=8)
+    return {result.base_phrase: len(result.utterances) for result in results}
+
+
+def test_packing_cuts_new_phrasing_calls():
+    unpacked_model, packed_model = FakeChatModel(latency=0), FakeChatModel(latency=0)
+    unpacked = run_dataset(Interactigen(model=unpacked_model, max_concurrency=8), phrases)
+    packed = run_dataset(Interactigen(model=packed_model, max_concurrency=8, intent_pack_size=4), phrases)
+    assert packed == unpacked
+    # Ten new phrasing calls become packs of 4, 4 and 2.
+    assert unpacked_model.calls - packed_model.calls == 7
+
+
+def test_packs_split_to_fit_output_limit():
+    client = Interactigen(model=FakeChatModel(latency=0), intent_pack_size=50, max_output_tokens=400)
+    packs = client._init_packs(phrases, 10)
+    assert [len(pack) for pack in packs] == [2] * 5
+    assert [phrase for pack in packs for phrase in pack] == phrases
+
+
+def test_skipped_and_failed_phrases_fall_back_to_single_calls():
+    client = Interactigen(model=SkippingChatModel(latency=0), max_concurrency=8, intent_pack_size=4)
+    results = run_dataset(client, phrases + ['fail one', 'fail two'])
+    assert len(results) == 12
+    assert results == run_dataset(Interactigen(model=FakeChatModel(latency=0), max_concurrency=8),
+                                  phrases + ['fail one', 'fail two'])
+
+
+def test_multi_init_utterances_complete_truncated_packs():
+    client = Interactigen(model=FakeChatModel(latency=0, truncated_rate=0.5, seed=3), intent_pack_size=5)
+    generated = client.generate_phrase_multi_init_utterances(base_phrases=phrases, quantity=10)
+    assert {phrase: len(utterances) for phrase, utterances in generated.items()} == {phrase: 10 for phrase in phrases}
+
+
+def test_packed_calls_count_utterances():
+    metrics = MetricsAggregator()
+    client = Interactigen(model=FakeChatModel(latency=0), max_concurrency=8, intent_pack_size=4,
+                          instrumentation=[metrics])
+    run_dataset(client, phrases[:8])
+    packed = metrics.snapshot()['commands']['GenMultiNewPhrasings']
+    assert packed['calls'] == 2
+    assert packed['utterances'] == 80
+    result = {'phrases': [{'phrase': 1, 'utterances': ['a', 'b']}, {'phrase': 2, 'utterances': ['c']}]}
+    assert count_utterances(result) == 3
@@ -0,0 +1,82 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import Interactigen, Pipeline, Stage
+from interactigen.pipeline import default_pipeline
+from interactigen.testing import FakeChatModel
+
+import asyncio
+import pytest
+
+chain = Pipeline(stages=[
+    Stage(name='typos', transforms=['introduce common spelling mistakes']),
+    Stage(name='casual', transforms=['sound more casual']),
+    Stage(name='emojis', transforms=['introduce common emojis'], inputs=['typos', 'casual']),
+    Stage(name='voice', transforms=['introduce common speech recognition mistranslations'], inputs=['typos'],
+          media_types=['voice']),
+])
+
+
+def test_waves_follow_dependencies():
+    assert [[stage.name for stage in wave] for wave in chain.waves()] == [['typos', 'casual'], ['emojis', 'voice']]
+    assert [stage.name for stage in chain.consumers('typos')] == ['emojis', 'voice']
+    assert Pipeline.transforms_of(chain.stages[:2]) == ['introduce common spelling mistakes', 'sound more casual']
+
+
+def test_media_type_selection():
+    assert [stage.name for stage in chain.for_media_type('email').stages] == ['typos', 'casual', 'emojis']
+    for media_type, stages in (('voice', ['base', 'all', 'voice']), ('text', ['base', 'all', 'text']),
+                               ('email', ['base', 'all', 'text'])):
+        assert [stage.name for stage in default_pipeline().for_media_type(media_type).stages] == stages
+
+
+def test_invalid_pipelines_are_rejected():
+    with pytest.raises(Exception):
+        Stage(name='init', transforms=['sound more casual'])
+    with pytest.raises(Exception):
+        Pipeline(stages=[Stage(name='a', transforms=[], inputs=['b']), Stage(name='b', transforms=[])])
+    with pytest.raises(Exception):
+        Pipeline(stages=[Stage(name='a', transforms=[]), Stage(name='a', transforms=[])])
+
+
+def test_sync_and_async_runs_apply_every_stage():
+    sync_model, async_model = FakeChatModel(latency=0), FakeChatModel(latency=0)
+    utterances = Interactigen(model=sync_model, pipeline=chain, max_output_tokens=None).generate_phrase_utterances(
+        base_phrase='to pay', init_quantity=5, media_type='text')
+    async_utterances = asyncio.run(Interactigen(model=async_model, pipeline=chain, max_output_tokens=None)
+                                   .agenerate_phrase_utterances(base_phrase='to pay', init_quantity=5,
+                                                                media_type='text'))
+    # init, typos, casual and emojis, one call per transform.
+    assert sync_model.calls == async_model.calls == 4
+    assert utterances == async_utterances
+    assert len(utterances) == 5 + 5 + 5 + 10
+
+
+@pytest.mark.parametrize('duplicate_rate', [0.0, 0.5])
+def test_sync_and_async_runs_return_the_same_corpus(duplicate_rate):
+    sync_model = FakeChatModel(latency=0, seed=7, duplicate_rate=duplicate_rate)
+    async_model = FakeChatModel(latency=0, seed=7, duplicate_rate=duplicate_rate)
+    corpus = Interactigen(model=sync_model).generate_phrase_corpus(base_phrase='to pay my bill', init_quantity=5)
+    async_corpus = asyncio.run(Interactigen(model=async_model).agenerate_phrase_corpus(base_phrase='to pay my bill',
+                                                                                      init_quantity=5))
+    assert sync_model.calls == async_model.calls
+    assert list(corpus.records()) == list(async_corpus.records())
@@ -0,0 +1,124 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import Interactigen, ResponseCache, RunJournal
+from interactigen.testing import FakeChatModel
+
+import asyncio
+import json
+import re
+
+
+class NovelPhrasingModel(FakeChatModel):
+    """
+    Fake chat model answering every new phrasing request with fresh utterances, recording the quantity requested.
+    """
+
+    quantities: list[int] = []
+
+    def _answer(self, prompt, rng):
+        match = re.search(r"generate (\d+) semantically diverse ways (.*)\.$", prompt, re.S)
+        if match is None:
+            return super()._answer(prompt, rng)
+        quantity = int(match.group(1))
+        self.quantities.append(quantity)
+        request = f"{self.seed}.{len(self.quantities)}"
+        return json.dumps({'utterances': [f"{match.group(2)} {request}.{idx}" for idx in range(quantity)]})
+
+
+def pipeline_count(target_unique: int) -> int:
+    """
+    Count the unique utterances the pipeline produces for a quota, before any top-up.
+    :param target_unique: The number of unique utterances to stop at.
+    :return: the number of utterances.
+    """
+    client = Interactigen(model=NovelPhrasingModel(latency=0), max_top_ups=0)
+    return len(client.generate_phrase_corpus(base_phrase='to pay', init_quantity=5, target_unique=target_unique))
+
+
+def run_all(target_unique: int, **kwargs) -> list[tuple[int, int]]:
+    """
+    Generate with the sync, async and streaming APIs.
+    :param target_unique: The number of unique utterances to stop at.
+    :param kwargs: The client parameters.
+    :return: the number of utterances and model calls of each run.
+    """
+    runs = []
+    for mode in ('sync', 'async', 'stream'):
+        model = FakeChatModel(latency=0)
+        client = Interactigen(model=model, **kwargs)
+        params = dict(base_phrase='to pay', init_quantity=5, target_unique=target_unique)
+        if mode == 'sync':
+            utterances = client.generate_phrase_utterances(**params)
+        elif mode == 'async':
+            utterances = asyncio.run(client.agenerate_phrase_utterances(**params))
+        else:
+            utterances = [event.utterance for event in client.stream_phrase_utterances(**params)]
+        assert len(utterances) == len(set(utterances))
+        runs.append((len(utterances), model.calls))
+    return runs
+
+
+def test_generation_stops_at_the_quota():
+    # The initial utterances and the base transforms cover the quota, so the remaining wave is never requested.
+    assert run_all(8) == [(8, 2)] * 3
+
+
+def test_shortfall_is_topped_up_with_new_phrasings():
+    for count, calls in run_all(70):
+        assert count > 60
+        assert calls > 4
+
+
+def test_top_ups_can_be_disabled():
+    assert all(count < 70 for count, _ in run_all(70, max_top_ups=0))
+    full = Interactigen(model=FakeChatModel(latency=0)).generate_phrase_utterances(
+        base_phrase='to pay', init_quantity=5)
+    capped = Interactigen(model=FakeChatModel(latency=0), max_top_ups=0).generate_phrase_utterances(
+        base_phrase='to pay', init_quantity=5, target_unique=70)
+    assert capped == full
+
+
+def test_top_ups_request_exactly_the_shortfall():
+    shortfall = 100 - pipeline_count(100)
+    assert shortfall > 0
+    model = NovelPhrasingModel(latency=0)
+    corpus = Interactigen(model=model).generate_phrase_corpus(base_phrase='to pay', init_quantity=5,
+                                                              target_unique=100)
+    assert model.quantities == [5, shortfall]
+    assert len(corpus) == 100
+
+
+def test_top_ups_bypass_the_cache_and_journal(tmp_path):
+    # A shortfall of init_quantity repeats the initial prompt, which the cache and journal would replay.
+    target_unique = pipeline_count(200) + 5
+    journal_path = str(tmp_path / 'run.jsonl')
+    cache = ResponseCache(path=':memory:')
+    for seed, expected in enumerate(([5, 5], [5])):
+        model = NovelPhrasingModel(latency=0, seed=seed)
+        journal = RunJournal(path=journal_path)
+        client = Interactigen(model=model, cache=cache, journal=journal)
+        corpus = client.generate_phrase_corpus(base_phrase='to pay', init_quantity=5, target_unique=target_unique)
+        journal.close()
+        assert len(corpus) == target_unique
+        # A rerun replays the initial request and the pipeline from the journal, but still requests the top-up.
+        assert model.quantities == expected
@@ -0,0 +1,129 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import Interactigen, ModelPool, RateController
+from interactigen.ratelimit import is_throttled, is_transient, retry_after
+from interactigen.testing import FakeChatModel
+
+import asyncio
+import pytest
+import time
+
+
+class ThrottledError(Exception):
+    """
+    Provider error reporting HTTP 429 with a Retry-After delay.
+    """
+
+    status_code = 429
+
+    def __init__(self, delay: float):
+        super().__init__('rate limited')
+        self.retry_after = delay
+
+
+class ThrottlingChatModel(FakeChatModel):
+    """
+    Fake chat model throttling its first requests.
+    """
+
+    throttles: int = 2
+
+    def _answer(self, prompt, rng):
+        if self.calls <= self.throttles:
+            raise ThrottledError(0.01)
+        return super()._answer(prompt, rng)
+
+
+def test_request_rate_spaces_requests_after_the_burst():
+    controller = RateController(requests_per_minute=3000)
+    start = time.monotonic()
+    # The burst is one second worth of requests, then each waits 20ms for the bucket to refill.
+    for _ in range(52):
+        controller.acquire()
+        controller.release(latency=0.0)
+    assert time.monotonic() - start >= 0.035
+    with pytest.raises(Exception):
+        RateController(requests_per_minute=0)
+
+
+def test_errors_are_classified():
+    assert is_throttled(ThrottledError(1.0)) and is_transient(ThrottledError(1.0))
+    assert retry_after(ThrottledError(1.5)) == 1.5
+    assert is_transient(TimeoutError()) and not is_transient(ValueError())
+
+
+def test_concurrency_limit_is_additive_increase_multiplicative_decrease():
+    controller = RateController(initial_concurrency=4, decrease_interval=0)
+    for _ in range(4):
+        controller.acquire()
+        controller.release(latency=0.01)
+    assert controller.concurrency_limit == pytest.approx(5, abs=0.2)
+    controller.acquire()
+    controller.release(error=ThrottledError(0.0))
+    assert controller.concurrency_limit == pytest.approx(2.5, abs=0.1)
+    assert controller.throttled == 1
+    assert controller.in_flight == 0
+
+
+def test_transient_errors_are_retried_and_others_raised():
+    controller = RateController(initial_backoff=0.001, max_retries=2)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise TimeoutError()
+        return 'ok'
+
+    assert controller.call(flaky) == 'ok'
+    assert controller.retries == 2
+
+    def broken():
+        raise ValueError('bad request')
+
+    with pytest.raises(ValueError):
+        controller.call(broken)
+    assert controller.retries == 2
+    assert controller.in_flight == 0
+
+
+def test_client_retries_throttled_commands():
+    model = ThrottlingChatModel(latency=0)
+    controller = RateController(initial_backoff=0.001)
+    client = Interactigen(model=model, rate_limiter=controller)
+    utterances = asyncio.run(client.agenerate_phrase_utterances(base_phrase='to pay', init_quantity=5))
+    assert len(utterances) > 5
+    assert controller.throttled == controller.retries == 2
+    assert controller.in_flight == 0
+
+
+def test_retries_are_not_multiplied_by_pool_failover():
+    first, second = ThrottlingChatModel(latency=0, throttles=100), ThrottlingChatModel(latency=0, throttles=100)
+    controller = RateController(initial_backoff=0.001, max_retries=3)
+    client = Interactigen(model=ModelPool(models=[first, second], strategy='round_robin'), rate_limiter=controller)
+    with pytest.raises(ThrottledError):
+        client.generate_phrase_init_utterances(base_phrase='to pay', quantity=5)
+    # Each of the four attempts is made on one endpoint, the next attempt moving on to the other.
+    assert (first.calls, second.calls) == (2, 2)
+    assert controller.throttled == 4
+    assert controller.in_flight == 0
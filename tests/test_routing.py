@@ -0,0 +1,83 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import GenMultiNewPhrasings, Interactigen, ModelPool, ModelRouter
+from interactigen.interactigen import transform_phrases_base
+from interactigen.testing import FakeChatModel
+
+
+class FailingChatModel(FakeChatModel):
+    """
+    Fake chat model whose every request times out.
+    """
+
+    def _generate(self, *args, **kwargs):
+        self.calls += 1
+        raise TimeoutError('timed out')
+
+    async def _agenerate(self, *args, **kwargs):
+        self.calls += 1
+        raise TimeoutError('timed out')
+
+
+def test_command_route_serves_packed_transforms():
+    big, cheap = FakeChatModel(latency=0), FakeChatModel(latency=0)
+    client = Interactigen(model=big, routes={'GenTransformedPhrasings': cheap})
+    utterances = client.generate_phrase_utterances(base_phrase='to pay', init_quantity=5)
+    assert utterances
+    # Only the new phrasings reach the default model; every transform call, packed or not, goes to the route.
+    assert big.calls == 1
+    assert cheap.calls == 2
+
+
+def test_phrase_route_splits_its_transform_from_the_pack():
+    big, cheap = FakeChatModel(latency=0), FakeChatModel(latency=0)
+    client = Interactigen(model=big, routes={transform_phrases_base[0]: cheap})
+    client.generate_phrase_utterances(base_phrase='to pay', init_quantity=5)
+    assert cheap.calls == 1
+    assert big.calls == 3
+
+
+def test_new_phrasings_route_serves_packed_new_phrasings():
+    big, cheap = FakeChatModel(latency=0), FakeChatModel(latency=0)
+    router = ModelRouter(default=big, routes={'GenNewPhrasings': cheap})
+    cmd = GenMultiNewPhrasings(base_phrases=['to pay', 'to cancel'], quantity=3)
+    assert router.pool_for(cmd) is router.routes['GenNewPhrasings']
+
+
+def test_pool_fails_over_and_cools_down_failing_endpoint():
+    failing, healthy = FailingChatModel(latency=0), FakeChatModel(latency=0)
+    pool = ModelPool(models=[failing, healthy], strategy='round_robin', cooldown=60.0)
+    client = Interactigen(model=pool)
+    utterances = client.generate_phrase_utterances(base_phrase='to pay', init_quantity=5)
+    assert utterances
+    assert failing.calls == 1
+    assert healthy.calls == 3
+    assert pool.endpoints[0].failures == 1
+
+
+def test_round_robin_balances_calls():
+    first, second = FakeChatModel(latency=0), FakeChatModel(latency=0)
+    client = Interactigen(model=ModelPool(models=[first, second], strategy='round_robin'))
+    for base_phrase in ('to pay', 'to cancel'):
+        client.generate_phrase_utterances(base_phrase=base_phrase, init_quantity=5)
+    assert first.calls == second.calls == 3
@@ -0,0 +1,134 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import Interactigen
+from interactigen.salvage import SalvagingJsonOutputParser, is_salvaged, salvage_utterances
+from interactigen.testing import FakeChatModel
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.outputs import Generation
+
+import asyncio
+import json
+import pytest
+import re
+
+# Every word the fake model produces for 'to pay': the base phrase, new phrasing numbers and variant tags.
+_word_pattern = re.compile(r"^(to|pay|\d+|\w+v\d+)$")
+
+
+class ReversedGroupChatModel(FakeChatModel):
+    """
+    Fake chat model writing the number of each group of a multi-transform response after its utterances.
+    """
+
+    def _answer(self, prompt, rng):
+        text = super()._answer(prompt, rng)
+        result = json.loads(text)
+        if 'transforms' not in result:
+            return text
+        return json.dumps({'transforms': [{'utterances': entry['utterances'], 'transform': entry['transform']}
+                                          for entry in result['transforms']]})
+
+
+def stream_and_generate(model_factory) -> tuple[set[str], set[str], int, int]:
+    """
+    Generate the same intent with the streaming and asyncio APIs.
+    :param model_factory: The function creating each run's model.
+    :return: the streamed and generated utterances, and the model calls of each run.
+    """
+    stream_model, async_model = model_factory(), model_factory()
+    params = dict(base_phrase='to pay', init_quantity=10)
+    streamed = {event.utterance for event in Interactigen(model=stream_model).stream_phrase_utterances(**params)}
+    generated = set(asyncio.run(Interactigen(model=async_model).agenerate_phrase_utterances(**params)))
+    return streamed, generated, stream_model.calls, async_model.calls
+
+
+def parse(text: str, group: str = 'transform'):
+    return SalvagingJsonOutputParser(salvage_group=group).parse_result([Generation(text=text)])
+
+
+def test_complete_strings_are_salvaged():
+    salvaged = salvage_utterances('{"utterances": ["pay bill", "check bal')
+    assert salvaged == {'utterances': ['pay bill'], 'salvaged': True}
+    salvaged = salvage_utterances('{"transforms": [{"transform": 1, "utterances": ["a", "b"]}, '
+                                  '{"transform": 2, "utterances": ["c", "d')
+    assert salvaged == {
+        'transforms': [{'transform': 1, 'utterances': ['a', 'b']}, {'transform': 2, 'utterances': ['c']}],
+        'salvaged': True,
+    }
+    assert salvage_utterances('I cannot help with that.') is None
+
+
+def test_parser_keeps_valid_json_and_drops_cut_off_strings():
+    assert parse('```json\n{"utterances": ["pay bill"]}\n```') == {'utterances': ['pay bill']}
+    assert not is_salvaged(parse('{"utterances": ["pay bill"]}'))
+    assert parse('{"utterances": ["pay bill", "check bal') == {'utterances': ['pay bill'], 'salvaged': True}
+    assert parse('{"utterances": ["pay bi') == {'utterances': [], 'salvaged': True}
+    with pytest.raises(OutputParserException):
+        parse('I cannot help with that.')
+
+
+def test_truncated_responses_still_yield_utterances():
+    for mode in ('sync', 'async', 'stream'):
+        client = Interactigen(model=FakeChatModel(latency=0, truncated_rate=1.0))
+        params = dict(base_phrase='to pay', init_quantity=10)
+        if mode == 'sync':
+            utterances = client.generate_phrase_utterances(**params)
+        elif mode == 'async':
+            utterances = asyncio.run(client.agenerate_phrase_utterances(**params))
+        else:
+            utterances = [event.utterance for event in client.stream_phrase_utterances(**params)]
+        assert len(utterances) > 10
+        assert all(_word_pattern.match(word) for utterance in utterances for word in utterance.split())
+
+
+def test_cut_short_transforms_are_asked_again_for_the_rest():
+    model = FakeChatModel(latency=0, truncated_rate=0.5, seed=3)
+    client = Interactigen(model=model, max_output_tokens=None)
+    utterances = [f"pay bill{idx}" for idx in range(20)]
+    results = client.generate_phrase_transforms(utterances=utterances, transform_phrase='swap common synonyms')
+    assert model.calls > 1
+    assert len(results) <= len(utterances)
+    assert all(re.match(r"^pay bill\d+ \w+v0$", result) for result in results)
+
+
+def test_groups_numbered_after_their_utterances_are_salvaged():
+    salvaged = salvage_utterances('{"transforms": [{"utterances": ["a", "b"], "transform": 1}, '
+                                  '{"utterances": ["c", "d')
+    assert salvaged == {
+        'transforms': [{'transform': 1, 'utterances': ['a', 'b']}, {'transform': None, 'utterances': ['c']}],
+        'salvaged': True,
+    }
+
+
+def test_streams_keep_groups_numbered_after_their_utterances():
+    streamed, generated, stream_calls, async_calls = stream_and_generate(lambda: ReversedGroupChatModel(latency=0))
+    assert streamed == generated
+    assert stream_calls == async_calls
+
+
+def test_streams_ask_again_for_the_rest_of_cut_short_responses():
+    streamed, generated, stream_calls, async_calls = stream_and_generate(
+        lambda: FakeChatModel(latency=0, truncated_rate=0.5, seed=3))
+    assert streamed == generated
+    assert stream_calls == async_calls > 4
@@ -0,0 +1,88 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import DatasetRecord, HashSplitter, Interactigen, JsonlSink, ParquetSink
+from interactigen.testing import FakeChatModel
+
+import json
+import pytest
+
+
+def record(utterance: str, intent: str = 'pay') -> DatasetRecord:
+    return DatasetRecord(intent, 'to pay', 'init', None, utterance)
+
+
+def read_jsonl(path) -> list[dict]:
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file]
+
+
+def test_splitter_is_deterministic_and_follows_ratios():
+    splitter = HashSplitter()
+    records = [record(f"pay bill number {idx}") for idx in range(2000)]
+    splits = [splitter.assign(item) for item in records]
+    assert splits == [HashSplitter().assign(item) for item in records]
+    assert 0.75 < splits.count('train') / len(splits) < 0.85
+    assert splitter.assign(record('Pay bill number 1!')) == splitter.assign(record('pay bill number 1'))
+    assert splits != [HashSplitter(seed=1).assign(item) for item in records]
+    with pytest.raises(Exception):
+        HashSplitter(ratios={'train': -1.0, 'test': 2.0})
+
+
+def test_jsonl_sink_writes_one_file_per_split(tmp_path):
+    path = str(tmp_path / 'out' / '{split}.jsonl')
+    splitter = HashSplitter(ratios={'train': 1, 'test': 1})
+    with JsonlSink(path, splitter=splitter) as sink:
+        for idx in range(50):
+            sink.write(record(f"pay bill {idx}"))
+    assert len(sink) == 50
+    for split in ('train', 'test'):
+        rows = read_jsonl(tmp_path / 'out' / f"{split}.jsonl")
+        assert len(rows) == sink.counts[split]
+        assert {row['split'] for row in rows} == {split}
+    with pytest.raises(Exception):
+        sink.write(record('too late'))
+
+
+def test_parquet_sink_round_trip(tmp_path):
+    parquet = pytest.importorskip('pyarrow.parquet')
+    path = str(tmp_path / 'out.parquet')
+    with ParquetSink(path, batch_size=3) as sink:
+        for idx in range(10):
+            sink.write(record(f"pay bill {idx}"))
+    assert parquet.read_table(path).column('utterance').to_pylist() == [f"pay bill {idx}" for idx in range(10)]
+
+
+def test_write_dataset_streams_every_utterance(tmp_path):
+    phrases = [('pay', 'to pay'), ('balance', 'to check balance')]
+    client = Interactigen(model=FakeChatModel(latency=0))
+    path = str(tmp_path / 'dataset.jsonl')
+    with JsonlSink(path, splitter=HashSplitter()) as sink:
+        results = list(client.write_dataset(phrases, sink, init_quantity=5))
+    rows = read_jsonl(path)
+    assert sum(result.records for result in results) == len(rows) == len(sink)
+    assert all(result.ok and result.utterances == [] for result in results)
+    for intent, base_phrase in phrases:
+        expected = Interactigen(model=FakeChatModel(latency=0)).generate_phrase_utterances(
+            base_phrase=base_phrase, init_quantity=5)
+        assert sorted(row['utterance'] for row in rows if row['intent'] == intent) == sorted(expected)
+    assert {row['stage'] for row in rows} == {'init', 'base', 'all', 'voice'}
@@ -0,0 +1,70 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import Interactigen
+from interactigen.streaming import UtteranceStreamParser
+from interactigen.testing import FakeChatModel
+
+import asyncio
+import json
+import pytest
+
+
+def test_parser_emits_each_string_when_it_closes():
+    parser = UtteranceStreamParser()
+    assert parser.feed('```json\n{"utterances": ["pay my') == []
+    assert parser.feed(' bill", "pay') == [(None, 'pay my bill')]
+    assert parser.feed(' \\"now\\""]}\n```') == [(None, 'pay "now"')]
+
+
+def test_parser_tags_grouped_utterances_in_any_chunking():
+    text = json.dumps({'transforms': [
+        {'transform': 1, 'utterances': ['a b', 'c d']},
+        {'utterances': ['e f'], 'transform': 2},
+    ]})
+    parser = UtteranceStreamParser()
+    completed = [item for char in text for item in parser.feed(char)]
+    # The group number arrives after the second array, so its strings are held back until it does.
+    assert completed == [(1, 'a b'), (1, 'c d'), (2, 'e f')]
+    assert parser.close() == []
+    assert parser.text == text
+
+
+def test_parser_releases_unnumbered_groups():
+    parser = UtteranceStreamParser()
+    assert parser.feed('{"transforms": [{"utterances": ["a b"]}, {"utterances": ["c d"], "transform": 2') == \
+           [(None, 'a b')]
+    # The last group is left open by the truncated response, its number still unparsed.
+    assert parser.close() == [(2, 'c d')]
+
+
+@pytest.mark.parametrize('duplicate_rate', [0.0, 0.5])
+def test_stream_matches_generated_utterances(duplicate_rate):
+    model, async_model = (FakeChatModel(latency=0, seed=7, duplicate_rate=duplicate_rate) for _ in range(2))
+    events = list(Interactigen(model=model).stream_phrase_utterances(base_phrase='to pay my bill', init_quantity=5))
+    utterances = [event.utterance for event in events]
+    assert len(utterances) == len(set(utterances))
+    expected = asyncio.run(Interactigen(model=async_model).agenerate_phrase_utterances(
+        base_phrase='to pay my bill', init_quantity=5))
+    assert set(utterances) == set(expected)
+    assert model.calls == async_model.calls
+    assert {event.stage for event in events if event.transform is None} == {'init'}
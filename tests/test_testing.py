@@ -0,0 +1,64 @@
+# MIT License
+#
+# Copyright (c) 2024, Justin Randall, Smart Interactive Transformations Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from interactigen import Interactigen
+from interactigen.testing import FakeChatModel
+
+import asyncio
+import json
+import pytest
+
+prompt = "Here is a list of utterances:\n\n['pay my bill now', 'check my balance']\n\nPlease repeat these examples, " \
+         "but swap common synonyms"
+
+
+def test_answers_are_reproducible_per_seed_and_attempt():
+    first, second = FakeChatModel(latency=0), FakeChatModel(latency=0)
+    assert [first.invoke(prompt).content for _ in range(2)] == [second.invoke(prompt).content for _ in range(2)]
+    assert first.calls == 2
+    assert len({FakeChatModel(latency=0, seed=seed).invoke(prompt).content for seed in range(5)}) > 1
+
+
+def test_transform_answers_follow_the_prompt():
+    result = json.loads(FakeChatModel(latency=0, output_size=3).invoke(prompt).content)
+    assert len(result['utterances']) == 6
+    assert len(set(result['utterances'])) == 6
+
+
+def test_malformed_and_truncated_answers():
+    assert not FakeChatModel(latency=0, malformed_rate=1.0).invoke(prompt).content.startswith('{')
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(FakeChatModel(latency=0, truncated_rate=1.0).invoke(prompt).content)
+
+
+def test_streamed_answer_matches_invoked_answer():
+    chunks = list(FakeChatModel(latency=0, tokens_per_second=10000).stream(prompt))
+    assert len(chunks) > 1
+    assert ''.join(chunk.content for chunk in chunks) == FakeChatModel(latency=0).invoke(prompt).content
+
+
+def test_runs_are_reproducible_regardless_of_concurrency():
+    def run(max_concurrency: int) -> list[str]:
+        client = Interactigen(model=FakeChatModel(latency=0.001, latency_sigma=1.0), max_concurrency=max_concurrency)
+        return asyncio.run(client.agenerate_phrase_utterances(base_phrase='to pay', init_quantity=5))
+
+    assert run(1) == run(8)